@@ -0,0 +1,171 @@
+from datetime import date
+
+from .models import ActivityEvent
+
+
+Kind = ActivityEvent.Kind
+
+# The kinds shown on the customer/sales dashboards
+DASHBOARD_KINDS = [Kind.CUSTOMER, Kind.SALE, Kind.APPOINTMENT]
+
+
+def _user_store_id(user):
+    return user.store_id if user else None
+
+
+def customer_event(client):
+    return ActivityEvent(
+        kind=Kind.CUSTOMER,
+        object_id=client.pk,
+        tenant_id=client.tenant_id,
+        store_id=client.store_id,
+        actor_id=client.assigned_to_id,
+        data={'client_name': client.full_name},
+        created_at=client.created_at,
+    )
+
+
+def sale_event(sale):
+    rep, client = sale.sales_representative, sale.client
+    return ActivityEvent(
+        kind=Kind.SALE,
+        object_id=sale.pk,
+        tenant_id=sale.tenant_id,
+        # The rep's store, or the client's for reps without one (business admins)
+        store_id=_user_store_id(rep) or client.store_id,
+        actor_id=sale.sales_representative_id,
+        data={
+            'order_number': sale.order_number,
+            'total_amount': str(sale.total_amount),
+            'client_name': client.full_name,
+        },
+        created_at=sale.created_at,
+    )
+
+
+def appointment_event(appointment):
+    client = appointment.client
+    return ActivityEvent(
+        kind=Kind.APPOINTMENT,
+        object_id=appointment.pk,
+        tenant_id=appointment.tenant_id,
+        store_id=_user_store_id(appointment.assigned_to) or client.store_id,
+        actor_id=appointment.assigned_to_id,
+        data={
+            'client_name': client.full_name,
+            'date': str(appointment.date),
+            'purpose': appointment.purpose,
+        },
+        created_at=appointment.created_at,
+    )
+
+
+def escalation_event(escalation):
+    client = escalation.client
+    return ActivityEvent(
+        kind=Kind.ESCALATION,
+        object_id=escalation.pk,
+        tenant_id=escalation.tenant_id,
+        store_id=client.store_id,
+        actor_id=escalation.created_by_id,
+        data={
+            'title': escalation.title,
+            'priority': escalation.priority,
+            'client_name': client.full_name,
+        },
+        created_at=escalation.created_at,
+    )
+
+
+def team_activity_event(activity):
+    user = activity.team_member.user
+    return ActivityEvent(
+        kind=Kind.TEAM_ACTIVITY,
+        object_id=activity.pk,
+        tenant_id=user.tenant_id,
+        store_id=user.store_id,
+        actor_id=user.pk,
+        data={
+            'member_name': user.get_full_name(),
+            'activity_type': activity.activity_type,
+            'description': activity.description,
+        },
+        created_at=activity.created_at,
+    )
+
+
+def recent_activity(tenant_id=None, store_id=None, kinds=None, since=None, actors=None, limit=5):
+    """
+    The newest ``limit`` events, one range read of the stream's indexes.
+
+    ``tenant_id`` None means every tenant (platform admins); ``store_id``,
+    ``kinds``, ``since`` and ``actors`` (user ids or a subquery of them)
+    narrow the feed further.
+    """
+    events = ActivityEvent.objects.all()
+    if tenant_id:
+        events = events.filter(tenant_id=tenant_id)
+    if store_id:
+        events = events.filter(store_id=store_id)
+    if kinds:
+        events = events.filter(kind__in=kinds)
+    if since:
+        events = events.filter(created_at__gte=since)
+    if actors is not None:
+        events = events.filter(actor_id__in=actors)
+    return list(events.order_by('-created_at', '-id')[:limit])
+
+
+def describe_activity(event):
+    """An event as the dashboards' ``recent_activities`` entries."""
+    data, timestamp = event.data, event.created_at.strftime('%b %d, %I:%M %p')
+    if event.kind == Kind.CUSTOMER:
+        return {
+            'type': 'customer',
+            'message': 'New customer added',
+            'details': f"{data.get('client_name', '')} - {timestamp}",
+            'icon': 'users',
+        }
+    if event.kind == Kind.SALE:
+        amount = float(data.get('total_amount') or 0)
+        return {
+            'type': 'sale',
+            'message': 'Sale completed',
+            'details': f"Order #{data.get('order_number')} - ₹{amount:,.0f} - {timestamp}",
+            'icon': 'trending',
+        }
+    if event.kind == Kind.APPOINTMENT:
+        return {
+            'type': 'appointment',
+            'message': 'Appointment scheduled',
+            'details': f"{data.get('client_name', '')} - {date.fromisoformat(data['date']).strftime('%b %d, %I:%M %p')}",
+            'icon': 'calendar',
+        }
+    if event.kind == Kind.ESCALATION:
+        return {
+            'type': 'escalation',
+            'message': 'Escalation raised',
+            'details': f"{data.get('title')} ({data.get('priority')}) - {timestamp}",
+            'icon': 'alert',
+        }
+    return {
+        'type': 'team_activity',
+        'message': data.get('description', ''),
+        'details': f"{data.get('member_name', '')} - {timestamp}",
+        'icon': 'activity',
+    }
+
+
+def describe_team_activity(event):
+    """A team-activity event as the team dashboards' ``recent_activities`` entries."""
+    from apps.users.models import TeamMemberActivity
+
+    activity_type = event.data.get('activity_type')
+    labels = dict(TeamMemberActivity.ActivityType.choices)
+    return {
+        'id': event.object_id,
+        'member_name': event.data.get('member_name', ''),
+        'activity_type': str(labels.get(activity_type, activity_type)),
+        'description': event.data.get('description', ''),
+        'created_at': event.created_at.isoformat(),
+    }
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+# Sales whose value counts as revenue on the dashboards
+REVENUE_SALE_STATUSES = ['confirmed', 'delivered']
+
+
+class ComparisonWindows:
+    """The current period and the equally long period before it, ending now."""
+
+    def __init__(self, days=30, end=None):
+        self.end = end or timezone.now()
+        self.start = self.end - timedelta(days=days)
+        self.previous_start = self.start - timedelta(days=days)
+
+    def current_q(self, field='created_at'):
+        return Q(**{f'{field}__gte': self.start})
+
+    def previous_q(self, field='created_at'):
+        return Q(**{f'{field}__gte': self.previous_start, f'{field}__lt': self.start})
+
+    # The same windows over a date column (such as rollup days), aligned to local days
+
+    def current_days_q(self, field='date'):
+        return Q(**{f'{field}__gt': timezone.localdate(self.start)})
+
+    def previous_days_q(self, field='date'):
+        return Q(**{
+            f'{field}__gt': timezone.localdate(self.previous_start),
+            f'{field}__lte': timezone.localdate(self.start),
+        })
+
+
+def money_sum(field, filter=None):
+    """SUM(field) that is 0 rather than NULL when no rows match."""
+    return Coalesce(
+        Sum(field, filter=filter),
+        Value(0),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def count_sum(field, filter=None):
+    """SUM(field) of an integer column that is 0 rather than NULL when no rows match."""
+    return Coalesce(Sum(field, filter=filter), Value(0))
+
+
+def windowed_counts(queryset, windows, field='created_at', **extra):
+    """
+    Total, current-window and previous-window row counts (plus any ``extra``
+    aggregates) for ``queryset`` in a single conditional-aggregation query.
+    """
+    return queryset.aggregate(
+        total=Count('id'),
+        current=Count('id', filter=windows.current_q(field)),
+        previous=Count('id', filter=windows.previous_q(field)),
+        **extra
+    )
+
+
+def stacked_windowed_counts(windows, querysets, amounts=None, field='created_at'):
+    """
+    ``windowed_counts`` of several querysets in one UNION ALL query.
+
+    ``querysets`` maps a name to a queryset; ``amounts`` optionally maps some
+    of the names to ``(field, filter)`` whose money sum is taken over the
+    same total/current/previous windows (0 for the other names). Returns
+    ``{name: {'total', 'current', 'previous', 'amount', 'current_amount',
+    'previous_amount'}}``.
+    """
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    parts = []
+    for name, queryset in querysets.items():
+        amount_field, amount_filter = (amounts or {}).get(name, (None, Q()))
+        if amount_field:
+            sums = {
+                'amount': money_sum(amount_field, filter=amount_filter),
+                'current_amount': money_sum(amount_field, filter=amount_filter & windows.current_q(field)),
+                'previous_amount': money_sum(amount_field, filter=amount_filter & windows.previous_q(field)),
+            }
+        else:
+            sums = {'amount': zero, 'current_amount': zero, 'previous_amount': zero}
+        # A constant "group" gives one aggregate row per queryset, even when it is empty
+        parts.append(
+            queryset.order_by()
+            .annotate(source=Value(name))
+            .values('source')
+            .annotate(
+                total=Count('id'),
+                current=Count('id', filter=windows.current_q(field)),
+                previous=Count('id', filter=windows.previous_q(field)),
+                **sums
+            )
+        )
+    rows = parts[0].union(*parts[1:], all=True)
+    return {row.pop('source'): row for row in rows}
+
+
+def percent_change(current, previous):
+    if previous == 0:
+        return '+100%' if current > 0 else '+0%'
+    change = ((current - previous) / previous) * 100
+    return f"{'+' if change >= 0 else ''}{change:.1f}%"
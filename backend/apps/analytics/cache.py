@@ -0,0 +1,148 @@
+import hashlib
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from apps.users.principal import get_request_principal
+
+
+KEY_PREFIX = 'dashboard'
+# Bumped on every invalidation; callers without a tenant (platform admins) see all tenants
+ALL_TENANTS = 'all'
+
+# Endpoints whose counters dashboard_cache_stats reports
+_endpoints = set()
+# Tenants whose dashboards are invalidated when the current transaction commits
+_stale = threading.local()
+
+
+def _generation_key(tenant_id):
+    return f'{KEY_PREFIX}:gen:{tenant_id}'
+
+
+def _counter_key(endpoint, outcome):
+    return f'{KEY_PREFIX}:stats:{endpoint}:{outcome}'
+
+
+def _incr(key):
+    # add() is a no-op when the counter exists; incr() then works on every backend
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between the two calls
+        cache.set(key, 1, timeout=None)
+
+
+def _scope(principal, scope):
+    """The part of the key that tells apart callers who may see different numbers."""
+    if scope == 'tenant':
+        return '-'
+    if scope == 'store':
+        return f's{principal.store_id or "-"}'
+    if scope == 'role':
+        return f'{principal.role}:s{principal.store_id or "-"}'
+    if scope == 'user':
+        return f'u{principal.user_id}'
+    raise ValueError(f'Unknown dashboard cache scope: {scope}')
+
+
+def dashboard_cache_key(endpoint, principal, scope, query_params=None):
+    """
+    Key of one cached response: endpoint, tenant, scope (store / role / user),
+    today's date, the invalidation generation and the query string.
+    """
+    generation_key = _generation_key(principal.tenant_id or ALL_TENANTS)
+    params = '&'.join(f'{name}={value}' for name, value in sorted((query_params or {}).items()))
+    return ':'.join([
+        KEY_PREFIX,
+        endpoint,
+        f't{principal.tenant_id or "-"}',
+        _scope(principal, scope),
+        timezone.localdate().isoformat(),
+        f'g{cache.get(generation_key, 0)}',
+        hashlib.md5(params.encode()).hexdigest(),
+    ])
+
+
+def cached_dashboard(endpoint, scope='store'):
+    """
+    Cache successful responses of a dashboard view for DASHBOARD_CACHE_TIMEOUT
+    seconds. Decorates ``@api_view`` functions and ``APIView`` methods alike.
+
+    ``scope`` says who shares a cached response within a tenant: 'tenant'
+    (everyone), 'store' (users of the same store), 'role' (same role and
+    store) or 'user' (nobody). The date is part of the key, so "today"
+    figures never outlive the day.
+    """
+    _endpoints.add(endpoint)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # APIView methods get (self, request), function views (request)
+            request = args[0] if hasattr(args[0], 'query_params') else args[1]
+            timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60)
+            if timeout <= 0:
+                return view(*args, **kwargs)
+
+            key = dashboard_cache_key(endpoint, get_request_principal(request), scope, request.query_params)
+            data = cache.get(key)
+            if data is not None:
+                _incr(_counter_key(endpoint, 'hit'))
+                return Response(data)
+
+            _incr(_counter_key(endpoint, 'miss'))
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_dashboards(tenant_id):
+    """
+    Drop every cached dashboard of ``tenant_id`` (and the platform-wide ones)
+    once the current transaction commits, so that no request can cache the
+    old figures again under the new generation. Each tenant is invalidated
+    once per commit, however many of its rows were saved.
+    """
+    if not tenant_id:
+        return
+    if not hasattr(_stale, 'tenant_ids'):
+        _stale.tenant_ids = set()
+    _stale.tenant_ids.add(tenant_id)
+    # Registered per call so that a rolled-back savepoint can't drop the flush
+    transaction.on_commit(_flush_invalidations)
+
+
+def _flush_invalidations():
+    tenant_ids = getattr(_stale, 'tenant_ids', set())
+    if not tenant_ids:
+        return
+    for tenant_id in sorted(tenant_ids):
+        _incr(_generation_key(tenant_id))
+    tenant_ids.clear()
+    _incr(_generation_key(ALL_TENANTS))
+
+
+def dashboard_cache_stats():
+    """Hit/miss counters per endpoint since the cache was last cleared."""
+    keys = [_counter_key(endpoint, outcome) for endpoint in sorted(_endpoints) for outcome in ['hit', 'miss']]
+    counters = cache.get_many(keys)
+    stats = {}
+    for endpoint in sorted(_endpoints):
+        hits = counters.get(_counter_key(endpoint, 'hit'), 0)
+        misses = counters.get(_counter_key(endpoint, 'miss'), 0)
+        stats[endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses) * 100, 1) if hits + misses else 0.0,
+        }
+    return stats
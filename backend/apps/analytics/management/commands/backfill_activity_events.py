@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.activity import (
+    appointment_event,
+    customer_event,
+    escalation_event,
+    sale_event,
+    team_activity_event,
+)
+from apps.analytics.models import ActivityEvent
+from apps.clients.models import Appointment, Client
+from apps.escalation.models import Escalation
+from apps.sales.models import Sale
+from apps.users.models import TeamMemberActivity
+
+
+class Command(BaseCommand):
+    help = (
+        'Write activity-stream events for clients, sales, appointments, escalations and team '
+        'member activities created before the stream existed (or through bulk inserts, which '
+        'skip model signals). Rows that already have an event are left alone, so it is safe '
+        'to run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=int,
+            help='Only backfill events of this tenant id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Events inserted per query',
+        )
+
+    def handle(self, *args, **options):
+        tenant_id, batch_size = options['tenant'], options['batch_size']
+        sources = [
+            (Client.objects.all(), customer_event),
+            (Sale.objects.select_related('client', 'sales_representative'), sale_event),
+            (Appointment.objects.select_related('client', 'assigned_to'), appointment_event),
+            (Escalation.objects.select_related('client'), escalation_event),
+            (TeamMemberActivity.objects.select_related('team_member__user'), team_activity_event),
+        ]
+
+        started = time.perf_counter()
+        written = 0
+        for queryset, build in sources:
+            model = queryset.model
+            if tenant_id:
+                tenant_field = 'team_member__user__tenant_id' if model is TeamMemberActivity else 'tenant_id'
+                queryset = queryset.filter(**{tenant_field: tenant_id})
+            batch = []
+            for instance in queryset.order_by('pk').iterator(chunk_size=batch_size):
+                event = build(instance)
+                if event.tenant_id:
+                    batch.append(event)
+                if len(batch) >= batch_size:
+                    written += self.insert(batch)
+                    batch = []
+            written += self.insert(batch)
+            self.stdout.write(f'{model.__name__}: done')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f'Events in stream: {ActivityEvent.objects.count()} (up to {written} new)')
+        self.stdout.write(self.style.SUCCESS(f'✅ Activity backfill finished in {elapsed:.2f}s'))
+
+    @staticmethod
+    def insert(events):
+        # The (kind, object_id) constraint skips rows that already have their event
+        ActivityEvent.objects.bulk_create(events, ignore_conflicts=True)
+        return len(events)
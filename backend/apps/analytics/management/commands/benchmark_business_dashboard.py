@@ -0,0 +1,174 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.analytics.rollups import RollupBuilder
+from apps.analytics.views import business_admin_dashboard
+from apps.tenants.views import BusinessDashboardView
+from apps.clients.models import Client
+from apps.sales.models import Sale
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from apps.users.models import User
+
+
+def legacy_store_and_team_breakdown(tenant_id, start_date):
+    """The previous per-store / per-member loop, with its queries scoped to the tenant and store."""
+    revenue_statuses = ['confirmed', 'delivered']
+    store_performance = []
+    for store in Store.objects.filter(tenant_id=tenant_id):
+        store_sales = Sale.objects.filter(
+            sales_representative__store=store, created_at__gte=start_date, status__in=revenue_statuses
+        )
+        store_performance.append({
+            'id': store.id,
+            'revenue': float(store_sales.aggregate(total=Sum('total_amount'))['total'] or 0),
+            'customers': Client.objects.filter(store=store, created_at__gte=start_date, is_deleted=False).count(),
+            'staff': User.objects.filter(store=store).count(),
+        })
+
+    team_performance = []
+    for member in User.objects.filter(tenant_id=tenant_id, is_active=True):
+        member_sales = Sale.objects.filter(
+            sales_representative=member.id, created_at__gte=start_date, status__in=revenue_statuses
+        )
+        team_performance.append({
+            'id': member.id,
+            'revenue': float(member_sales.aggregate(total=Sum('total_amount'))['total'] or 0),
+            'customers': Client.objects.filter(
+                assigned_to=member.id, created_at__gte=start_date, is_deleted=False
+            ).count(),
+            'sales_count': member_sales.count(),
+        })
+    return store_performance, team_performance
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare queries and time of the business admin dashboards against the previous '
+        'per-store/per-member loop on synthetic tenants of growing size: the analytics '
+        'business-admin endpoint once, and the tenants dashboard as p95 over --repeat runs. '
+        'All data is created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='5x50,30x400,50x500',
+            help='Comma-separated STORESxSTAFF tenant sizes',
+        )
+        parser.add_argument(
+            '--sales-per-member',
+            type=int,
+            default=20,
+            help='Sales generated for each staff member',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Spread the generated sales over this many past days',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs of the tenants dashboard per size',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [tuple(int(part) for part in size.split('x')) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError(f'Invalid --sizes value: {options["sizes"]}')
+
+        self.stdout.write(
+            f'{"Stores":>8}{"Staff":>8}{"Legacy q":>10}{"Legacy ms":>11}'
+            f'{"Admin q":>9}{"Admin ms":>10}{"Tenant q":>10}{"Tenant p95 ms":>15}'
+        )
+        self.stdout.write('-' * 81)
+        with transaction.atomic():
+            for store_count, staff_count in sizes:
+                admin = self.make_tenant(store_count, staff_count, options['sales_per_member'], options['days'])
+                start_date = timezone.now() - timedelta(days=30)
+                legacy_queries, legacy_ms = self.measure(
+                    lambda: legacy_store_and_team_breakdown(admin.tenant_id, start_date)
+                )
+                admin_queries, admin_ms = self.measure(lambda: self.get_dashboard(business_admin_dashboard, admin))
+                tenant_view = BusinessDashboardView.as_view()
+                runs = [
+                    self.measure(lambda: self.get_dashboard(tenant_view, admin, filter_type='thisMonth'))
+                    for _ in range(options['repeat'])
+                ]
+                tenant_queries = runs[0][0]
+                timings = sorted(elapsed for _queries, elapsed in runs)
+                tenant_p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{store_count:>8}{staff_count:>8}{legacy_queries:>10}{legacy_ms:>11.1f}'
+                    f'{admin_queries:>9}{admin_ms:>10.1f}{tenant_queries:>10}{tenant_p95:>15.1f}'
+                )
+            transaction.set_rollback(True)
+
+    def make_tenant(self, store_count, staff_count, sales_per_member, days):
+        tag = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(name=f'Benchmark {tag}', slug=f'benchmark-{tag}')
+        stores = Store.objects.bulk_create([
+            Store(name=f'Store {i}', code=f'B{tag}{i}', address='-', city='-', state='-', tenant=tenant)
+            for i in range(store_count)
+        ])
+        admin = User.objects.create_user(
+            username=f'benchmark-admin-{tag}', role=User.Role.BUSINESS_ADMIN, tenant=tenant
+        )
+        staff = User.objects.bulk_create([
+            User(username=f'benchmark-{tag}-{i}', role=User.Role.INHOUSE_SALES, tenant=tenant, store=stores[i % store_count])
+            for i in range(staff_count)
+        ])
+        # Bulk inserts skip the model signals; the rollups are backfilled below instead
+        clients = Client.objects.bulk_create([
+            Client(email=f'{tag}-{i}@example.com', tenant=tenant, store=member.store, assigned_to=member)
+            for i, member in enumerate(staff)
+        ])
+        now = timezone.now()
+        sales = Sale.objects.bulk_create([
+            Sale(
+                order_number=f'{tag}-{i}-{n}',
+                client=client,
+                sales_representative=client.assigned_to,
+                status=random.choice(['pending', 'confirmed', 'delivered']),
+                subtotal=Decimal('1000.00'),
+                total_amount=Decimal('1000.00'),
+                tenant=tenant,
+            )
+            for i, client in enumerate(clients)
+            for n in range(sales_per_member)
+        ])
+        for sale in sales:
+            sale.created_at = now - timedelta(days=random.randint(0, days - 1))
+        Sale.objects.bulk_update(sales, ['created_at'], batch_size=2000)
+        RollupBuilder().rebuild(tenant.id, (now - timedelta(days=days)).date(), now.date())
+        return admin
+
+    def get_dashboard(self, view, user, **params):
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        if response.status_code != 200:
+            raise CommandError(f'Dashboard returned {response.status_code}: {response.data}')
+        return response.data
+
+    @staticmethod
+    def measure(func):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+        return len(context.captured_queries), elapsed
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_tenant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0002_tenant_google_maps_url'),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('sales_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue_count', models.PositiveIntegerField(default=0)),
+                ('revenue_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('closed_won_count', models.PositiveIntegerField(default=0)),
+                ('closed_won_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('new_customers', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sales_rep', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='stores.store')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['tenant', 'date'], name='rollup_tenant_date_idx'), models.Index(fields=['store', 'date'], name='rollup_store_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_tenant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0002_tenant_google_maps_url'),
+        ('analytics', '0002_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer', 'New Customer'), ('sale', 'Sale'), ('appointment', 'Appointment'), ('escalation', 'Escalation'), ('team_activity', 'Team Member Activity')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_events', to=settings.AUTH_USER_MODEL)),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_events', to='stores.store')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_events', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Activity Event',
+                'verbose_name_plural': 'Activity Events',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['tenant', 'store', '-created_at', '-id'], name='activity_tenant_store_idx'), models.Index(fields=['tenant', '-created_at', '-id'], name='activity_tenant_time_idx'), models.Index(fields=['actor', '-created_at', '-id'], name='activity_actor_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='activityevent',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='activity_event_source_unique'),
+        ),
+    ]
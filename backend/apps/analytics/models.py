@@ -117,6 +117,126 @@ class BusinessMetrics(models.Model):
         return f"{self.metric_name} - {self.period_start.date()} to {self.period_end.date()}"
 
 
+class DailyRollup(models.Model):
+    """
+    Pre-aggregated sales facts for one day × tenant × store × sales rep.
+
+    Rows are derived data: each (tenant, day) slice is rebuilt as a whole by
+    ``apps.analytics.rollups`` whenever a sale, pipeline or client of that day
+    changes, so they are never edited in place. Store and rep are those of the
+    client (sales and closed-won pipelines) or the client's assignee (new
+    customers); either may be empty.
+    """
+    date = models.DateField()
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_rollups'
+    )
+    sales_rep = models.ForeignKey(
+        'users.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_rollups'
+    )
+
+    # Sales created that day, whatever their status
+    sales_count = models.PositiveIntegerField(default=0)
+    sales_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # The confirmed/delivered part of them
+    revenue_count = models.PositiveIntegerField(default=0)
+    revenue_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Pipelines closed won that day (their creation day when no close date is set)
+    closed_won_count = models.PositiveIntegerField(default=0)
+    closed_won_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Clients (not deleted) created that day
+    new_customers = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Daily Rollup')
+        verbose_name_plural = _('Daily Rollups')
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['tenant', 'date'], name='rollup_tenant_date_idx'),
+            models.Index(fields=['store', 'date'], name='rollup_store_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id} / {self.store_id} / {self.sales_rep_id} - {self.date}"
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only stream of things that happened in a tenant, read by the
+    "recent activity" widgets.
+
+    One row is written (by ``apps.analytics.signals``) when a client, sale,
+    appointment, escalation or team member activity is created. It carries a
+    snapshot of what the feeds display, so reading a feed is a single range
+    scan of the (tenant, store, created_at) index and never touches the
+    source tables. ``created_at`` is the source row's creation time.
+    """
+    class Kind(models.TextChoices):
+        CUSTOMER = 'customer', _('New Customer')
+        SALE = 'sale', _('Sale')
+        APPOINTMENT = 'appointment', _('Appointment')
+        ESCALATION = 'escalation', _('Escalation')
+        TEAM_ACTIVITY = 'team_activity', _('Team Member Activity')
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # Primary key of the source row, in the table given by ``kind``
+    object_id = models.PositiveBigIntegerField()
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='activity_events'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='activity_events'
+    )
+    # The user the activity is credited to (sales rep, assignee, team member)
+    actor = models.ForeignKey(
+        'users.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='activity_events'
+    )
+    # What the feeds display, as of creation
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('Activity Event')
+        verbose_name_plural = _('Activity Events')
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['tenant', 'store', '-created_at', '-id'], name='activity_tenant_store_idx'),
+            models.Index(fields=['tenant', '-created_at', '-id'], name='activity_tenant_time_idx'),
+            models.Index(fields=['actor', '-created_at', '-id'], name='activity_actor_time_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='activity_event_source_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} - {self.created_at}"
+
+
 class DashboardWidget(models.Model):
     """
     Model for storing dashboard widget configurations.
@@ -0,0 +1,363 @@
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .aggregates import REVENUE_SALE_STATUSES, count_sum, money_sum
+from .cache import invalidate_dashboards
+from .models import DailyRollup
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = [
+    'sales_count',
+    'sales_amount',
+    'revenue_count',
+    'revenue_amount',
+    'closed_won_count',
+    'closed_won_value',
+    'new_customers',
+]
+
+
+def day_of(value):
+    """The rollup day of a timestamp (in the current time zone) or date."""
+    if isinstance(value, datetime):
+        return timezone.localdate(value)
+    return value
+
+
+def day_bounds(start, end):
+    """Aware datetimes covering the days ``start`` to ``end`` inclusive, as a half-open range."""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def day_runs(days):
+    """Split ``days`` into ``(start, end)`` runs of consecutive days."""
+    runs = []
+    for day in sorted(days):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def period_totals(rollups, start, end):
+    """
+    Sales and closed-won sums for the days ``start``..``end`` (inclusive) and
+    the all-time customer count of ``rollups``, in one query.
+    """
+    period = Q(date__gte=start, date__lte=end)
+    return rollups.aggregate(
+        sales_count=count_sum('sales_count', filter=period),
+        sales_amount=money_sum('sales_amount', filter=period),
+        closed_won_count=count_sum('closed_won_count', filter=period),
+        closed_won_value=money_sum('closed_won_value', filter=period),
+        total_customers=count_sum('new_customers'),
+    )
+
+
+class RollupBreakdown:
+    """
+    Rollup sums for several date buckets at once, broken down by store and
+    sales rep.
+
+    ``buckets`` maps a name to ``(start, end)`` days (inclusive), or to None
+    for all time. One GROUP BY (store, sales rep) query computes every
+    ``fields`` sum for every bucket with conditional aggregation; any
+    store/rep slice of it is then summed in memory by ``total``.
+    """
+
+    def __init__(self, rollups, buckets, fields=ROLLUP_FIELDS):
+        aggregates = {}
+        for bucket, bounds in buckets.items():
+            period = Q(date__gte=bounds[0], date__lte=bounds[1]) if bounds else Q()
+            for field in fields:
+                total = money_sum if field.endswith(('_amount', '_value')) else count_sum
+                aggregates[f'{bucket}_{field}'] = total(field, filter=period)
+        rows = rollups.order_by().values('store_id', 'sales_rep_id').annotate(**aggregates)
+        self.groups = {(row.pop('store_id'), row.pop('sales_rep_id')): row for row in rows}
+        # Groups per store and per rep, so slices don't rescan every group
+        self.by_store, self.by_rep = defaultdict(list), defaultdict(list)
+        for (store_id, sales_rep_id), row in self.groups.items():
+            self.by_store[store_id].append(row)
+            self.by_rep[sales_rep_id].append(row)
+
+    def total(self, bucket, field, store_id=None, sales_rep_id=None):
+        """Sum of ``field`` in ``bucket``, optionally for one store and/or sales rep only."""
+        if store_id is not None and sales_rep_id is not None:
+            rows = [self.groups[store_id, sales_rep_id]] if (store_id, sales_rep_id) in self.groups else []
+        elif store_id is not None:
+            rows = self.by_store.get(store_id, [])
+        elif sales_rep_id is not None:
+            rows = self.by_rep.get(sales_rep_id, [])
+        else:
+            rows = self.groups.values()
+        return sum(row[f'{bucket}_{field}'] for row in rows)
+
+
+class RollupBuilder:
+    """
+    Rebuilds ``DailyRollup`` rows from the raw Sale, SalesPipeline and Client
+    tables.
+
+    The unit of work is a run of days of one tenant: the facts for the run are
+    read with one grouped query per source table, merged per (day, store, rep)
+    in memory, and swapped in for the run's existing rows in one transaction.
+    The tenant row is locked meanwhile so that concurrent rebuilds of the same
+    tenant can't both insert a slice.
+    """
+    chunk_days = 31
+
+    def __init__(self, chunk_days=None):
+        if chunk_days:
+            self.chunk_days = chunk_days
+        self.days = 0
+        self.rows = 0
+
+    def facts(self, tenant_id, start, end):
+        """Raw facts for ``start``..``end`` keyed by ``(day, store_id, sales_rep_id)``."""
+        from apps.clients.models import Client
+        from apps.sales.models import Sale, SalesPipeline
+
+        start_at, end_at = day_bounds(start, end)
+        facts = {}
+
+        def merge(rows, store_field, rep_field):
+            for row in rows:
+                key = (row.pop('day'), row.pop(store_field), row.pop(rep_field))
+                facts.setdefault(key, {}).update(row)
+
+        revenue = Q(status__in=REVENUE_SALE_STATUSES)
+        merge(
+            Sale.objects.filter(tenant_id=tenant_id, created_at__gte=start_at, created_at__lt=end_at)
+            .annotate(day=TruncDate('created_at'))
+            .order_by()
+            .values('day', 'client__store_id', 'sales_representative_id')
+            .annotate(
+                sales_count=Count('id'),
+                sales_amount=money_sum('total_amount'),
+                revenue_count=Count('id', filter=revenue),
+                revenue_amount=money_sum('total_amount', filter=revenue),
+            ),
+            'client__store_id',
+            'sales_representative_id',
+        )
+        merge(
+            SalesPipeline.objects.filter(tenant_id=tenant_id, stage='closed_won')
+            .annotate(day=Coalesce('actual_close_date', TruncDate('created_at'), output_field=DateField()))
+            .filter(day__gte=start, day__lte=end)
+            .order_by()
+            .values('day', 'client__store_id', 'sales_representative_id')
+            .annotate(closed_won_count=Count('id'), closed_won_value=money_sum('expected_value')),
+            'client__store_id',
+            'sales_representative_id',
+        )
+        merge(
+            Client.objects.filter(
+                tenant_id=tenant_id, is_deleted=False, created_at__gte=start_at, created_at__lt=end_at
+            )
+            .annotate(day=TruncDate('created_at'))
+            .order_by()
+            .values('day', 'store_id', 'assigned_to_id')
+            .annotate(new_customers=Count('id')),
+            'store_id',
+            'assigned_to_id',
+        )
+        return facts
+
+    def rebuild(self, tenant_id, start, end):
+        """Replace the rollups of ``start``..``end`` (inclusive) for one tenant."""
+        from apps.tenants.models import Tenant
+
+        for chunk_start in range(0, (end - start).days + 1, self.chunk_days):
+            chunk_from = start + timedelta(days=chunk_start)
+            chunk_to = min(end, chunk_from + timedelta(days=self.chunk_days - 1))
+            with transaction.atomic():
+                list(Tenant.objects.select_for_update().filter(id=tenant_id).values_list('id'))
+                facts = self.facts(tenant_id, chunk_from, chunk_to)
+                DailyRollup.objects.filter(tenant_id=tenant_id, date__gte=chunk_from, date__lte=chunk_to).delete()
+                DailyRollup.objects.bulk_create([
+                    DailyRollup(tenant_id=tenant_id, date=day, store_id=store_id, sales_rep_id=rep_id, **values)
+                    for (day, store_id, rep_id), values in facts.items()
+                ])
+            self.days += (chunk_to - chunk_from).days + 1
+            self.rows += len(facts)
+
+    def rebuild_days(self, tenant_id, days):
+        for start, end in day_runs(days):
+            self.rebuild(tenant_id, start, end)
+
+    def first_day(self, tenant_id):
+        """The earliest day any source row of the tenant falls on, or None."""
+        from apps.clients.models import Client
+        from apps.sales.models import Sale, SalesPipeline
+
+        candidates = [
+            Sale.objects.filter(tenant_id=tenant_id).aggregate(first=Min('created_at'))['first'],
+            Client.objects.filter(tenant_id=tenant_id).aggregate(first=Min('created_at'))['first'],
+            SalesPipeline.objects.filter(tenant_id=tenant_id, stage='closed_won').aggregate(
+                first=Min(Coalesce('actual_close_date', TruncDate('created_at'), output_field=DateField()))
+            )['first'],
+        ]
+        days = [day_of(value) for value in candidates if value is not None]
+        return min(days) if days else None
+
+
+class RollupChecker:
+    """
+    Compares stored rollups against facts freshly aggregated from the raw
+    tables and reports every (day, store, rep, metric) that differs.
+    """
+
+    def __init__(self, builder=None):
+        self.builder = builder or RollupBuilder()
+
+    def stored(self, tenant_id, start, end):
+        rows = (
+            DailyRollup.objects.filter(tenant_id=tenant_id, date__gte=start, date__lte=end)
+            .order_by()
+            .values('date', 'store_id', 'sales_rep_id')
+            .annotate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+        )
+        return {(row.pop('date'), row.pop('store_id'), row.pop('sales_rep_id')): row for row in rows}
+
+    def mismatches(self, tenant_id, start, end):
+        """``[(day, store_id, sales_rep_id, field, stored, raw), ...]`` for ``start``..``end``."""
+        stored = self.stored(tenant_id, start, end)
+        raw = self.builder.facts(tenant_id, start, end)
+        mismatches = []
+        for key in sorted(set(stored) | set(raw), key=lambda key: (key[0], key[1] or 0, key[2] or 0)):
+            for field in ROLLUP_FIELDS:
+                stored_value = (stored.get(key) or {}).get(field) or 0
+                raw_value = (raw.get(key) or {}).get(field) or 0
+                if stored_value != raw_value:
+                    mismatches.append((*key, field, stored_value, raw_value))
+        return mismatches
+
+
+# Tenant days whose rollups are stale, collected per thread until the transaction commits
+_dirty = threading.local()
+
+# Days handed to the local worker but not yet rebuilt, merged across commits of every thread
+_queued = {}
+_queued_lock = threading.Lock()
+_local_pool = None
+
+
+def _dirty_days():
+    if not hasattr(_dirty, 'days'):
+        _dirty.days = {}
+    return _dirty.days
+
+
+def mark_rollup_dirty(tenant_id, *days):
+    """
+    Queue the given days of a tenant for a rollup rebuild once the current
+    transaction commits (immediately in autocommit mode). Every day is
+    rebuilt once per commit, however many of its rows were saved, and the
+    rebuild runs on DAILY_ROLLUP_EXECUTOR rather than in the request.
+    """
+    days = {day_of(day) for day in days if day is not None}
+    if not tenant_id or not days:
+        return
+    _dirty_days().setdefault(tenant_id, set()).update(days)
+    # Registered per mark so that a rolled-back savepoint can't drop the flush
+    transaction.on_commit(flush_rollup_updates)
+
+
+def flush_rollup_updates():
+    dirty = _dirty_days()
+    if not dirty:
+        return
+    pending = {tenant_id: set(days) for tenant_id, days in dirty.items()}
+    dirty.clear()
+    dispatch_rollup_rebuild(pending)
+
+
+def rebuild_rollup_days(pending):
+    """
+    Rebuild the rollups of ``{tenant_id: days}``. Dashboards cached between
+    the commit and the rebuild hold the old figures, so they are dropped again.
+    """
+    builder = RollupBuilder()
+    for tenant_id, days in sorted(pending.items()):
+        builder.rebuild_days(tenant_id, days)
+        invalidate_dashboards(tenant_id)
+
+
+def _rebuild_queued():
+    with _queued_lock:
+        pending = dict(_queued)
+        _queued.clear()
+    try:
+        rebuild_rollup_days(pending)
+    except Exception:
+        logger.exception('Daily rollup rebuild failed for %s', pending)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def _queue_locally(pending):
+    """
+    Merge ``pending`` into the local worker's queue. Commits that arrive
+    while a rebuild is queued or running are coalesced into the next one, so
+    a burst of saves rebuilds each day once rather than once per commit.
+    """
+    global _local_pool
+    with _queued_lock:
+        idle = not _queued
+        for tenant_id, days in pending.items():
+            _queued.setdefault(tenant_id, set()).update(days)
+    if idle:
+        if _local_pool is None:
+            # One worker: rebuilds of a tenant never contend for its row lock
+            _local_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='daily-rollup')
+        _local_pool.submit(_rebuild_queued)
+
+
+def dispatch_rollup_rebuild(pending):
+    """
+    Rebuild ``{tenant_id: days}`` with the configured executor and return its name.
+
+    DAILY_ROLLUP_EXECUTOR selects 'local' (in-process worker thread),
+    'celery', 'sync' (inline, right after commit, for tests and management
+    commands) or 'auto', which uses Celery when it is installed and the
+    broker accepts the task and falls back to the local worker otherwise.
+    """
+    executor = getattr(settings, 'DAILY_ROLLUP_EXECUTOR', 'auto')
+
+    if executor == 'sync':
+        rebuild_rollup_days(pending)
+        return 'sync'
+
+    if executor in ['auto', 'celery']:
+        from .tasks import rebuild_daily_rollups_task
+        if rebuild_daily_rollups_task is not None:
+            try:
+                rebuild_daily_rollups_task.delay({
+                    str(tenant_id): sorted(day.isoformat() for day in days) for tenant_id, days in pending.items()
+                })
+                return 'celery'
+            except Exception:
+                if executor == 'celery':
+                    raise
+                logger.warning('Celery broker unavailable, rebuilding daily rollups locally', exc_info=True)
+        elif executor == 'celery':
+            raise RuntimeError('DAILY_ROLLUP_EXECUTOR is "celery" but Celery is not installed')
+
+    _queue_locally(pending)
+    return 'local'
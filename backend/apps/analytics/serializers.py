@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import AnalyticsEvent, BusinessMetrics, DashboardWidget, Report
+from .activity import describe_activity
+from .models import ActivityEvent, AnalyticsEvent, BusinessMetrics, DashboardWidget, Report
 
 class AnalyticsEventSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,3 +21,13 @@ class ReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
         fields = '__all__'
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    display = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ActivityEvent
+        fields = ['id', 'kind', 'object_id', 'store', 'actor', 'data', 'display', 'created_at']
+
+    def get_display(self, obj):
+        return describe_activity(obj)
@@ -0,0 +1,88 @@
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.clients.audit import loaded_values
+from apps.clients.models import Appointment, Client
+from apps.escalation.models import Escalation
+from apps.products.models import Product
+from apps.sales.models import Sale, SalesPipeline
+from apps.users.models import TeamMemberActivity
+from .activity import (
+    appointment_event,
+    customer_event,
+    escalation_event,
+    sale_event,
+    team_activity_event,
+)
+from .cache import invalidate_dashboards
+from .rollups import mark_rollup_dirty
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def refresh_rollups_for_sale(sender, instance, **kwargs):
+    mark_rollup_dirty(instance.tenant_id, instance.created_at)
+    invalidate_dashboards(instance.tenant_id)
+
+
+@receiver(post_save, sender=SalesPipeline)
+@receiver(post_delete, sender=SalesPipeline)
+def refresh_rollups_for_pipeline(sender, instance, **kwargs):
+    # Closed-won pipelines count on their close day, or their creation day without one
+    mark_rollup_dirty(instance.tenant_id, instance.actual_close_date, instance.created_at)
+    invalidate_dashboards(instance.tenant_id)
+
+
+@receiver(pre_save, sender=Client)
+def note_client_move(sender, instance, raw=False, **kwargs):
+    """Remember whether a save moves the client to another store or assignee."""
+    original = loaded_values(instance) or {}
+    instance._rollup_moved = any(
+        attname in original and original[attname] != getattr(instance, attname)
+        for attname in ['store_id', 'assigned_to_id']
+    )
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def refresh_rollups_for_client(sender, instance, **kwargs):
+    days = [instance.created_at]
+    if getattr(instance, '_rollup_moved', False):
+        # Sales and pipelines are rolled up under the client's store, so all of their days move too
+        days += Sale.objects.filter(client=instance).annotate(day=TruncDate('created_at')).order_by().values_list('day', flat=True).distinct()
+        for close_date, created_at in SalesPipeline.objects.filter(client=instance, stage='closed_won').values_list(
+            'actual_close_date', 'created_at'
+        ):
+            days += [close_date, created_at]
+    mark_rollup_dirty(instance.tenant_id, *days)
+    invalidate_dashboards(instance.tenant_id)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_dashboards_for_product(sender, instance, **kwargs):
+    invalidate_dashboards(instance.tenant_id)
+
+
+# The activity stream is append-only: one event per created row, written in the same transaction
+ACTIVITY_EVENTS = {
+    Client: customer_event,
+    Sale: sale_event,
+    Appointment: appointment_event,
+    Escalation: escalation_event,
+    TeamMemberActivity: team_activity_event,
+}
+
+
+def record_activity(sender, instance, created=False, raw=False, **kwargs):
+    if not created or raw:
+        return
+    event = ACTIVITY_EVENTS[sender](instance)
+    # Team members of platform staff belong to no tenant
+    if event.tenant_id:
+        event.save()
+
+
+for model in ACTIVITY_EVENTS:
+    post_save.connect(record_activity, sender=model, dispatch_uid=f'activity_event_{model.__name__}')
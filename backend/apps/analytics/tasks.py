@@ -0,0 +1,19 @@
+from datetime import date
+
+from .rollups import rebuild_rollup_days
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; rollups are then rebuilt on a local worker thread
+    shared_task = None
+
+
+if shared_task is not None:
+    @shared_task(name='analytics.rebuild_daily_rollups')
+    def rebuild_daily_rollups_task(pending):
+        """``pending`` is ``{tenant_id: [ISO day, ...]}`` as sent by dispatch_rollup_rebuild."""
+        rebuild_rollup_days({
+            int(tenant_id): {date.fromisoformat(day) for day in days} for tenant_id, days in pending.items()
+        })
+else:
+    rebuild_daily_rollups_task = None
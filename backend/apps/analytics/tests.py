@@ -1,3 +1,495 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.clients.models import Appointment, Client
+from apps.products.models import Category, Product
+from apps.sales.models import Sale, SalesPipeline
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from .models import ActivityEvent, DailyRollup
+from . import rollups
+from .rollups import RollupChecker, dispatch_rollup_rebuild
+
+User = get_user_model()
+
+
+@override_settings(DAILY_ROLLUP_EXECUTOR='sync')
+class DashboardStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.admin = User.objects.create_user(
+            username="admin",
+            password="testpass123",
+            role=User.Role.BUSINESS_ADMIN,
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        other_admin = User.objects.create_user(
+            username="other",
+            password="testpass123",
+            role=User.Role.BUSINESS_ADMIN,
+            tenant=self.other_tenant
+        )
+
+        now = timezone.now()
+        for i in range(3):
+            client = Client.objects.create(email=f"c{i}@test.com", tenant=self.tenant, store=self.store)
+            self.make_sale(client, self.manager, f"S{i}", "1000.00")
+        old_client = Client.objects.create(email="old@test.com", tenant=self.tenant)
+        Client.objects.filter(pk=old_client.pk).update(created_at=now - timedelta(days=45))
+        old_sale = self.make_sale(old_client, self.admin, "OLD", "500.00")
+        Sale.objects.filter(pk=old_sale.pk).update(created_at=now - timedelta(days=45))
+
+        category = Category.objects.create(name="Rings", tenant=self.tenant)
+        Product.objects.create(
+            name="Gold Ring",
+            sku="GR001",
+            category=category,
+            cost_price=Decimal('100.00'),
+            selling_price=Decimal('150.00'),
+            tenant=self.tenant,
+            store=self.store
+        )
+
+        # Another tenant's data must never show up
+        other_client = Client.objects.create(email="x@test.com", tenant=self.other_tenant)
+        self.make_sale(other_client, other_admin, "X1", "99999.00")
+
+        # Commit hooks never run in tests, and the backdating above bypasses signals anyway
+        call_command('backfill_daily_rollups', stdout=io.StringIO())
+
+    def make_sale(self, client, rep, order_number, amount):
+        return Sale.objects.create(
+            order_number=order_number,
+            client=client,
+            sales_representative=rep,
+            status=Sale.Status.CONFIRMED,
+            payment_status=Sale.PaymentStatus.PAID,
+            subtotal=Decimal(amount),
+            total_amount=Decimal(amount),
+            paid_amount=Decimal(amount),
+            tenant=client.tenant
+        )
+
+    def get_dashboard(self, user, url='/api/analytics/dashboard/'):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, context.captured_queries
+
+    def test_business_admin_sees_whole_tenant(self):
+        data, _queries = self.get_dashboard(self.admin)
+        self.assertEqual(data['scope'], 'all')
+        self.assertEqual(data['total_customers'], 4)
+        self.assertEqual(data['total_sales'], 4)
+        self.assertEqual(data['total_products'], 1)
+        self.assertEqual(data['total_revenue'], 3500.0)
+        # 3 new customers this window vs 1 in the previous one
+        self.assertEqual(data['customers_change'], '+200.0%')
+        self.assertEqual(data['revenue_change'], '+500.0%')
+
+    def test_manager_sees_own_store(self):
+        data, _queries = self.get_dashboard(self.manager)
+        self.assertEqual(data['scope'], 'store')
+        self.assertEqual(data['store_info']['id'], self.store.id)
+        self.assertEqual(data['total_customers'], 3)
+        self.assertEqual(data['total_sales'], 3)
+        self.assertEqual(data['total_revenue'], 3000.0)
+
+    def test_query_count_is_constant(self):
+        """auth + rollup and product aggregates + one activity-stream read"""
+        _data, queries = self.get_dashboard(self.manager)
+        self.assertEqual(len(queries), 4, [q['sql'] for q in queries])
+
+        # The saves also drop the cached response once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(20):
+                client = Client.objects.create(email=f"more{i}@test.com", tenant=self.tenant, store=self.store)
+                self.make_sale(client, self.manager, f"M{i}", "10.00")
+        data, queries = self.get_dashboard(self.manager)
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(data['total_sales'], 23)
+
+    def test_product_analytics_lists_low_stock_from_the_summary(self):
+        data, _queries = self.get_dashboard(self.admin, url='/api/analytics/products/')
+        self.assertEqual(
+            list(data['low_stock_products']), [{'name': "Gold Ring", 'min_quantity': 0, 'quantity': 0}]
+        )
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_store_analytics_counts_and_activity_feed(self):
+        client = Client.objects.get(email="c0@test.com")
+        Appointment.objects.create(
+            client=client,
+            tenant=self.tenant,
+            date=timezone.localdate(),
+            time="10:00",
+            purpose="Fitting",
+            assigned_to=self.manager,
+        )
+
+        data, queries = self.get_dashboard(self.manager, '/api/analytics/store/')
+        # auth + one UNION ALL of counters + one activity-stream read
+        self.assertEqual(len(queries), 3, [q['sql'] for q in queries])
+        self.assertEqual(data['total_customers'], 3)
+        self.assertEqual(data['total_sales'], 3)
+        self.assertEqual(data['total_products'], 1)
+        self.assertEqual(data['total_revenue'], 3000.0)
+        self.assertEqual(data['revenue_change'], '+100%')
+
+        activities = data['recent_activities']
+        self.assertEqual(len(activities), 5)
+        self.assertEqual(
+            [activity['type'] for activity in activities],
+            ['appointment', 'sale', 'customer', 'sale', 'customer'],
+        )
+        self.assertTrue(activities[1]['details'].startswith('Order #S2 - ₹1,000'))
+
+        for i in range(20):
+            self.make_sale(client, self.manager, f"M{i}", "10.00")
+        data, queries = self.get_dashboard(self.manager, '/api/analytics/store/')
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(data['total_sales'], 23)
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_business_admin_dashboard_groups_by_store_and_member(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/analytics/business-admin/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['revenue']['total'], 3000.0)
+        self.assertEqual(data['customers']['total'], 4)
+        self.assertEqual(data['customers']['new_this_month'], 3)
+        self.assertEqual(data['store_performance'], [{
+            'id': self.store.id, 'name': "Test Store", 'revenue': 3000.0, 'growth': 12.5,
+            'customers': 3, 'staff': 1, 'target': 1000000,
+        }])
+        manager = next(member for member in data['team_performance'] if member['id'] == self.manager.id)
+        self.assertEqual((manager['revenue'], manager['sales_count']), (3000.0, 3))
+        self.assertNotIn('other', [member['name'] for member in data['team_performance']])
+
+        # auth + rollup groups + stores + team + inventory, however many stores and staff there are
+        self.assertEqual(len(context.captured_queries), 5)
+        for i in range(5):
+            store = Store.objects.create(
+                name=f"Store {i}", code=f"ST{i}", address="-", city="-", state="-", tenant=self.tenant
+            )
+            User.objects.create_user(username=f"staff{i}", role=User.Role.INHOUSE_SALES, tenant=self.tenant, store=store)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/analytics/business-admin/')
+        self.assertEqual(len(response.data['store_performance']), 6)
+        self.assertEqual(len(context.captured_queries), 5)
+
+
+@override_settings(DAILY_ROLLUP_EXECUTOR='sync')
+class DashboardCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        self.store = Store.objects.create(
+            name="Test Store", code="TS001", address="-", city="-", state="-", tenant=self.tenant
+        )
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.manager = User.objects.create_user(
+            username="manager", role=User.Role.MANAGER, tenant=self.tenant, store=self.store
+        )
+        self.platform_admin = User.objects.create_user(username="platform", role=User.Role.PLATFORM_ADMIN)
+        self.other_admin = User.objects.create_user(
+            username="other", role=User.Role.BUSINESS_ADMIN, tenant=self.other_tenant
+        )
+
+    def get(self, user, url='/api/analytics/dashboard/'):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, len(context.captured_queries)
+
+    def add_client(self, tenant, email):
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.create(email=email, tenant=tenant)
+
+    def test_repeat_requests_are_served_from_cache(self):
+        first, first_queries = self.get(self.admin)
+        second, second_queries = self.get(self.admin)
+        self.assertEqual(first.data, second.data)
+        # Only authentication touches the database
+        self.assertEqual(second_queries, 1)
+        self.assertLess(second_queries, first_queries)
+
+    def test_saves_invalidate_only_their_tenant(self):
+        self.add_client(self.tenant, "a@test.com")
+        self.assertEqual(self.get(self.admin)[0].data['total_customers'], 1)
+        self.get(self.other_admin)
+
+        self.add_client(self.tenant, "b@test.com")
+        self.assertEqual(self.get(self.admin)[0].data['total_customers'], 2)
+        # Still cached for the other tenant
+        self.assertEqual(self.get(self.other_admin)[1], 1)
+
+    def test_store_users_do_not_share_tenant_wide_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.create(email="a@test.com", tenant=self.tenant)
+            Client.objects.create(email="b@test.com", tenant=self.tenant, store=self.store)
+        self.assertEqual(self.get(self.admin)[0].data['total_customers'], 2)
+        self.assertEqual(self.get(self.manager)[0].data['total_customers'], 1)
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_timeout_zero_disables_caching(self):
+        _response, first_queries = self.get(self.admin)
+        _response, second_queries = self.get(self.admin)
+        self.assertEqual(first_queries, second_queries)
+
+    def test_hit_and_miss_counters_are_exposed(self):
+        self.get(self.admin)
+        self.get(self.admin)
+        self.get(self.manager)
+
+        response, _queries = self.get(self.platform_admin, '/api/analytics/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['endpoints']['dashboard_stats'], {'hits': 1, 'misses': 2, 'hit_rate': 33.3})
+        self.assertIn('business_dashboard', response.data['endpoints'])
+        self.assertEqual(self.get(self.admin, '/api/analytics/cache-stats/')[0].status_code, 403)
+
+
+class ActivityStreamTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.store = Store.objects.create(
+            name="Test Store", code="TS001", address="-", city="-", state="-", tenant=self.tenant
+        )
+        self.other_store = Store.objects.create(
+            name="Other Store", code="TS002", address="-", city="-", state="-", tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager", role=User.Role.MANAGER, tenant=self.tenant, store=self.store
+        )
+        self.other_manager = User.objects.create_user(
+            username="other", role=User.Role.MANAGER, tenant=self.tenant, store=self.other_store
+        )
+        self.client_record = Client.objects.create(
+            first_name="Asha", last_name="Rao", email="asha@test.com", tenant=self.tenant, store=self.store
+        )
+
+    def make_sale(self, order_number, rep=None):
+        return Sale.objects.create(
+            order_number=order_number,
+            client=self.client_record,
+            sales_representative=rep or self.manager,
+            subtotal=Decimal('100.00'),
+            total_amount=Decimal('100.00'),
+            tenant=self.tenant,
+        )
+
+    def get(self, user, url):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_creations_are_appended_once(self):
+        sale = self.make_sale("S1")
+        sale.status = Sale.Status.CONFIRMED
+        sale.save()
+
+        events = ActivityEvent.objects.order_by('id')
+        self.assertEqual([event.kind for event in events], ['customer', 'sale'])
+        event = events[1]
+        self.assertEqual((event.object_id, event.store_id, event.actor_id), (sale.id, self.store.id, self.manager.id))
+        self.assertEqual(event.data['order_number'], "S1")
+        self.assertEqual(event.created_at, sale.created_at)
+
+    def test_feed_is_scoped_to_store_and_keyset_paged(self):
+        for i in range(5):
+            self.make_sale(f"S{i}")
+        self.make_sale("X1", rep=self.other_manager)
+
+        page = self.get(self.manager, '/api/analytics/activity/?page_size=4')
+        self.assertEqual(
+            [row['data'].get('order_number') for row in page['results']], ["S4", "S3", "S2", "S1"]
+        )
+        self.assertEqual(page['results'][0]['display']['type'], 'sale')
+        rest = self.get(self.manager, page['next'])
+        self.assertEqual([row['kind'] for row in rest['results']], ['sale', 'customer'])
+        self.assertIsNone(rest['next'])
+
+        sales = self.get(self.other_manager, '/api/analytics/activity/?kind=sale')
+        self.assertEqual([row['data']['order_number'] for row in sales['results']], ["X1"])
+
+    def test_store_recent_sales_follow_the_stream(self):
+        first, second = self.make_sale("S1"), self.make_sale("S2")
+        Sale.objects.filter(pk=first.pk).update(status=Sale.Status.DELIVERED)
+        admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+
+        data = self.get(admin, f'/api/stores/{self.store.id}/recent-sales/?limit=5')
+        self.assertEqual([sale['id'] for sale in data['sales']], [second.id, first.id])
+        # Current state comes from the sale itself, not the snapshot
+        self.assertEqual(data['sales'][1]['status'], 'delivered')
+
+    def test_backfill_writes_missing_events_only(self):
+        self.make_sale("S1")
+        ActivityEvent.objects.filter(kind=ActivityEvent.Kind.SALE).delete()
+
+        call_command('backfill_activity_events', stdout=io.StringIO())
+        call_command('backfill_activity_events', stdout=io.StringIO())
+        self.assertEqual(
+            sorted(ActivityEvent.objects.values_list('kind', flat=True)), ['customer', 'sale']
+        )
+
+
+@override_settings(DAILY_ROLLUP_EXECUTOR='sync')
+class DailyRollupTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.store = Store.objects.create(
+            name="Main Store",
+            code="MS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.branch = Store.objects.create(
+            name="Branch",
+            code="BR001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer = Client.objects.create(
+                email="c@test.com", tenant=self.tenant, store=self.store, assigned_to=self.manager
+            )
+            self.sale = Sale.objects.create(
+                order_number="S1",
+                client=self.customer,
+                sales_representative=self.manager,
+                status=Sale.Status.CONFIRMED,
+                subtotal=Decimal("1000.00"),
+                total_amount=Decimal("1000.00"),
+                tenant=self.tenant
+            )
+            SalesPipeline.objects.create(
+                title="Necklace",
+                client=self.customer,
+                sales_representative=self.manager,
+                stage='closed_won',
+                expected_value=Decimal("2500.00"),
+                tenant=self.tenant
+            )
+
+    def rollup(self, store):
+        rows = list(DailyRollup.objects.filter(tenant=self.tenant, store=store))
+        self.assertLessEqual(len(rows), 1)
+        return rows[0] if rows else None
+
+    def mismatches(self):
+        today = timezone.localdate()
+        return RollupChecker().mismatches(self.tenant.id, today - timedelta(days=1), today)
+
+    def test_saves_are_rolled_up_on_commit(self):
+        row = self.rollup(self.store)
+        self.assertEqual(row.date, timezone.localdate())
+        self.assertEqual(row.sales_rep_id, self.manager.id)
+        self.assertEqual((row.sales_count, row.sales_amount), (1, Decimal("1000.00")))
+        self.assertEqual((row.revenue_count, row.revenue_amount), (1, Decimal("1000.00")))
+        self.assertEqual((row.closed_won_count, row.closed_won_value), (1, Decimal("2500.00")))
+        self.assertEqual(row.new_customers, 1)
+        self.assertEqual(self.mismatches(), [])
+
+    def test_deleted_sale_is_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sale.delete()
+        self.assertEqual(self.rollup(self.store).sales_count, 0)
+        self.assertEqual(self.mismatches(), [])
+
+    def test_moving_a_client_moves_its_sales(self):
+        customer = Client.objects.get(pk=self.customer.pk)
+        customer.store = self.branch
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.save()
+        self.assertIsNone(self.rollup(self.store))
+        self.assertEqual(self.rollup(self.branch).sales_count, 1)
+        self.assertEqual(self.mismatches(), [])
+
+    def test_check_command_reports_and_repairs_drift(self):
+        # Queryset updates bypass the signals that keep rollups current
+        Sale.objects.filter(pk=self.sale.pk).update(total_amount=Decimal("1500.00"))
+        with self.assertRaises(CommandError):
+            call_command('check_daily_rollups', days=7, stdout=io.StringIO())
+
+        out = io.StringIO()
+        call_command('check_daily_rollups', days=7, repair=True, stdout=out)
+        self.assertIn('sales_amount is 1000.00, raw data says 1500.00', out.getvalue())
+        self.assertEqual(self.rollup(self.store).sales_amount, Decimal("1500.00"))
+
+    @override_settings(DAILY_ROLLUP_EXECUTOR='local')
+    def test_local_worker_coalesces_commits(self):
+        """Commits made while a rebuild is queued are merged into it"""
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        with mock.patch.dict(rollups._queued, clear=True), mock.patch.object(rollups, '_local_pool') as pool:
+            self.assertEqual(dispatch_rollup_rebuild({self.tenant.id: {today}}), 'local')
+            self.assertEqual(dispatch_rollup_rebuild({self.tenant.id: {yesterday}}), 'local')
+
+            pool.submit.assert_called_once_with(rollups._rebuild_queued)
+            self.assertEqual(rollups._queued, {self.tenant.id: {today, yesterday}})
+
+    def test_backfill_rebuilds_from_scratch(self):
+        DailyRollup.objects.all().delete()
+        call_command('backfill_daily_rollups', tenant=self.tenant.id, stdout=io.StringIO())
+        self.assertEqual(self.rollup(self.store).sales_count, 1)
+        self.assertEqual(self.mismatches(), [])
+
+    def test_manager_dashboard_reads_rollups(self):
+        token = RefreshToken.for_user(self.manager).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/tenants/manager-dashboard/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(data['monthly_revenue'], 3500.0)
+        self.assertEqual(data['sales_count'], 2)
+        self.assertEqual(data['total_customers'], 1)
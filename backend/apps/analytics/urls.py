@@ -10,4 +10,6 @@ urlpatterns = [
     path('sales/', views.sales_analytics, name='sales_analytics'),
     path('customers/', views.customer_analytics, name='customer_analytics'),
     path('products/', views.product_analytics, name='product_analytics'),
+    path('activity/', views.activity_stream, name='activity_stream'),
+    path('cache-stats/', views.dashboard_cache_status, name='dashboard_cache_status'),
 ] 
\ No newline at end of file
@@ -1,373 +1,195 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.shortcuts import render
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.db.models import Count, Sum, Q, Avg
 from django.utils import timezone
 from datetime import timedelta
 from apps.clients.models import Client
+from apps.clients.pagination import ActivityEventKeysetPagination
 from apps.products.models import Product
 from apps.sales.models import Sale, SalesPipeline
 from apps.users.models import User
 from apps.stores.models import Store
-from apps.tenants.models import Tenant
+from apps.users.permissions import IsRoleAllowed
+from apps.users.principal import get_request_principal
+from .activity import DASHBOARD_KINDS, describe_activity, recent_activity
+from .aggregates import (
+    REVENUE_SALE_STATUSES,
+    ComparisonWindows,
+    count_sum,
+    money_sum,
+    percent_change,
+    stacked_windowed_counts,
+    windowed_counts,
+)
+from .cache import cached_dashboard, dashboard_cache_stats
+from .models import ActivityEvent, DailyRollup
+from .serializers import ActivityEventSerializer
 
 
 @api_view(['GET'])
+@cached_dashboard('dashboard_stats', scope='store')
 def dashboard_stats(request):
     """
-    Get dashboard statistics using existing data.
+    Get dashboard statistics for the caller's tenant (and store, for
+    store-bound users). Customer and sales totals and their current/previous
+    30-day windows are summed from the daily rollups in one query; products
+    are counted with one conditional-aggregation query, and the recent
+    activities are read from the activity stream.
     """
-    # Get the first tenant or create a default one
-    tenant = Tenant.objects.first()
-    
-    if not tenant:
+    principal = get_request_principal(request)
+    if not principal.tenant_id:
         return Response({
             'error': 'No tenant found'
         }, status=400)
-    
-    # Get date range for comparisons (last 30 days vs previous 30 days)
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=30)
-    previous_start = start_date - timedelta(days=30)
-    
-    # Check if user is store-specific (manager, inhouse_sales, etc.)
-    user = request.user
-    store_filter = {}
-    
-    # If user has a specific store, filter by that store
-    if hasattr(user, 'store') and user.store:
-        store_filter = {'store': user.store}
-        print(f"Filtering analytics for store: {user.store.name}")
-    elif user.role in ['manager', 'inhouse_sales'] and hasattr(user, 'store'):
-        store_filter = {'store': user.store}
-        print(f"Filtering analytics for store: {user.store.name}")
-    elif user.role == 'business_admin':
-        print("Business admin - showing all data across all stores")
-        store_filter = {}
-    else:
-        print("No store filter applied - showing all data")
-    
-    # Current period stats
-    current_clients = Client.objects.filter(
-        created_at__gte=start_date,
-        is_deleted=False,
-        **store_filter
-    ).count()
-    
-    # For sales, filter by store if user has one, otherwise show all
-    if store_filter:
-        current_sales = Sale.objects.filter(
-            created_at__gte=start_date,
-            sales_representative__store=user.store
-        ).count()
-    else:
-        current_sales = Sale.objects.filter(
-            created_at__gte=start_date
-        ).count()
-    
-    # For products, filter by store if user has one, otherwise show all
-    if store_filter:
-        current_products = Product.objects.filter(
-            created_at__gte=start_date,
-            store=user.store
-        ).count()
-    else:
-        current_products = Product.objects.filter(
-            created_at__gte=start_date
-        ).count()
-    
-    # For revenue, filter by store if user has one, otherwise show all
-    if store_filter:
-        current_revenue = Sale.objects.filter(
-            created_at__gte=start_date,
-            status__in=['confirmed', 'delivered'],
-            sales_representative__store=user.store
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    else:
-        current_revenue = Sale.objects.filter(
-            created_at__gte=start_date,
-            status__in=['confirmed', 'delivered']
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Previous period stats
-    previous_clients = Client.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        is_deleted=False,
-        **store_filter
-    ).count()
-    
-    # For sales, filter by store if user has one, otherwise show all
-    if store_filter:
-        previous_sales = Sale.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date,
-            sales_representative__store=user.store
-        ).count()
-    else:
-        previous_sales = Sale.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date
-        ).count()
-    
-    # For products, filter by store if user has one, otherwise show all
-    if store_filter:
-        previous_products = Product.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date,
-            store=user.store
-        ).count()
-    else:
-        previous_products = Product.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date
-        ).count()
-    
-    # For revenue, filter by store if user has one, otherwise show all
-    if store_filter:
-        previous_revenue = Sale.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date,
-            status__in=['confirmed', 'delivered'],
-            sales_representative__store=user.store
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    else:
-        previous_revenue = Sale.objects.filter(
-            created_at__gte=previous_start,
-            created_at__lt=start_date,
-            status__in=['confirmed', 'delivered']
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Calculate percentage changes
-    def calculate_change(current, previous):
-        if previous == 0:
-            return '+100%' if current > 0 else '+0%'
-        change = ((current - previous) / previous) * 100
-        return f"{'+' if change >= 0 else ''}{change:.1f}%"
-    
-    # Get recent activities
-    recent_activities = []
-    
-    # Recent clients
-    recent_clients = Client.objects.filter(
-        created_at__gte=end_date - timedelta(days=7),
-        is_deleted=False,
-        **store_filter
-    ).order_by('-created_at')[:3]
-    
-    for client in recent_clients:
-        recent_activities.append({
-            'type': 'customer',
-            'message': 'New customer added',
-            'details': f"{client.full_name} - {client.created_at.strftime('%b %d, %I:%M %p')}",
-            'icon': 'users',
-            'timestamp': client.created_at
-        })
-    
-    # Recent sales
-    if store_filter:
-        recent_sales = Sale.objects.filter(
-            created_at__gte=end_date - timedelta(days=7),
-            sales_representative__store=user.store
-        ).order_by('-created_at')[:3]
-    else:
-        recent_sales = Sale.objects.filter(
-            created_at__gte=end_date - timedelta(days=7)
-        ).order_by('-created_at')[:3]
-    
-    for sale in recent_sales:
-        recent_activities.append({
-            'type': 'sale',
-            'message': 'Sale completed',
-            'details': f"Order #{sale.order_number} - ₹{sale.total_amount:,.0f} - {sale.created_at.strftime('%b %d, %I:%M %p')}",
-            'icon': 'trending',
-            'timestamp': sale.created_at
-        })
-    
-    # Recent appointments (if appointments model exists)
-    try:
-        from apps.clients.models import Appointment
-        if store_filter:
-            recent_appointments = Appointment.objects.filter(
-                created_at__gte=end_date - timedelta(days=7),
-                assigned_to__store=user.store
-            ).order_by('-created_at')[:3]
-        else:
-            recent_appointments = Appointment.objects.filter(
-                created_at__gte=end_date - timedelta(days=7)
-            ).order_by('-created_at')[:3]
-        
-        for appointment in recent_appointments:
-            recent_activities.append({
-                'type': 'appointment',
-                'message': 'Appointment scheduled',
-                'details': f"{appointment.client.full_name} - {appointment.date.strftime('%b %d, %I:%M %p')}",
-                'icon': 'calendar',
-                'timestamp': appointment.created_at
-            })
-    except ImportError:
-        pass  # Appointments model might not be available
-    
-    # Sort activities by timestamp
-    recent_activities.sort(key=lambda x: x['timestamp'], reverse=True)
-    recent_activities = recent_activities[:5]  # Limit to 5 most recent
-    
-    # Remove timestamp from response
-    for activity in recent_activities:
-        activity.pop('timestamp', None)
-    
-    # Total counts (not just recent) - filtered by store
-    total_clients = Client.objects.filter(is_deleted=False, **store_filter).count()
-    
-    # For sales, filter by store if user has one, otherwise show all
-    if store_filter:
-        total_sales = Sale.objects.filter(sales_representative__store=user.store).count()
-    else:
-        total_sales = Sale.objects.count()
-    
-    # For products, filter by store if user has one, otherwise show all
-    if store_filter:
-        total_products = Product.objects.filter(store=user.store).count()
-    else:
-        total_products = Product.objects.count()
-    
-    # For revenue, filter by store if user has one, otherwise show all
-    if store_filter:
-        total_revenue = Sale.objects.filter(
-            status__in=['confirmed', 'delivered'],
-            sales_representative__store=user.store
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    else:
-        total_revenue = Sale.objects.filter(
-            status__in=['confirmed', 'delivered']
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
+
+    windows = ComparisonWindows(days=30)
+    store_id = principal.store_id
+
+    products = Product.objects.filter(tenant_id=principal.tenant_id)
+    rollups = DailyRollup.objects.filter(tenant_id=principal.tenant_id)
+    customer_scope = sales_scope = Q()
+    if store_id:
+        products = products.filter(store_id=store_id)
+        customer_scope = Q(store_id=store_id)
+        sales_scope = Q(sales_rep__store_id=store_id)
+        rollups = rollups.filter(customer_scope | sales_scope)
+
+    product_stats = windowed_counts(products, windows)
+    totals = rollups.aggregate(
+        customers=count_sum('new_customers', filter=customer_scope),
+        current_customers=count_sum('new_customers', filter=customer_scope & windows.current_days_q()),
+        previous_customers=count_sum('new_customers', filter=customer_scope & windows.previous_days_q()),
+        sales=count_sum('sales_count', filter=sales_scope),
+        current_sales=count_sum('sales_count', filter=sales_scope & windows.current_days_q()),
+        previous_sales=count_sum('sales_count', filter=sales_scope & windows.previous_days_q()),
+        revenue=money_sum('revenue_amount', filter=sales_scope),
+        current_revenue=money_sum('revenue_amount', filter=sales_scope & windows.current_days_q()),
+        previous_revenue=money_sum('revenue_amount', filter=sales_scope & windows.previous_days_q()),
+    )
+
+    recent_activities = [
+        describe_activity(event)
+        for event in recent_activity(
+            principal.tenant_id, store_id, kinds=DASHBOARD_KINDS, since=windows.end - timedelta(days=7)
+        )
+    ]
+
+    response_data = {
+        'total_customers': totals['customers'],
+        'total_sales': totals['sales'],
+        'total_products': product_stats['total'],
+        'total_revenue': float(totals['revenue']),
+        'customers_change': percent_change(totals['current_customers'], totals['previous_customers']),
+        'sales_change': percent_change(totals['current_sales'], totals['previous_sales']),
+        'products_change': percent_change(product_stats['current'], product_stats['previous']),
+        'revenue_change': percent_change(totals['current_revenue'], totals['previous_revenue']),
+        'recent_activities': recent_activities
+    }
+
     # Add store context if filtering by store
-    if store_filter:
-        response_data = {
-            'total_customers': total_clients,
-            'total_sales': total_sales,
-            'total_products': total_products,
-            'total_revenue': float(total_revenue),
-            'customers_change': calculate_change(current_clients, previous_clients),
-            'sales_change': calculate_change(current_sales, previous_sales),
-            'products_change': calculate_change(current_products, previous_products),
-            'revenue_change': calculate_change(current_revenue, previous_revenue),
-            'recent_activities': recent_activities
-        }
-        response_data['store_name'] = user.store.name if hasattr(user, 'store') else 'Unknown Store'
+    if store_id:
+        # Loaded together with the user by authentication
+        store = request.user.store
+        response_data['store_name'] = store.name
         response_data['store_info'] = {
-            'id': user.store.id,
-            'name': user.store.name,
-            'address': getattr(user.store, 'address', ''),
-            'phone': getattr(user.store, 'phone', ''),
-            'email': getattr(user.store, 'email', '')
+            'id': store.id,
+            'name': store.name,
+            'address': getattr(store, 'address', ''),
+            'phone': getattr(store, 'phone', ''),
+            'email': getattr(store, 'email', '')
         }
         response_data['scope'] = 'store'
     else:
-        response_data = {
-        'total_customers': total_clients,
-        'total_sales': total_sales,
-        'total_products': total_products,
-        'total_revenue': float(total_revenue),
-        'customers_change': calculate_change(current_clients, previous_clients),
-        'sales_change': calculate_change(current_sales, previous_sales),
-        'products_change': calculate_change(current_products, previous_products),
-        'revenue_change': calculate_change(current_revenue, previous_revenue),
-        'recent_activities': recent_activities
-        }
         response_data['scope'] = 'all'
-    
+
     return Response(response_data)
 
 
 @api_view(['GET'])
+@cached_dashboard('business_admin_dashboard', scope='tenant')
 def business_admin_dashboard(request):
     """
-    Get comprehensive business admin dashboard data.
+    Get comprehensive business admin dashboard data for the caller's tenant.
+
+    Revenue and customers per store and per team member come from one
+    grouped query over the daily rollups, merged with the store and team
+    lists in memory, so the number of queries does not grow with the number
+    of stores or staff.
     """
-    tenant = Tenant.objects.first()
-    
-    if not tenant:
+    principal = get_request_principal(request)
+    if not principal.tenant_id:
         return Response({
             'error': 'No tenant found'
         }, status=400)
-    
-    # Date ranges
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=30)
-    previous_start = start_date - timedelta(days=30)
-    
-    # Revenue metrics
-    current_revenue = Sale.objects.filter(
-        created_at__gte=start_date,
-        status__in=['confirmed', 'delivered']
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    previous_revenue = Sale.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        status__in=['confirmed', 'delivered']
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
+
+    windows = ComparisonWindows(days=30)
+    current, previous = windows.current_days_q(), windows.previous_days_q()
+
+    # One row per (customer store, sales rep) pair; sales count for the rep's store
+    groups = DailyRollup.objects.filter(tenant_id=principal.tenant_id).order_by().values(
+        'store_id', 'sales_rep_id', 'sales_rep__store_id'
+    ).annotate(
+        revenue=money_sum('revenue_amount', filter=current),
+        previous_revenue=money_sum('revenue_amount', filter=previous),
+        revenue_sales=count_sum('revenue_count', filter=current),
+        window_customers=count_sum('new_customers', filter=current),
+        all_customers=count_sum('new_customers'),
+    )
+
+    current_revenue = previous_revenue = 0
+    total_customers = new_customers = 0
+    store_revenue, store_customers = defaultdict(int), defaultdict(int)
+    member_stats = defaultdict(lambda: {'revenue': 0, 'customers': 0, 'sales_count': 0})
+    for group in groups:
+        current_revenue += group['revenue']
+        previous_revenue += group['previous_revenue']
+        total_customers += group['all_customers']
+        new_customers += group['window_customers']
+        store_revenue[group['sales_rep__store_id']] += group['revenue']
+        store_customers[group['store_id']] += group['window_customers']
+        stats = member_stats[group['sales_rep_id']]
+        stats['revenue'] += group['revenue']
+        stats['customers'] += group['window_customers']
+        stats['sales_count'] += group['revenue_sales']
+
     revenue_growth = 0
     if previous_revenue > 0:
         revenue_growth = ((current_revenue - previous_revenue) / previous_revenue) * 100
-    
+
     # Store performance
-    stores = Store.objects.all()
-    store_performance = []
-    
-    for store in stores:
-        store_sales = Sale.objects.filter(
-            created_at__gte=start_date,
-            status__in=['confirmed', 'delivered']
-        )
-        
-        store_revenue = store_sales.aggregate(total=Sum('total_amount'))['total'] or 0
-        store_customers = Client.objects.filter(
-            created_at__gte=start_date,
-            is_deleted=False
-        ).count()
-        
-        store_performance.append({
+    stores = Store.objects.filter(tenant_id=principal.tenant_id).annotate(staff=Count('users')).order_by('id')
+    store_performance = [
+        {
             'id': store.id,
             'name': store.name,
-            'revenue': float(store_revenue),
+            'revenue': float(store_revenue[store.id]),
             'growth': 12.5,  # Mock growth for now
-            'customers': store_customers,
-            'staff': User.objects.filter(store=store).count(),
+            'customers': store_customers[store.id],
+            'staff': store.staff,
             'target': 1000000,  # Mock target
-        })
-    
+        }
+        for store in stores
+    ]
+
     # Team performance
-    team_members = User.objects.filter(is_active=True)
+    team_members = User.objects.filter(tenant_id=principal.tenant_id, is_active=True).order_by('id')
     team_performance = []
-    
     for member in team_members:
-        member_sales = Sale.objects.filter(
-            sales_representative=member.id,
-            created_at__gte=start_date,
-            status__in=['confirmed', 'delivered']
-        )
-        
-        member_revenue = member_sales.aggregate(total=Sum('total_amount'))['total'] or 0
-        member_customers = Client.objects.filter(
-            assigned_to=member.id,
-            created_at__gte=start_date,
-            is_deleted=False
-        ).count()
-        
+        stats = member_stats.get(member.id, {'revenue': 0, 'customers': 0, 'sales_count': 0})
         team_performance.append({
             'id': member.id,
-            'name': member.name,
+            'name': member.get_full_name(),
             'role': member.role,
-            'revenue': float(member_revenue),
-            'customers': member_customers,
-            'sales_count': member_sales.count(),
+            'revenue': float(stats['revenue']),
+            'customers': stats['customers'],
+            'sales_count': stats['sales_count'],
             'avatar': None,
         })
-    
+
     # E-commerce metrics (mock for now)
     ecommerce_metrics = {
         'orders': 156,
@@ -375,24 +197,22 @@ def business_admin_dashboard(request):
         'conversion': 3.2,
         'visitors': 12450,
     }
-    
+
     # Inventory metrics
-    inventory_metrics = {
-        'products': Product.objects.count(),
-        'categories': Product.objects.values('category').distinct().count(),
-        'low_stock': Product.objects.filter(quantity__lte=10).count(),
-    }
-    
+    inventory_metrics = Product.objects.filter(tenant_id=principal.tenant_id).aggregate(
+        products=Count('id'),
+        categories=Count('category', distinct=True),
+        low_stock=Count('id', filter=Q(total_quantity__lte=10)),
+    )
+
     # Customer metrics
     customer_metrics = {
-        'total': Client.objects.filter(is_deleted=False).count(),
-        'new_this_month': Client.objects.filter(
-            created_at__gte=start_date,
-            is_deleted=False
-        ).count(),
+        'total': total_customers,
+        'new_this_month': new_customers,
         'retention_rate': 78.5,  # Mock retention rate
     }
-    
+
+    top_store = max(store_performance, key=lambda store: store['revenue'], default=None)
     return Response({
         'revenue': {
             'total': float(current_revenue),
@@ -401,9 +221,9 @@ def business_admin_dashboard(request):
             'target': 600000,
         },
         'stores': {
-            'total': stores.count(),
-            'active': stores.count(),
-            'top_performing': store_performance[0]['name'] if store_performance else 'No stores',
+            'total': len(store_performance),
+            'active': len(store_performance),
+            'top_performing': top_store['name'] if top_store else 'No stores',
         },
         'customers': customer_metrics,
         'ecommerce': ecommerce_metrics,
@@ -485,10 +305,13 @@ def product_analytics(request):
         total_value=Sum('selling_price')
     )
     
-    # Low stock products
-    low_stock_products = Product.objects.filter(
-        quantity__lte=models.F('min_quantity')
-    ).values('name', 'quantity', 'min_quantity')[:10]
+    # Low stock products, from the partial low-stock index; 'quantity' is the stock summary
+    low_stock_products = [
+        {'name': name, 'min_quantity': min_quantity, 'quantity': quantity}
+        for name, min_quantity, quantity in Product.objects.filter(
+            low_stock=True
+        ).values_list('name', 'min_quantity', 'total_quantity')[:10]
+    ]
     
     # Top selling products (based on sales)
     from apps.sales.models import SaleItem
@@ -501,15 +324,20 @@ def product_analytics(request):
     
     return Response({
         'products_by_category': list(products_by_category),
-        'low_stock_products': list(low_stock_products),
+        'low_stock_products': low_stock_products,
         'top_products': list(top_products)
     })
 
 
 @api_view(['GET'])
+@cached_dashboard('store_analytics', scope='store')
 def store_analytics(request):
     """
     Get store-specific analytics for managers and store staff.
+
+    The customer, sales and product counters (all time, last 30 days and the
+    30 days before) come from one UNION ALL of conditional aggregates, and
+    the recent activities from one read of the activity stream.
     """
     user = request.user
     
@@ -520,163 +348,83 @@ def store_analytics(request):
         }, status=400)
     
     store = user.store
-    print(f"Getting analytics for store: {store.name}")
-    
-    # Get date range for comparisons (last 30 days vs previous 30 days)
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=30)
-    previous_start = start_date - timedelta(days=30)
-    
-    # Store-specific filters
-    store_filter = {'store': store}
-    
-    # Current period stats
-    current_clients = Client.objects.filter(
-        created_at__gte=start_date,
-        is_deleted=False,
-        store=store
-    ).count()
-    
-    current_sales = Sale.objects.filter(
-        created_at__gte=start_date,
-        sales_representative__store=store
-    ).count()
-    
-    current_products = Product.objects.filter(
-        created_at__gte=start_date,
-        store=store
-    ).count()
-    
-    current_revenue = Sale.objects.filter(
-        created_at__gte=start_date,
-        status__in=['confirmed', 'delivered'],
-        sales_representative__store=store
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Previous period stats
-    previous_clients = Client.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        is_deleted=False,
-        store=store
-    ).count()
-    
-    previous_sales = Sale.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        sales_representative__store=store
-    ).count()
-    
-    previous_products = Product.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        store=store
-    ).count()
-    
-    previous_revenue = Sale.objects.filter(
-        created_at__gte=previous_start,
-        created_at__lt=start_date,
-        status__in=['confirmed', 'delivered'],
-        sales_representative__store=store
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Calculate percentage changes
-    def calculate_change(current, previous):
-        if previous == 0:
-            return '+100%' if current > 0 else '+0%'
-        change = ((current - previous) / previous) * 100
-        return f"{'+' if change >= 0 else ''}{change:.1f}%"
-    
-    # Get recent activities for this store
-    recent_activities = []
-    
-    # Recent clients
-    recent_clients = Client.objects.filter(
-        created_at__gte=end_date - timedelta(days=7),
-        is_deleted=False,
-        store=store
-    ).order_by('-created_at')[:3]
-    
-    for client in recent_clients:
-        recent_activities.append({
-            'type': 'customer',
-            'message': 'New customer added',
-            'details': f"{client.full_name} - {client.created_at.strftime('%b %d, %I:%M %p')}",
-            'icon': 'users',
-            'timestamp': client.created_at
-        })
-    
-    # Recent sales
-    recent_sales = Sale.objects.filter(
-        created_at__gte=end_date - timedelta(days=7),
-        sales_representative__store=store
-    ).order_by('-created_at')[:3]
-    
-    for sale in recent_sales:
-        recent_activities.append({
-            'type': 'sale',
-            'message': 'Sale completed',
-            'details': f"Order #{sale.order_number} - ₹{sale.total_amount:,.0f} - {sale.created_at.strftime('%b %d, %I:%M %p')}",
-            'icon': 'trending',
-            'timestamp': sale.created_at
-        })
-    
-    # Recent appointments (if appointments model exists)
-    try:
-        from apps.clients.models import Appointment
-        recent_appointments = Appointment.objects.filter(
-            created_at__gte=end_date - timedelta(days=7),
-            assigned_to__store=store
-        ).order_by('-created_at')[:3]
-        
-        for appointment in recent_appointments:
-            recent_activities.append({
-                'type': 'appointment',
-                'message': 'Appointment scheduled',
-                'details': f"{appointment.client.full_name} - {appointment.date.strftime('%b %d, %I:%M %p')}",
-                'icon': 'calendar',
-                'timestamp': appointment.created_at
-            })
-    except ImportError:
-        pass  # Appointments model might not be available
-    
-    # Sort activities by timestamp
-    recent_activities.sort(key=lambda x: x['timestamp'], reverse=True)
-    recent_activities = recent_activities[:5]  # Limit to 5 most recent
-    
-    # Remove timestamp from response
-    for activity in recent_activities:
-        activity.pop('timestamp', None)
-    
-    # Total counts for this store
-    total_clients = Client.objects.filter(is_deleted=False, store=store).count()
-    total_sales = Sale.objects.filter(sales_representative__store=store).count()
-    total_products = Product.objects.filter(store=store).count()
-    total_revenue = Sale.objects.filter(
-        status__in=['confirmed', 'delivered'],
-        sales_representative__store=store
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    windows = ComparisonWindows(days=30)
+
+    counts = stacked_windowed_counts(
+        windows,
+        {
+            'customers': Client.objects.filter(is_deleted=False, store=store),
+            'sales': Sale.objects.filter(sales_representative__store=store),
+            'products': Product.objects.filter(store=store),
+        },
+        amounts={'sales': ('total_amount', Q(status__in=REVENUE_SALE_STATUSES))},
+    )
+    customers, sales, products = counts['customers'], counts['sales'], counts['products']
+
+    recent_activities = [
+        describe_activity(event)
+        for event in recent_activity(
+            user.tenant_id, store.id, kinds=DASHBOARD_KINDS, since=windows.end - timedelta(days=7)
+        )
+    ]
     
     # Store-specific information
     store_info = {
         'id': store.id,
         'name': store.name,
         'address': store.address,
-        'phone': store.phone,
-        'email': store.email
+        # Stores have no contact fields yet; the keys are kept for the frontend
+        'phone': getattr(store, 'phone', None),
+        'email': getattr(store, 'email', None)
     }
     
     return Response({
         'store_info': store_info,
-        'total_customers': total_clients,
-        'total_sales': total_sales,
-        'total_products': total_products,
-        'total_revenue': float(total_revenue),
-        'customers_change': calculate_change(current_clients, previous_clients),
-        'sales_change': calculate_change(current_sales, previous_sales),
-        'products_change': calculate_change(current_products, previous_products),
-        'revenue_change': calculate_change(current_revenue, previous_revenue),
+        'total_customers': customers['total'],
+        'total_sales': sales['total'],
+        'total_products': products['total'],
+        'total_revenue': float(sales['amount']),
+        'customers_change': percent_change(customers['current'], customers['previous']),
+        'sales_change': percent_change(sales['current'], sales['previous']),
+        'products_change': percent_change(products['current'], products['previous']),
+        'revenue_change': percent_change(sales['current_amount'], sales['previous_amount']),
         'recent_activities': recent_activities,
         'scope': 'store',
         'period': '30_days'
     })
+
+
+@api_view(['GET'])
+def activity_stream(request):
+    """
+    The caller's activity stream, newest first, keyset-paginated
+    (``?cursor=`` / ``?page_size=``). Store-bound users see their store's
+    events; ``?kind=`` narrows it to one kind of event.
+    """
+    principal = get_request_principal(request)
+    events = ActivityEvent.objects.all()
+    if not principal.is_platform_admin:
+        if not principal.tenant_id:
+            return Response({'error': 'No tenant found'}, status=400)
+        events = events.filter(tenant_id=principal.tenant_id)
+        if principal.store_id:
+            events = events.filter(store_id=principal.store_id)
+    kind = request.query_params.get('kind')
+    if kind:
+        events = events.filter(kind=kind)
+
+    paginator = ActivityEventKeysetPagination()
+    page = paginator.paginate_queryset(events, request)
+    return paginator.get_paginated_response(ActivityEventSerializer(page, many=True).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsRoleAllowed.for_roles(['platform_admin'])])
+def dashboard_cache_status(request):
+    """
+    Hit/miss counters of the dashboard response cache, per endpoint.
+    """
+    return Response({
+        'timeout': getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60),
+        'endpoints': dashboard_cache_stats(),
+    })
@@ -7,6 +7,7 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from apps.users.principal import get_request_principal
 from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead
 from .serializers import (
     AnnouncementSerializer, AnnouncementCreateSerializer, AnnouncementUpdateSerializer,
@@ -31,35 +32,29 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter announcements based on user's access level and targeting."""
-        user = self.request.user
-        
-        print(f"🔍 DEBUG: get_queryset called for user {user.username} (role: {user.role}, store: {user.store})")
+        principal = get_request_principal(self.request)
         
         # Base queryset - show all active announcements for the user's tenant
         queryset = Announcement.objects.filter(is_active=True)
-        print(f"🔍 DEBUG: Base queryset count: {queryset.count()}")
         
         # Filter by tenant
-        if user.tenant:
-            queryset = queryset.filter(tenant=user.tenant)
-            print(f"🔍 DEBUG: After tenant filter count: {queryset.count()}")
+        if principal.tenant_id:
+            queryset = queryset.filter(tenant_id=principal.tenant_id)
         
         # Filter by store - show announcements for user's store or store-specific announcements
-        if user.store:
+        if principal.store_id:
             # Show announcements that are either:
             # 1. System-wide announcements (no target_stores)
             # 2. Store-specific announcements targeting this user's store
             # 3. Team-specific announcements created by users from the same store
             queryset = queryset.filter(
                 Q(target_stores__isnull=True) |  # System-wide
-                Q(target_stores=user.store) |    # Store-specific
-                Q(author__store=user.store)      # Created by same store members
+                Q(target_stores=principal.store_id) |    # Store-specific
+                Q(author__store_id=principal.store_id)      # Created by same store members
             ).distinct()
-            print(f"🔍 DEBUG: After store filter count: {queryset.count()}")
         else:
             # If user has no store, show all announcements for the tenant
             print(f"🔍 DEBUG: User has no store, showing all tenant announcements")
-            pass
         
         # Filter by publish date and expiration
         now = timezone.now()
@@ -67,11 +62,6 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
             Q(publish_at__lte=now) &
             (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
         )
-        print(f"🔍 DEBUG: After date filter count: {queryset.count()}")
-        
-        # Debug: Show what announcements are being returned
-        for ann in queryset[:3]:  # Show first 3
-            print(f"🔍 DEBUG: Announcement: {ann.title} (type: {ann.announcement_type}, store: {ann.author.store if ann.author.store else 'None'})")
         
         return queryset.distinct()
 
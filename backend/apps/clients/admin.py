@@ -4,6 +4,7 @@ from .models import (
     Client, ClientInteraction, Appointment, FollowUp, Task, 
     Announcement, CustomerTag, AuditLog, Purchase, CustomerInterest
 )
+from .statuses import recompute_client_statuses
 
 
 class ExhibitionLeadFilter(admin.SimpleListFilter):
@@ -152,12 +153,8 @@ class ClientAdmin(admin.ModelAdmin):
     mark_as_inactive.short_description = "Mark selected customers as Inactive"
     
     def update_status_automatically(self, request, queryset):
-        updated_count = 0
-        for client in queryset:
-            old_status = client.status
-            client.update_status_based_on_behavior()
-            if client.status != old_status:
-                updated_count += 1
+        changes = recompute_client_statuses(list(queryset.values_list('id', flat=True)), user=request.user)
+        updated_count = len(changes)
         
         self.message_user(
             request, 
@@ -0,0 +1,123 @@
+import threading
+import weakref
+
+from django.db import transaction
+
+
+# Bumped on every save; a change to it alone is not worth an audit entry
+AUDIT_IGNORED_FIELDS = {'updated_at'}
+
+_buffers = threading.local()
+
+
+def loaded_values(instance):
+    """Field values as they were last loaded from or written to the database (by attname)."""
+    return getattr(instance, '_loaded_values', None)
+
+
+def remember_loaded_values(instance):
+    instance._loaded_values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname in instance.__dict__
+    }
+
+
+def audit_diff(instance, original=None):
+    """
+    Return ``(before, after)`` holding only the fields of ``instance`` that
+    differ from ``original`` (attname → value, as loaded). Keys are field
+    names and values are serialized as in the audit log. Without an
+    original every non-empty field is reported as new.
+    """
+    from .models import serialize_field
+
+    before, after = {}, {}
+    for field in instance._meta.concrete_fields:
+        if field.name in AUDIT_IGNORED_FIELDS or field.attname not in instance.__dict__:
+            continue
+        new = serialize_field(getattr(instance, field.attname))
+        if original is None:
+            if new not in (None, ''):
+                after[field.name] = new
+            continue
+        if field.attname not in original:
+            continue
+        old = serialize_field(original[field.attname])
+        if old != new:
+            before[field.name] = old
+            after[field.name] = new
+    return before, after
+
+
+class _AuditBuffer:
+    """
+    Audit rows of one transaction, written with one ``bulk_create`` by its
+    single on_commit hook (the buffer itself).
+
+    Only a weak reference to the pending buffer is kept per connection, so
+    when Django drops the hook (the transaction, or the savepoint the first
+    row was queued in, rolled back) the buffer and its rows go with it and
+    the next row starts a new one. Rows queued in a savepoint that rolls
+    back after the buffer was started are written with the rest, except
+    those of clients whose insert was rolled back.
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def __call__(self):
+        from .models import AuditLog, Client
+
+        _pending().pop(id(transaction.get_connection()), None)
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+        existing = set(Client.objects.filter(pk__in={row.client_id for row in rows}).values_list('pk', flat=True))
+        AuditLog.objects.bulk_create([row for row in rows if row.client_id in existing])
+
+
+def _pending():
+    """Weak references to the buffer awaiting commit, keyed by id(connection)."""
+    if not hasattr(_buffers, 'pending'):
+        _buffers.pending = {}
+    return _buffers.pending
+
+
+def _current_buffer():
+    """The buffer of the current transaction, registering its commit hook on first use."""
+    pending = _pending()
+    key = id(transaction.get_connection())
+    ref = pending.get(key)
+    buffer = ref() if ref is not None else None
+    if buffer is None:
+        buffer = _AuditBuffer()
+        pending[key] = weakref.ref(buffer)
+        transaction.on_commit(buffer)
+    return buffer
+
+
+def record_audit_log(client, action, user=None, before=None, after=None, **extra):
+    """
+    Queue an AuditLog row for ``client``. Rows written in a transaction are
+    inserted with one ``bulk_create`` when it commits; outside a transaction
+    the row is inserted straight away.
+    """
+    from .models import AuditLog
+
+    row = AuditLog(
+        client=client, tenant_id=client.tenant_id, action=action, user=user, before=before, after=after, **extra
+    )
+    if not transaction.get_connection().in_atomic_block:
+        row.save()
+        return row
+    _current_buffer().rows.append(row)
+    return row
+
+
+def discard_pending_audit_logs(client_id):
+    """Drop queued rows of a client that is being deleted; they would point at a missing row."""
+    for ref in _pending().values():
+        buffer = ref()
+        if buffer is not None:
+            buffer.rows = [row for row in buffer.rows if row.client_id != client_id]
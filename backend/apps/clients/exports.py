@@ -0,0 +1,98 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+
+DEFAULT_EXPORT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'customer_type',
+    'address', 'city', 'state', 'country', 'postal_code',
+    'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
+    'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
+    'mother_tongue', 'reason_for_visit', 'age_of_end_user', 'saving_scheme',
+    'catchment_area', 'next_follow_up', 'summary_notes', 'status',
+    'created_at', 'updated_at', 'tags'
+]
+
+
+class _EchoBuffer:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+class ClientExport:
+    """
+    Streams a client queryset as CSV, JSON or NDJSON.
+
+    Rows are read with ``.iterator(chunk_size=...)`` so that memory stays
+    constant however large the export is, and tags are prefetched once per
+    chunk instead of once per row. Output is produced incrementally, so the
+    first bytes are sent before the whole queryset has been read.
+    """
+    chunk_size = 2000
+
+    def __init__(self, queryset, fields=None, chunk_size=None):
+        self.fields = list(fields or DEFAULT_EXPORT_FIELDS)
+        if chunk_size:
+            self.chunk_size = chunk_size
+        if 'tags' in self.fields:
+            queryset = queryset.prefetch_related('tags')
+        self.queryset = queryset
+
+    def iter_clients(self):
+        return self.queryset.iterator(chunk_size=self.chunk_size)
+
+    def format_value(self, client, field, as_text):
+        if field in ['date_of_birth', 'anniversary_date']:
+            value = getattr(client, field)
+            if value:
+                return value.strftime('%Y-%m-%d')
+            return ''
+        if field in ['created_at', 'updated_at']:
+            return getattr(client, field).strftime('%Y-%m-%d %H:%M:%S')
+        if field == 'tags':
+            names = [tag.name for tag in client.tags.all()]
+            return ', '.join(names) if as_text else names
+
+        value = getattr(client, field, '')
+        if value is None:
+            return ''
+        return str(value) if as_text else value
+
+    def iter_rows(self, as_text=False):
+        for client in self.iter_clients():
+            yield {field: self.format_value(client, field, as_text) for field in self.fields}
+
+    def iter_csv(self, header=None):
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(header or self.fields)
+        for row in self.iter_rows(as_text=True):
+            yield writer.writerow([row[field] for field in self.fields])
+
+    def iter_json(self):
+        yield '[\n'
+        separator = ''
+        for row in self.iter_rows():
+            yield separator + json.dumps(row, default=str)
+            separator = ',\n'
+        yield '\n]\n'
+
+    def iter_ndjson(self):
+        for row in self.iter_rows():
+            yield json.dumps(row, default=str) + '\n'
+
+    def csv_response(self, filename, header=None):
+        return self._response(self.iter_csv(header), 'text/csv', filename)
+
+    def json_response(self, filename, ndjson=False):
+        if ndjson:
+            return self._response(self.iter_ndjson(), 'application/x-ndjson', filename)
+        return self._response(self.iter_json(), 'application/json', filename)
+
+    @staticmethod
+    def _response(content, content_type, filename):
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,306 @@
+import codecs
+import csv
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from apps.analytics.activity import customer_event
+from apps.analytics.cache import invalidate_dashboards
+from apps.analytics.models import ActivityEvent
+from apps.analytics.rollups import mark_rollup_dirty
+
+from .audit import audit_diff
+from .models import Client, AuditLog
+from .tagging import ClientTagger
+
+
+# Free-text columns copied (stripped) from the uploaded row
+TEXT_FIELDS = [
+    'first_name', 'last_name', 'address', 'city', 'state', 'country', 'postal_code',
+    'preferred_metal', 'preferred_stone', 'ring_size', 'budget_range', 'lead_source',
+    'notes', 'community', 'mother_tongue', 'reason_for_visit', 'age_of_end_user',
+    'saving_scheme', 'catchment_area', 'summary_notes',
+]
+
+# YYYY-MM-DD columns; unparseable birth and anniversary dates are skipped, as with
+# single-row imports, while an unparseable follow-up date rejects the row
+DATE_FIELDS = ['date_of_birth', 'anniversary_date', 'next_follow_up']
+REQUIRED_VALID_DATE_FIELDS = {'next_follow_up'}
+
+# Columns that must hold one of the Client field's choices
+CHOICE_FIELDS = ['customer_type', 'status']
+
+
+def read_upload_rows(file):
+    """
+    Yield the data rows of an uploaded CSV or Excel file as dicts keyed by header.
+
+    Both formats are read incrementally: CSV line by line, and workbooks in
+    openpyxl's read-only mode, so memory stays bounded however many rows the
+    file has.
+    """
+    if file.name.lower().endswith('.csv'):
+        return csv.DictReader(codecs.iterdecode(file, 'utf-8'))
+
+    from openpyxl import load_workbook
+
+    # Opened eagerly so that unreadable workbooks fail here rather than mid-import
+    return _iter_workbook_rows(load_workbook(file, read_only=True, data_only=True))
+
+
+def _iter_workbook_rows(wb):
+    try:
+        ws = wb.active
+        # Don't trust (or compute) the stored sheet size: a missing <dimension>
+        # would make openpyxl scan the whole sheet before yielding a row
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header_row = next(rows, None) or ()
+        headers = [value or f'column_{index}' for index, value in enumerate(header_row)]
+        for values in rows:
+            yield {
+                header: str(values[index]) if index < len(values) and values[index] is not None else ''
+                for index, header in enumerate(headers)
+            }
+    finally:
+        wb.close()
+
+
+def estimate_upload_rows(file):
+    """Cheap data-row count for progress reporting; the file is rewound afterwards."""
+    if file.name.lower().endswith('.csv'):
+        total = sum(1 for _line in file) - 1
+    else:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file, read_only=True)
+        total = (wb.active.max_row or 1) - 1
+        wb.close()
+    file.seek(0)
+    return max(total, 0)
+
+
+def _cell(row, field):
+    value = row.get(field)
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+class ClientBulkImporter:
+    """
+    Imports uploaded customer rows for one tenant/store in bulk.
+
+    Existing emails and phones are loaded once up front, every row is
+    cleaned and validated in memory, and valid rows are inserted with
+    ``bulk_create`` in batches. Each batch commits in its own transaction,
+    so a failing batch is reported without rolling back the others and
+    locks are only held for one batch at a time.
+
+    ``bulk_create`` bypasses the Client post_save signals, so the audit
+    log entries, automatic tags and activity events they would create are
+    written here in bulk instead, and the batch's rollup days and cached
+    dashboards are refreshed once it commits.
+
+    File uploads accept rows with only a phone number; JSON imports pass
+    ``require_email=True`` so every row must carry an email.
+    """
+    batch_size = 1000
+
+    def __init__(self, tenant_id, store_id, user=None, batch_size=None, on_progress=None, require_email=False):
+        self.tenant_id = tenant_id
+        self.store_id = store_id
+        self.user = user
+        self.require_email = require_email
+        if batch_size:
+            self.batch_size = batch_size
+        # Called as on_progress(imported, failed) after validation and each batch
+        self.on_progress = on_progress
+        self.errors = []
+        self.batches = []
+        self.imported = 0
+        self.failed = 0
+        self.max_lengths = {
+            field.name: field.max_length
+            for field in Client._meta.fields
+            if getattr(field, 'max_length', None)
+        }
+        self.choices = {
+            field: {value for value, _label in Client._meta.get_field(field).choices}
+            for field in CHOICE_FIELDS
+        }
+
+    def load_existing(self):
+        clients = Client.objects.filter(tenant_id=self.tenant_id)
+        # Emails are unique per tenant including soft-deleted rows
+        self.existing_emails = set(clients.values_list('email', flat=True))
+        self.existing_phones = set(
+            clients.filter(is_deleted=False).exclude(phone__isnull=True).exclude(phone='')
+            .values_list('phone', flat=True)
+        )
+        self.tagger = ClientTagger()
+
+    def clean_row(self, row_num, row):
+        """Return (client_data, error) for one uploaded row."""
+        if not isinstance(row, dict):
+            return None, f'Row {row_num}: Expected a customer object'
+
+        email = _cell(row, 'email')
+        phone = _cell(row, 'phone')
+
+        if self.require_email and not email:
+            return None, f'Row {row_num}: Email is required'
+        # Require either email or phone
+        if not email and not phone:
+            return None, f'Row {row_num}: Either email or phone is required'
+
+        # If no email provided, generate a placeholder email using phone
+        supplied_email = email
+        if not email:
+            email = f"imported_{phone.replace('+', '').replace('-', '').replace(' ', '')}@imported.local"
+
+        if supplied_email and supplied_email in self.existing_emails:
+            return None, f'Row {row_num}: Customer with {supplied_email} already exists'
+        if phone and phone in self.existing_phones:
+            return None, f'Row {row_num}: Customer with phone {phone} already exists'
+        if email in self.existing_emails:
+            # The placeholder of a phone that was imported before under another formatting
+            return None, f'Row {row_num}: Customer with phone {phone} already exists'
+
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None, f'Row {row_num}: email: Enter a valid email address.'
+
+        client_data = {
+            'email': email,
+            'phone': phone,
+            'customer_type': _cell(row, 'customer_type') or 'individual',
+            'status': _cell(row, 'status') or 'lead',
+        }
+        for field in CHOICE_FIELDS:
+            if client_data[field] not in self.choices[field]:
+                return None, f'Row {row_num}: {field}: "{client_data[field]}" is not a valid choice.'
+        for field in TEXT_FIELDS:
+            client_data[field] = _cell(row, field)
+
+        for field in DATE_FIELDS:
+            value = _cell(row, field)
+            if value:
+                try:
+                    client_data[field] = datetime.strptime(value, '%Y-%m-%d').date()
+                except ValueError:
+                    if field in REQUIRED_VALID_DATE_FIELDS:
+                        return None, f'Row {row_num}: {field}: Enter a valid date (YYYY-MM-DD).'
+
+        # Drop empty strings so model defaults apply
+        client_data = {key: value for key, value in client_data.items() if value != ''}
+
+        too_long = [
+            f'{field}: Ensure this field has no more than {self.max_lengths[field]} characters.'
+            for field, value in client_data.items()
+            if field in self.max_lengths and isinstance(value, str) and len(value) > self.max_lengths[field]
+        ]
+        if too_long:
+            return None, f'Row {row_num}: {"; ".join(too_long)}'
+
+        # Later rows in the same file are duplicates of this one
+        self.existing_emails.add(email)
+        if phone:
+            self.existing_phones.add(phone)
+        return client_data, None
+
+    def iter_valid(self, rows, first_row_num=2):
+        """Clean rows without touching the database, yielding (row_num, client_data) for valid ones."""
+        for row_num, row in enumerate(rows, start=first_row_num):
+            client_data, error = self.clean_row(row_num, row)
+            if error:
+                self.errors.append(error)
+                self.failed += 1
+            else:
+                yield row_num, client_data
+
+    def validate(self, rows, first_row_num=2):
+        return list(self.iter_valid(rows, first_row_num))
+
+    def run(self, rows, first_row_num=2):
+        """
+        Import ``rows`` (any iterable, consumed once). Rows are validated and
+        inserted one batch at a time, so a streamed upload is never held in
+        memory as a whole.
+        """
+        self.load_existing()
+
+        batch = []
+        for item in self.iter_valid(rows, first_row_num):
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self.insert_batch(batch)
+                self.report_progress()
+                batch = []
+        if batch:
+            self.insert_batch(batch)
+        self.report_progress()
+
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'batches': self.batches,
+        }
+
+    def report_progress(self):
+        if self.on_progress:
+            self.on_progress(self.imported, self.failed)
+
+    def insert_batch(self, batch):
+        row_range = f'{batch[0][0]}-{batch[-1][0]}'
+        clients = [
+            Client(
+                tenant_id=self.tenant_id,
+                store_id=self.store_id,
+                created_by=self.user,
+                **client_data
+            )
+            for _row_num, client_data in batch
+        ]
+        try:
+            with transaction.atomic():
+                clients = Client.objects.bulk_create(clients)
+                # New clients have no interests yet
+                Client.tags.through.objects.bulk_create(self.tagger.build_links(clients, interest_categories={}))
+                AuditLog.objects.bulk_create(self.build_audit_logs(clients))
+                ActivityEvent.objects.bulk_create([customer_event(client) for client in clients])
+                mark_rollup_dirty(self.tenant_id, *{client.created_at for client in clients})
+                invalidate_dashboards(self.tenant_id)
+        except Exception as e:
+            self.errors.append(f'Rows {row_range}: Failed to save batch: {e}')
+            self.failed += len(batch)
+            self.batches.append({'rows': row_range, 'imported': 0, 'error': str(e)})
+            return
+
+        self.imported += len(clients)
+        self.batches.append({'rows': row_range, 'imported': len(clients), 'error': None})
+
+    def build_audit_logs(self, clients):
+        logs = []
+        for client in clients:
+            # Same shape as the post_save entry for a new client: its non-empty fields
+            _before, after = audit_diff(client)
+            logs.append(AuditLog(
+                client=client, tenant_id=self.tenant_id, action='create', user=self.user, before=None, after=after
+            ))
+            if client.lead_source == 'exhibition':
+                logs.append(AuditLog(
+                    client=client,
+                    tenant_id=self.tenant_id,
+                    action='create',
+                    user=self.user,
+                    after={
+                        'status': client.status,
+                        'lead_source': client.lead_source,
+                        'created_at': client.created_at.isoformat()
+                    },
+                ))
+        return logs
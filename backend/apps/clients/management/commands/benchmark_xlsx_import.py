@@ -0,0 +1,113 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from apps.clients.imports import read_upload_rows
+
+
+HEADERS = [
+    'first_name', 'last_name', 'email', 'phone', 'city', 'state',
+    'lead_source', 'reason_for_visit', 'date_of_birth', 'notes',
+]
+
+
+def legacy_read_workbook_rows(file):
+    """The previous XLSX path: full workbook load plus random cell access."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, data_only=True)
+    ws = wb.active
+
+    headers = []
+    for cell in ws[1]:
+        headers.append(cell.value or f'column_{len(headers)}')
+
+    rows = []
+    for row_num in range(2, ws.max_row + 1):
+        row_data = {}
+        for col_num, header in enumerate(headers, 1):
+            cell_value = ws.cell(row=row_num, column=col_num).value
+            row_data[header] = str(cell_value) if cell_value is not None else ''
+        rows.append(row_data)
+    return rows
+
+
+def write_sample_workbook(path, row_count):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(HEADERS)
+    for i in range(row_count):
+        ws.append([
+            f'First{i}', f'Last{i}', f'customer{i}@example.com', 9000000000 + i, 'Mumbai', 'MH',
+            'instagram', 'wedding', '1990-01-01', f'Imported row {i}',
+        ])
+    wb.save(path)
+
+
+class Command(BaseCommand):
+    help = 'Compare time and peak memory of the legacy and streaming XLSX import readers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Number of data rows in the generated workbook',
+        )
+        parser.add_argument(
+            '--file',
+            help='Benchmark an existing .xlsx file instead of a generated one',
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        generated = path is None
+        if generated:
+            handle, path = tempfile.mkstemp(suffix='.xlsx')
+            os.close(handle)
+            self.stdout.write(f'Generating workbook with {options["rows"]} rows...')
+            write_sample_workbook(path, options['rows'])
+
+        try:
+            self.stdout.write(f'Workbook: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)')
+            self.stdout.write(f'{"Reader":<12}{"Rows":>10}{"Time (s)":>12}{"Peak MB":>12}')
+            self.stdout.write('-' * 46)
+
+            legacy = self._measure(path, lambda file: legacy_read_workbook_rows(file))
+            streaming = self._measure(path, lambda file: read_upload_rows(file))
+            for name, (count, elapsed, peak) in [('legacy', legacy), ('streaming', streaming)]:
+                self.stdout.write(f'{name:<12}{count:>10}{elapsed:>12.2f}{peak:>12.1f}')
+
+            self.stdout.write('-' * 46)
+            self.stdout.write(
+                f'Streaming reader: {legacy[1] / streaming[1]:.2f}x faster, '
+                f'{legacy[2] / streaming[2]:.1f}x less peak memory'
+            )
+            if legacy[0] != streaming[0]:
+                self.stdout.write(self.style.ERROR('Readers returned different row counts'))
+        finally:
+            if generated:
+                os.remove(path)
+
+    @staticmethod
+    def _measure(path, reader):
+        def consume():
+            with open(path, 'rb') as handle:
+                return sum(1 for _row in reader(File(handle, name=path)))
+
+        # Timed and memory-traced separately; tracemalloc slows both readers down
+        start = time.perf_counter()
+        count = consume()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        consume()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return count, elapsed, peak / 1024 / 1024
@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.clients.models import AuditLog
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply the monthly audit log retention policy: whole calendar months older than '
+        'AUDIT_LOG_RETENTION_MONTHS are (optionally archived and) deleted, one month and one '
+        'batch at a time. Meant to run from cron once a month.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=getattr(settings, 'AUDIT_LOG_RETENTION_MONTHS', 12),
+            help='Number of full months to keep besides the current one',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Write each month to <dir>/audit-YYYY-MM.ndjson.gz before deleting it',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per DELETE statement',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] < 0:
+            raise CommandError('--months must not be negative')
+        if options['archive_dir']:
+            os.makedirs(options['archive_dir'], exist_ok=True)
+
+        cutoff = add_months(month_start(timezone.localtime()), -options['months'])
+        oldest = AuditLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            self.stdout.write(f'No audit logs before {cutoff:%Y-%m}')
+            return
+
+        total = 0
+        month = month_start(timezone.localtime(oldest))
+        while month < cutoff:
+            next_month = add_months(month, 1)
+            rows = AuditLog.objects.filter(timestamp__gte=month, timestamp__lt=next_month)
+            if options['dry_run']:
+                count = rows.count()
+            else:
+                if options['archive_dir']:
+                    self.archive(rows, month, options['archive_dir'])
+                count = self.delete_in_batches(rows, options['batch_size'])
+            if count:
+                self.stdout.write(f'{month:%Y-%m}: {count} audit logs {"would be " if options["dry_run"] else ""}deleted')
+            total += count
+            month = next_month
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} audit logs older than {cutoff:%Y-%m} processed'))
+
+    def archive(self, rows, month, archive_dir):
+        path = os.path.join(archive_dir, f'audit-{month:%Y-%m}.ndjson.gz')
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for row in rows.order_by('id').values().iterator(chunk_size=2000):
+                archive.write(json.dumps(row, default=str) + '\n')
+
+    def delete_in_batches(self, rows, batch_size):
+        deleted = 0
+        while True:
+            ids = list(rows.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            # AuditLog has no dependants, so this is a single DELETE ... WHERE id IN (...)
+            deleted += AuditLog.objects.filter(id__in=ids).delete()[0]
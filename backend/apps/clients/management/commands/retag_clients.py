@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.clients.models import Client
+from apps.clients.tagging import ClientTagger
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh automatic client tags. By default only calendar tags (birthday/anniversary week, '
+        'age band) are re-synced for clients they may have changed for; run nightly. '
+        'With --full every automatic tag is re-applied to every client.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-apply all automatic tags to all clients instead of only syncing calendar tags',
+        )
+        parser.add_argument(
+            '--tenant',
+            type=int,
+            help='Only re-tag clients of this tenant id',
+        )
+        parser.add_argument(
+            '--date',
+            help='Evaluate calendar tags as of this date (YYYY-MM-DD) instead of today',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ClientTagger.batch_size,
+            help='Number of clients tagged per bulk insert',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError(f'Invalid --date value: {options["date"]}')
+
+        queryset = Client.objects.filter(is_deleted=False)
+        if options['tenant']:
+            queryset = queryset.filter(tenant_id=options['tenant'])
+
+        started = time.perf_counter()
+        tagger = ClientTagger(today=today, batch_size=options['batch_size'])
+        if options['full']:
+            tagger.tag_queryset(queryset)
+        else:
+            tagger.sync_time_based(tagger.time_based_candidates(queryset))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f'Clients processed: {tagger.tagged}')
+        self.stdout.write(f'Tag links added: {tagger.added}')
+        self.stdout.write(f'Tag links removed: {tagger.removed}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Re-tagging finished in {elapsed:.2f}s'))
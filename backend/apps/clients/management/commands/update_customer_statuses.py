@@ -1,6 +1,14 @@
-from django.core.management.base import BaseCommand
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
 from apps.clients.models import Client
-from apps.sales.models import Sale
+from apps.clients.statuses import ClientStatusRecompute
+
 
 class Command(BaseCommand):
     help = 'Update customer statuses based on their purchase behavior and pipeline activity'
@@ -11,103 +19,98 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without making changes',
         )
+        parser.add_argument(
+            '--tenant',
+            type=int,
+            help='Only recompute clients of this tenant id',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only recompute clients with sales or pipeline changes since this date/datetime (ISO format)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ClientStatusRecompute.batch_size,
+            help='Number of status changes written per UPDATE',
+        )
+
+    def parse_since(self, value):
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'Invalid --since value: {value}')
+            since = datetime.combine(day, dt_time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        
+        since = self.parse_since(options['since'])
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
-        
+
         self.stdout.write('Starting customer status update...')
-        
-        # Get all customers
-        customers = Client.objects.all()
-        total_customers = customers.count()
-        
-        self.stdout.write(f'Found {total_customers} customers to process')
-        
+        if options['tenant']:
+            self.stdout.write(f'Tenant: {options["tenant"]}')
+        if since:
+            self.stdout.write(f'Only clients with sales or pipeline activity since {since.isoformat()}')
+
+        started = time.perf_counter()
+        recompute = ClientStatusRecompute(
+            tenant_id=options['tenant'],
+            since=since,
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+        )
+        changes = recompute.run()
+        elapsed = time.perf_counter() - started
+
         # Track status changes
-        status_changes = {
-            'lead': {'to_prospect': 0, 'to_customer': 0},
-            'prospect': {'to_customer': 0, 'to_lead': 0},
-            'customer': {'to_prospect': 0, 'to_lead': 0},
-            'inactive': {'to_lead': 0, 'to_prospect': 0, 'to_customer': 0}
-        }
-        
-        updated_count = 0
-        
-        for customer in customers:
-            old_status = customer.status
-            old_status_display = customer.get_status_display()
-            
-            # Update status based on behavior
-            status_message = customer.update_status_based_on_behavior()
-            new_status = customer.status
-            new_status_display = customer.get_status_display()
-            
-            if old_status != new_status:
-                updated_count += 1
-                
-                # Track the change
-                if old_status in status_changes and new_status in ['prospect', 'customer']:
-                    if old_status == 'lead':
-                        if new_status == 'prospect':
-                            status_changes['lead']['to_prospect'] += 1
-                        elif new_status == 'customer':
-                            status_changes['lead']['to_customer'] += 1
-                    elif old_status == 'prospect' and new_status == 'customer':
-                        status_changes['prospect']['to_customer'] += 1
-                
-                if not dry_run:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'✓ {customer.full_name}: {old_status_display} → {new_status_display}'
-                        )
-                    )
-                else:
-                    self.stdout.write(
-                        f'[DRY RUN] {customer.full_name}: {old_status_display} → {new_status_display}'
-                    )
-            else:
-                if not dry_run:
-                    self.stdout.write(
-                        f'  {customer.full_name}: {old_status_display} (no change)'
-                    )
-        
+        status_changes = {}
+        labels = dict(Client.Status.choices)
+        for pk, old_status, new_status in changes:
+            key = (old_status, new_status)
+            status_changes[key] = status_changes.get(key, 0) + 1
+            if options['verbosity'] >= 2:
+                prefix = '[DRY RUN] ' if dry_run else '✓ '
+                self.stdout.write(f'{prefix}Client {pk}: {labels.get(old_status, old_status)} → {labels[new_status]}')
+
         # Summary
         self.stdout.write('\n' + '='*50)
         self.stdout.write('STATUS UPDATE SUMMARY')
         self.stdout.write('='*50)
-        
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN - No actual changes made'))
-        
-        self.stdout.write(f'Total customers processed: {total_customers}')
-        self.stdout.write(f'Customers with status changes: {updated_count}')
-        
+
+        self.stdout.write(f'Total customers processed: {recompute.processed}')
+        self.stdout.write(f'Customers with status changes: {len(changes)}')
+        self.stdout.write(f'Time taken: {elapsed:.2f}s')
+
         # Show detailed changes
         self.stdout.write('\nDetailed Changes:')
-        for old_status, changes in status_changes.items():
-            for change_type, count in changes.items():
-                if count > 0:
-                    self.stdout.write(f'  {old_status.title()} → {change_type.replace("_", " ").title()}: {count}')
-        
+        for (old_status, new_status), count in sorted(status_changes.items()):
+            self.stdout.write(f'  {labels.get(old_status, old_status)} → {labels[new_status]}: {count}')
+
         # Show current status distribution
         self.stdout.write('\nCurrent Status Distribution:')
-        current_statuses = {}
-        for customer in Client.objects.all():
-            status = customer.status
-            current_statuses[status] = current_statuses.get(status, 0) + 1
-        
-        for status, count in current_statuses.items():
-            status_display = dict(Client.Status.choices)[status]
-            self.stdout.write(f'  {status_display}: {count}')
-        
+        distribution = Client.objects.all()
+        if options['tenant']:
+            distribution = distribution.filter(tenant_id=options['tenant'])
+        for row in distribution.order_by('status').values('status').annotate(count=Count('id')):
+            self.stdout.write(f'  {labels.get(row["status"], row["status"])}: {row["count"]}')
+
         if not dry_run:
             self.stdout.write(
-                self.style.SUCCESS(f'\n✅ Successfully updated {updated_count} customer statuses!')
+                self.style.SUCCESS(f'\n✅ Successfully updated {len(changes)} customer statuses!')
             )
         else:
             self.stdout.write(
-                self.style.WARNING(f'\n[DRY RUN] Would update {updated_count} customer statuses')
+                self.style.WARNING(f'\n[DRY RUN] Would update {len(changes)} customer statuses')
             )
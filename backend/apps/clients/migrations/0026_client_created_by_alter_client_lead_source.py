@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('clients', '0025_add_exhibition_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_clients', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='lead_source',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
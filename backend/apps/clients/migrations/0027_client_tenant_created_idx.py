@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0026_client_created_by_alter_client_lead_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['tenant', '-created_at', '-id'], name='client_tenant_created_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_auditlog_tenant(apps, schema_editor):
+    """Copy each audit log's client tenant onto the new denormalized column."""
+    AuditLog = apps.get_model('clients', 'AuditLog')
+    Client = apps.get_model('clients', 'Client')
+    AuditLog.objects.filter(tenant__isnull=True).update(
+        tenant_id=models.Subquery(Client.objects.filter(pk=models.OuterRef('client_id')).values('tenant_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_tenant_google_maps_url'),
+        ('clients', '0027_client_tenant_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='audit_logs', to='tenants.tenant'),
+        ),
+        migrations.RunPython(populate_auditlog_tenant, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['client', '-timestamp', '-id'], name='auditlog_client_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['tenant', '-timestamp', '-id'], name='auditlog_tenant_ts_idx'),
+        ),
+    ]
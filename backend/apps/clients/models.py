@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 import json
 import datetime
@@ -149,6 +149,25 @@ class Client(models.Model):
         verbose_name_plural = _('Clients')
         ordering = ['-created_at']
         unique_together = ['email', 'tenant']
+        indexes = [
+            # Stable ordering for keyset pagination of the customer list
+            models.Index(fields=['tenant', '-created_at', '-id'], name='client_tenant_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Original values for diff-only audit logs, so saves don't refetch the row
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is not None:
+            for field in self._meta.concrete_fields:
+                if field.attname in self.__dict__ and (fields is None or field.name in fields or field.attname in fields):
+                    loaded[field.attname] = getattr(self, field.attname)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -179,42 +198,23 @@ class Client(models.Model):
     def update_status_based_on_behavior(self):
         """Automatically update customer status based on their behavior and purchase history."""
         from apps.sales.models import Sale
-        
-        # Count total sales for this customer
-        total_sales = Sale.objects.filter(
-            client=self,
-            status__in=['confirmed', 'processing', 'shipped', 'delivered'],
-            payment_status__in=['paid', 'partial']
-        ).count()
-        
-        # Count total amount spent
-        total_spent = Sale.objects.filter(
-            client=self,
-            status__in=['confirmed', 'processing', 'shipped', 'delivered'],
-            payment_status__in=['paid', 'partial']
-        ).aggregate(total=models.Sum('total_amount'))['total'] or 0
-        
-        # Update status based on behavior
-        if total_sales > 0:
-            if total_spent >= 50000:  # ₹50,000+ spent
-                new_status = self.Status.CUSTOMER
-            elif total_sales >= 2 or total_spent >= 10000:  # 2+ purchases or ₹10,000+ spent
-                new_status = self.Status.CUSTOMER
-            else:
-                new_status = self.Status.PROSPECT
-        else:
-            # Check if they have any pipeline activity
-            pipeline_count = self.pipelines.filter(stage__in=['interested', 'store_walkin', 'negotiation']).count()
-            if pipeline_count > 0:
-                new_status = self.Status.PROSPECT
-            else:
-                new_status = self.Status.LEAD
+        from .statuses import ACTIVE_PIPELINE_STAGES, qualifying_sales_q, status_for
+
+        totals = Sale.objects.filter(qualifying_sales_q(), client=self).aggregate(
+            total_sales=models.Count('id'),
+            total_spent=models.Sum('total_amount'),
+        )
+        has_active_pipeline = False
+        if not totals['total_sales']:
+            has_active_pipeline = self.pipelines.filter(stage__in=ACTIVE_PIPELINE_STAGES).exists()
+        new_status = status_for(totals['total_sales'], totals['total_spent'] or 0, has_active_pipeline)
         
         # Only update if status changed
         if self.status != new_status:
+            old_status_display = self.get_status_display()
             self.status = new_status
             self.save()
-            return f"Status updated from {self.get_status_display()} to {self.get_status_display()}"
+            return f"Status updated from {old_status_display} to {self.get_status_display()}"
         
         return f"Status remains {self.get_status_display()}"
 
@@ -626,51 +626,59 @@ class AuditLog(models.Model):
         ('restore', 'Restore'),
     ]
     client = models.ForeignKey('Client', on_delete=models.CASCADE, related_name='audit_logs')
+    # Copy of client.tenant so tenant-wide audit browsing needs no join
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='audit_logs', null=True, blank=True)
     action = models.CharField(max_length=10, choices=ACTION_CHOICES)
     user = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     before = models.JSONField(null=True, blank=True)
     after = models.JSONField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Newest-first keyset pages per customer, per user and per tenant
+            models.Index(fields=['client', '-timestamp', '-id'], name='auditlog_client_ts_idx'),
+            models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_ts_idx'),
+            models.Index(fields=['tenant', '-timestamp', '-id'], name='auditlog_tenant_ts_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_action_display()} by {self.user} on {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None and AuditLog.client.is_cached(self):
+            self.tenant_id = self.client.tenant_id
+        super().save(*args, **kwargs)
 
-@receiver(pre_save, sender=Client)
-def log_client_update(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old = Client.objects.get(pk=instance.pk)
-            before = {field.name: serialize_field(getattr(old, field.name)) for field in instance._meta.fields}
-        except Client.DoesNotExist:
-            before = None
-        instance._auditlog_before = before
-    else:
-        instance._auditlog_before = None
 
 @receiver(post_save, sender=Client)
-def create_audit_log_on_save(sender, instance, created, **kwargs):
+def create_audit_log_on_save(sender, instance, created, raw=False, **kwargs):
+    """Queue an audit entry holding only the fields this save changed."""
+    from .audit import audit_diff, loaded_values, record_audit_log, remember_loaded_values
+
+    if raw:
+        return
     user = getattr(instance, '_auditlog_user', None)
-    before = getattr(instance, '_auditlog_before', None)
-    after = {field.name: serialize_field(getattr(instance, field.name)) for field in instance._meta.fields}
-    action = 'create' if created else 'update'
-    if before != after:
-        # Import here to avoid circular import
-        from .models import AuditLog
-        AuditLog.objects.create(
-            client=instance,
-            action=action,
+    original = None if created else loaded_values(instance)
+    before, after = audit_diff(instance, original)
+    if after:
+        record_audit_log(
+            instance,
+            'create' if created else 'update',
             user=user,
-            before=before,
-            after=after
+            before=None if created else (before or None),
+            after=after,
         )
+    # The next save of this instance is diffed against what was just written
+    remember_loaded_values(instance)
 
 @receiver(pre_delete, sender=Client)
 def create_audit_log_on_delete(sender, instance, **kwargs):
+    from .audit import discard_pending_audit_logs
+
     user = getattr(instance, '_auditlog_user', None)
-    before = {field.name: serialize_field(getattr(instance, field.name)) for field in instance._meta.fields}
-    # Import here to avoid circular import
-    from .models import AuditLog
+    before = {field.name: serialize_field(getattr(instance, field.attname)) for field in instance._meta.fields}
+    discard_pending_audit_logs(instance.pk)
     AuditLog.objects.create(
         client=instance,
         action='delete',
@@ -0,0 +1,136 @@
+import base64
+import hashlib
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on ``(position_field, id)``, newest first.
+
+    Each page is a single index range scan regardless of how deep the client
+    is in the list, unlike OFFSET pagination. The cursor is an opaque token
+    encoding the last row of the previous page. A total is only computed when
+    ``?include_total=true`` is passed, and is cached briefly per scoped query.
+    """
+    position_field = 'created_at'
+    total_cache_prefix = 'keyset:total:'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    total_query_param = 'include_total'
+    total_cache_timeout = 60
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        """Pagination is opt-in so existing clients keep receiving a plain list."""
+        params = request.query_params
+        return self.page_size_query_param in params or self.cursor_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.total_estimate = None
+        if request.query_params.get(self.total_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.total_estimate = self.get_total_estimate(queryset)
+
+        field = self.position_field
+        queryset = queryset.order_by(f'-{field}', '-id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            # Written as a range on the position field so a (..., field, id) index is usable
+            queryset = queryset.filter(**{f'{field}__lte': value}).exclude(
+                Q(**{field: value, 'id__gte': pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.next_position = (getattr(results[-1], field), results[-1].id) if self.has_next else None
+        return results
+
+    def get_total_estimate(self, queryset):
+        key = self.total_cache_prefix + hashlib.md5(str(queryset.query).encode()).hexdigest()
+        total = cache.get(key)
+        if total is None:
+            total = queryset.count()
+            cache.set(key, total, self.total_cache_timeout)
+        return total
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def encode_cursor(self, position):
+        value, pk = position
+        raw = f'{value.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            value, pk = raw.rsplit('|', 1)
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('page_size', self.page_size),
+        ])
+        if self.total_estimate is not None:
+            payload['total_estimate'] = self.total_estimate
+        payload['results'] = data
+        return Response(payload)
+
+
+class ClientKeysetPagination(KeysetPagination):
+    """Customer list, served by the (tenant, created_at, id) index."""
+    position_field = 'created_at'
+    total_cache_prefix = 'clients:total:'
+
+
+class AuditLogKeysetPagination(KeysetPagination):
+    """Audit history, served by the (tenant|client|user, timestamp, id) indexes."""
+    position_field = 'timestamp'
+    total_cache_prefix = 'auditlogs:total:'
+
+
+class ActivityEventKeysetPagination(KeysetPagination):
+    """Activity stream, served by the (tenant[, store|actor], created_at, id) indexes."""
+    position_field = 'created_at'
+    total_cache_prefix = 'activity:total:'
+    page_size = 20
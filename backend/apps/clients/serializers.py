@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, CustomerTag, AuditLog
 from apps.tenants.models import Tenant
@@ -70,6 +71,18 @@ class ClientSerializer(serializers.ModelSerializer):
     
     # Created by field to show who created the customer
     created_by = serializers.SerializerMethodField()
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Load every relation the serializer reads so that a page of clients
+        costs a fixed number of queries regardless of its size.
+        """
+        from .models import CustomerInterest
+        return queryset.select_related('store', 'assigned_to', 'created_by').prefetch_related(
+            'tags',
+            Prefetch('interests', queryset=CustomerInterest.objects.select_related('category', 'product')),
+        )
     
     def get_created_by(self, obj):
         if obj.created_by:
@@ -120,30 +133,6 @@ class ClientSerializer(serializers.ModelSerializer):
             print(f"Error getting customer interests display: {e}")
             return []
     
-    def get_customer_interests(self, obj):
-        """Get customer interests in the format expected by frontend"""
-        try:
-            interests = obj.interests.all()
-            return [
-                {
-                    'id': interest.id,
-                    'category': {
-                        'id': interest.category.id if interest.category else None,
-                        'name': interest.category.name if interest.category else None
-                    },
-                    'product': {
-                        'id': interest.product.id if interest.product else None,
-                        'name': interest.product.name if interest.product else None
-                    },
-                    'revenue': float(interest.revenue) if interest.revenue else 0,
-                    'notes': interest.notes
-                }
-                for interest in interests
-            ]
-        except Exception as e:
-            print(f"Error getting customer interests: {e}")
-            return []
-
     def validate_tag_slugs(self, value):
         """Validate that all tag slugs exist in the database"""
         if value:
@@ -643,30 +632,9 @@ class ClientSerializer(serializers.ModelSerializer):
     
     def get_customer_interests(self, obj):
         """Return customer interests in a structured format"""
-        print(f"=== DEBUG: get_customer_interests called for client {obj.id} ===")
-        print(f"Client: {obj.first_name} {obj.last_name}")
-        print(f"Client type: {type(obj)}")
-        print(f"Client model: {obj._meta.model}")
-        
         try:
-            interests = obj.interests.all()
-            print(f"Found {interests.count()} interests")
-            print(f"Interests queryset: {interests}")
-            
-            if not interests:
-                print("No interests found, returning empty list")
-                return []
-            
-            interest_list = []
-            for interest in interests:
-                print(f"Processing interest: {interest}")
-                print(f"  - Interest type: {type(interest)}")
-                print(f"  - Interest model: {interest._meta.model}")
-                print(f"  - Category: {interest.category}")
-                print(f"  - Product: {interest.product}")
-                print(f"  - Revenue: {interest.revenue}")
-                
-                interest_data = {
+            return [
+                {
                     'id': interest.id,
                     'category': {
                         'id': interest.category.id,
@@ -679,12 +647,8 @@ class ClientSerializer(serializers.ModelSerializer):
                     'revenue': float(interest.revenue) if interest.revenue else 0,
                     'notes': interest.notes
                 }
-                interest_list.append(interest_data)
-                print(f"  - Processed interest data: {interest_data}")
-            
-            print(f"Returning {len(interest_list)} interests: {interest_list}")
-            return interest_list
-            
+                for interest in obj.interests.all()
+            ]
         except Exception as e:
             print(f"ERROR in get_customer_interests: {e}")
             import traceback
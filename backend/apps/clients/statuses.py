@@ -0,0 +1,265 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, Exists, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Client, AuditLog
+from .tagging import STATUS_TAG_SLUGS, tag_ids
+
+logger = logging.getLogger(__name__)
+
+
+# Sales that count towards a customer's purchase history
+QUALIFYING_SALE_STATUSES = ['confirmed', 'processing', 'shipped', 'delivered']
+QUALIFYING_PAYMENT_STATUSES = ['paid', 'partial']
+
+# Pipeline stages that make a client without purchases a prospect
+ACTIVE_PIPELINE_STAGES = ['interested', 'store_walkin', 'negotiation']
+
+CUSTOMER_SPEND_THRESHOLD = 10000
+CUSTOMER_SALES_THRESHOLD = 2
+
+
+def status_for(total_sales, total_spent, has_active_pipeline):
+    """The status a client's purchase history and pipeline activity call for."""
+    if total_sales > 0:
+        # 2+ purchases or ₹10,000+ spent
+        if total_sales >= CUSTOMER_SALES_THRESHOLD or total_spent >= CUSTOMER_SPEND_THRESHOLD:
+            return Client.Status.CUSTOMER
+        return Client.Status.PROSPECT
+    if has_active_pipeline:
+        return Client.Status.PROSPECT
+    return Client.Status.LEAD
+
+
+def qualifying_sales_q(prefix=''):
+    return Q(**{
+        f'{prefix}status__in': QUALIFYING_SALE_STATUSES,
+        f'{prefix}payment_status__in': QUALIFYING_PAYMENT_STATUSES,
+    })
+
+
+def touched_since_q(since):
+    """Clients with a sale or pipeline created or changed at or after ``since``."""
+    from apps.sales.models import Sale, SalesPipeline
+
+    return (
+        Q(Exists(Sale.objects.filter(client=OuterRef('pk'), updated_at__gte=since)))
+        | Q(Exists(SalesPipeline.objects.filter(client=OuterRef('pk'), updated_at__gte=since)))
+    )
+
+
+class ClientStatusRecompute:
+    """
+    Recomputes ``Client.status`` for whole tenants at a time.
+
+    Sales count, spend and pipeline activity for every client of a tenant are
+    read in one aggregated query, the status rules are applied in memory, and
+    only the clients whose status changes are written back with
+    ``bulk_update`` (a single ``CASE WHEN`` UPDATE per batch). With ``since``
+    only clients whose sales or pipelines changed after that moment are
+    considered, which keeps nightly runs incremental; with ``client_ids`` only
+    those clients are, in a single query across tenants.
+
+    ``bulk_update`` bypasses the Client save signals, so the audit log entry
+    and status tag for each change are written here in bulk instead.
+    """
+    batch_size = 1000
+
+    def __init__(self, tenant_id=None, since=None, batch_size=None, dry_run=False, user=None, client_ids=None):
+        self.tenant_id = tenant_id
+        self.client_ids = client_ids
+        self.since = since
+        if batch_size:
+            self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.user = user
+        self.processed = 0
+        self.changes = []
+        self.client_tenants = {}
+
+    def tenant_ids(self):
+        if self.tenant_id is not None:
+            return [self.tenant_id]
+        return list(Client.objects.order_by().values_list('tenant_id', flat=True).distinct())
+
+    def get_queryset(self, tenant_id):
+        from apps.sales.models import SalesPipeline
+
+        if self.client_ids is not None:
+            queryset = Client.objects.filter(id__in=self.client_ids)
+        else:
+            queryset = Client.objects.filter(tenant_id=tenant_id)
+        if self.since is not None:
+            queryset = queryset.filter(touched_since_q(self.since))
+
+        qualifying = qualifying_sales_q('sales__')
+        return queryset.order_by().values('id', 'tenant_id', 'status').annotate(
+            total_sales=Count('sales', filter=qualifying),
+            total_spent=Coalesce(
+                Sum('sales__total_amount', filter=qualifying),
+                Value(0),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            has_active_pipeline=Exists(
+                SalesPipeline.objects.filter(client=OuterRef('pk'), stage__in=ACTIVE_PIPELINE_STAGES)
+            ),
+        )
+
+    def run(self):
+        if self.client_ids is not None:
+            self.recompute_tenant(None)
+            return self.changes
+        for tenant_id in self.tenant_ids():
+            self.recompute_tenant(tenant_id)
+        return self.changes
+
+    def recompute_tenant(self, tenant_id):
+        # Only the (few) changed rows are kept; they are written once the read is done
+        changes = []
+        for row in self.get_queryset(tenant_id).iterator(chunk_size=self.batch_size):
+            self.processed += 1
+            new_status = status_for(row['total_sales'], row['total_spent'], row['has_active_pipeline'])
+            if new_status != row['status']:
+                changes.append((row['id'], row['status'], new_status))
+                self.client_tenants[row['id']] = row['tenant_id']
+
+        for start in range(0, len(changes), self.batch_size):
+            self.apply(changes[start:start + self.batch_size])
+
+    def apply(self, changes):
+        self.changes.extend(changes)
+        if self.dry_run:
+            return
+
+        now = timezone.now()
+        clients = [Client(id=pk, status=new_status, updated_at=now) for pk, _old, new_status in changes]
+        Client.objects.bulk_update(clients, ['status', 'updated_at'])
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                client_id=pk,
+                tenant_id=self.client_tenants.get(pk),
+                action='update',
+                user=self.user,
+                before={'status': old_status},
+                after={'status': new_status},
+            )
+            for pk, old_status, new_status in changes
+        ])
+
+        # Tags are only ever added automatically, as auto_apply_tags does on save
+        ids = tag_ids.get()
+        through = Client.tags.through
+        through.objects.bulk_create([
+            through(client_id=pk, customertag_id=ids[STATUS_TAG_SLUGS[new_status]])
+            for pk, _old, new_status in changes
+            if STATUS_TAG_SLUGS.get(new_status) in ids
+        ], ignore_conflicts=True)
+
+
+# Clients whose status may be stale, collected per thread until the transaction commits
+_dirty = threading.local()
+_local_pool = None
+
+
+def _dirty_state():
+    if not hasattr(_dirty, 'client_ids'):
+        _dirty.client_ids = set()
+        _dirty.deferred = 0
+    return _dirty
+
+
+def mark_status_dirty(client_id):
+    """
+    Queue a client for status recomputation once the current transaction
+    commits (immediately in autocommit mode). However many sales or
+    pipelines of a client are saved, it is recomputed once per commit, and
+    all queued clients are recomputed together in one aggregated query.
+    Clients queued by a transaction that rolls back stay queued and are
+    recomputed with the next flush, which is harmless.
+    """
+    state = _dirty_state()
+    state.client_ids.add(client_id)
+    if not state.deferred:
+        # Registered per mark so that a rolled-back savepoint can't drop the flush
+        transaction.on_commit(flush_status_updates)
+
+
+@contextmanager
+def defer_status_updates():
+    """
+    Hold queued status updates until the block exits, so that a batch of
+    saves outside a transaction (e.g. a script or command) is recomputed once.
+    """
+    state = _dirty_state()
+    state.deferred += 1
+    try:
+        yield
+    finally:
+        state.deferred -= 1
+        if not state.deferred and state.client_ids:
+            transaction.on_commit(flush_status_updates)
+
+
+def flush_status_updates():
+    state = _dirty_state()
+    if state.deferred or not state.client_ids:
+        return
+    client_ids = sorted(state.client_ids)
+    state.client_ids.clear()
+    dispatch_status_recompute(client_ids)
+
+
+def recompute_client_statuses(client_ids, user=None):
+    return ClientStatusRecompute(client_ids=client_ids, user=user).run()
+
+
+def _recompute_locally(client_ids):
+    try:
+        recompute_client_statuses(client_ids)
+    except Exception:
+        logger.exception('Status recompute failed for clients %s', client_ids)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def dispatch_status_recompute(client_ids):
+    """
+    Recompute ``client_ids`` with the configured executor and return its name.
+
+    CLIENT_STATUS_EXECUTOR selects 'sync' (inline, right after commit),
+    'local' (in-process thread pool), 'celery', or 'auto', which uses Celery
+    when it is installed and the broker accepts the task and falls back to
+    running inline otherwise.
+    """
+    executor = getattr(settings, 'CLIENT_STATUS_EXECUTOR', 'sync')
+
+    if executor in ['auto', 'celery']:
+        from .tasks import recompute_client_statuses_task
+        if recompute_client_statuses_task is not None:
+            try:
+                recompute_client_statuses_task.delay(client_ids)
+                return 'celery'
+            except Exception:
+                if executor == 'celery':
+                    raise
+                logger.warning('Celery broker unavailable, recomputing client statuses inline', exc_info=True)
+        elif executor == 'celery':
+            raise RuntimeError('CLIENT_STATUS_EXECUTOR is "celery" but Celery is not installed')
+
+    if executor == 'local':
+        global _local_pool
+        if _local_pool is None:
+            _local_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='client-status')
+        _local_pool.submit(_recompute_locally, client_ids)
+        return 'local'
+
+    recompute_client_statuses(client_ids)
+    return 'sync'
@@ -0,0 +1,329 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Client, CustomerInterest, CustomerTag
+
+
+# Field value (case-insensitive, trimmed) → tag slug
+STATUS_TAG_SLUGS = {
+    'customer': 'converted-customer',
+    'prospect': 'interested-lead',
+    'inactive': 'not-interested',
+}
+
+VALUE_TAG_RULES = {
+    # Purchase intent / visit reason
+    'reason_for_visit': {
+        'wedding': 'wedding-buyer',
+        'gifting': 'gifting',
+        'self-purchase': 'self-purchase',
+        'repair': 'repair-customer',
+        'browse': 'browsing-prospect',
+    },
+    'lead_source': {
+        'instagram': 'social-lead',
+        'facebook': 'facebook-lead',
+        'google': 'google-lead',
+        'referral': 'referral',
+        'walk-in': 'walk-in',
+        'other': 'other-source',
+    },
+    'community': {
+        'hindu': 'hindu',
+        'muslim': 'muslim',
+        'jain': 'jain',
+        'parsi': 'parsi',
+        'buddhist': 'buddhist',
+        'cross community': 'cross-community',
+    },
+    'status': STATUS_TAG_SLUGS,
+}
+
+# Interest category name → tag slug; more than one interest adds MIXED_INTEREST_TAG
+INTEREST_TAG_RULES = {
+    'diamond': 'diamond-interested',
+    'gold': 'gold-interested',
+    'polki': 'polki-interested',
+}
+MIXED_INTEREST_TAG = 'mixed-buyer'
+
+# (spend above, tag), highest first; applies when a total_spend is available
+REVENUE_TAG_RULES = [
+    (100000, 'high-value'),
+    (30000, 'mid-value'),
+]
+
+# (min age, max age or None, tag)
+AGE_BAND_TAG_RULES = [
+    (18, 25, 'young-adult'),
+    (26, 35, 'millennial-shopper'),
+    (36, 45, 'middle-age-shopper'),
+    (47, None, 'senior-shopper'),
+]
+
+# Date field → tag while its day falls within EVENT_WINDOW_DAYS of today in the same month
+EVENT_TAG_RULES = {
+    'date_of_birth': 'birthday-week',
+    'anniversary_date': 'anniversary-week',
+}
+EVENT_WINDOW_DAYS = 7
+
+FOLLOW_UP_TAG = 'needs-follow-up'
+
+# Tags that change with the calendar rather than with the client; re-synced nightly
+TIME_BASED_TAGS = set(EVENT_TAG_RULES.values()) | {tag for _low, _high, tag in AGE_BAND_TAG_RULES}
+
+MAX_AGE = 150
+
+
+class TagRules:
+    """The rule tables above, compiled once into flat lookup dicts."""
+
+    def __init__(self):
+        self.value_rules = [
+            (field, {value.strip().lower(): slug for value, slug in mapping.items()})
+            for field, mapping in VALUE_TAG_RULES.items()
+        ]
+        self.age_tags = {}
+        for low, high, slug in AGE_BAND_TAG_RULES:
+            for age in range(low, (high or MAX_AGE) + 1):
+                self.age_tags[age] = slug
+
+    def slugs_for(self, client, interest_categories, today):
+        slugs = set()
+
+        for field, lookup in self.value_rules:
+            value = getattr(client, field, None)
+            if value:
+                slug = lookup.get(str(value).strip().lower())
+                if slug:
+                    slugs.add(slug)
+
+        for category in interest_categories:
+            slug = INTEREST_TAG_RULES.get(category.strip().lower())
+            if slug:
+                slugs.add(slug)
+        if len(interest_categories) > 1:
+            slugs.add(MIXED_INTEREST_TAG)
+
+        total_spend = getattr(client, 'total_spend', None)
+        if total_spend:
+            for threshold, slug in REVENUE_TAG_RULES:
+                if total_spend > threshold:
+                    slugs.add(slug)
+                    break
+
+        slugs.update(self.time_based_slugs_for(client, today))
+
+        if client.next_follow_up:
+            slugs.add(FOLLOW_UP_TAG)
+        return slugs
+
+    def time_based_slugs_for(self, client, today):
+        slugs = set()
+        born = client.date_of_birth
+        if born:
+            age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+            slug = self.age_tags.get(age)
+            if slug:
+                slugs.add(slug)
+
+        for field, slug in EVENT_TAG_RULES.items():
+            value = getattr(client, field)
+            if value and value.month == today.month and abs(value.day - today.day) <= EVENT_WINDOW_DAYS:
+                slugs.add(slug)
+        return slugs
+
+
+rules = TagRules()
+
+
+class TagIdCache:
+    """
+    Slug → id map of CustomerTag, kept in the shared Django cache so every
+    worker process sees tag changes.
+
+    The map is stored under a generation that saving or deleting a tag
+    bumps, both straight away and once the change commits, so no process
+    can keep serving a map read before the commit. Tags written without
+    signals (e.g. raw SQL) are picked up when the entry expires after
+    TAG_ID_CACHE_TIMEOUT seconds. Ids read inside a transaction may belong
+    to tags that are later rolled back, so they are only cached when read
+    in autocommit mode.
+    """
+    generation_key = 'clients:tag_ids:gen'
+
+    def _map_key(self, generation):
+        return f'clients:tag_ids:{generation}'
+
+    def get(self):
+        generation = cache.get(self.generation_key, 0)
+        ids = cache.get(self._map_key(generation))
+        if ids is not None:
+            return ids
+        ids = dict(CustomerTag.objects.values_list('slug', 'id'))
+        if not connection.in_atomic_block:
+            cache.set(self._map_key(generation), ids, settings.TAG_ID_CACHE_TIMEOUT)
+        return ids
+
+    def clear(self):
+        self._bump()
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        # add() is a no-op when the counter exists; incr() then works on every backend
+        cache.add(self.generation_key, 0, timeout=None)
+        try:
+            cache.incr(self.generation_key)
+        except ValueError:
+            # Evicted between the two calls
+            cache.set(self.generation_key, 1, timeout=None)
+
+
+tag_ids = TagIdCache()
+
+
+def get_interest_categories(client_ids):
+    """Interest category names per client id, for many clients in one query."""
+    categories = {client_id: [] for client_id in client_ids}
+    rows = (
+        CustomerInterest.objects.filter(client_id__in=client_ids, category__isnull=False)
+        .values_list('client_id', 'category__name')
+    )
+    for client_id, name in rows:
+        categories[client_id].append(name)
+    return categories
+
+
+def get_auto_tag_slugs(client, interest_categories=None, today=None):
+    """
+    Return the slugs of the automatic tags that apply to a client.
+
+    ``interest_categories`` may be passed as a list of category names when
+    the caller already knows them (e.g. freshly created clients have none);
+    otherwise the client's interests are read from the database.
+    """
+    if interest_categories is None:
+        interest_categories = get_interest_categories([client.pk])[client.pk]
+    return rules.slugs_for(client, interest_categories, today or date.today())
+
+
+def apply_auto_tags(client, interest_categories=None):
+    """Add the automatic tags of one client; existing tags are left in place."""
+    ids = tag_ids.get()
+    through = Client.tags.through
+    links = [
+        through(client_id=client.pk, customertag_id=ids[slug])
+        for slug in get_auto_tag_slugs(client, interest_categories)
+        if slug in ids
+    ]
+    if links:
+        through.objects.bulk_create(links, ignore_conflicts=True)
+    return len(links)
+
+
+class ClientTagger:
+    """
+    Applies automatic tags to many clients at once.
+
+    Clients are read in batches; per batch, interests are loaded in one
+    query and every resulting tag link is written with one ``bulk_create``
+    on the ``tags`` through table. Like the per-save signal, tags are only
+    ever added, except by ``sync_time_based`` which also removes calendar
+    tags (e.g. ``birthday-week``) that no longer apply.
+    """
+    batch_size = 2000
+
+    def __init__(self, today=None, batch_size=None):
+        self.today = today or date.today()
+        if batch_size:
+            self.batch_size = batch_size
+        self.tag_ids = tag_ids.get()
+        self.tagged = 0
+        self.added = 0
+        self.removed = 0
+
+    def build_links(self, clients, interest_categories=None):
+        """Through rows for ``clients``; ``interest_categories`` maps client id → names."""
+        through = Client.tags.through
+        if interest_categories is None:
+            interest_categories = get_interest_categories([client.pk for client in clients])
+        return [
+            through(client_id=client.pk, customertag_id=self.tag_ids[slug])
+            for client in clients
+            for slug in rules.slugs_for(client, interest_categories.get(client.pk, []), self.today)
+            if slug in self.tag_ids
+        ]
+
+    def tag(self, clients, interest_categories=None):
+        links = self.build_links(clients, interest_categories)
+        Client.tags.through.objects.bulk_create(links, ignore_conflicts=True)
+        self.tagged += len(clients)
+        self.added += len(links)
+        return len(links)
+
+    def iter_batches(self, queryset):
+        batch = []
+        for client in queryset.order_by().iterator(chunk_size=self.batch_size):
+            batch.append(client)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def tag_queryset(self, queryset):
+        for batch in self.iter_batches(queryset):
+            self.tag(batch)
+        return self.added
+
+    def time_based_candidates(self, queryset):
+        """
+        Clients whose calendar tags may have changed today: those with a
+        birthday or anniversary this month (age bands only move on a
+        birthday) and those still holding an event-week tag that may expire.
+        """
+        month = self.today.month
+        event_tag_ids = [self.tag_ids[slug] for slug in EVENT_TAG_RULES.values() if slug in self.tag_ids]
+        return queryset.filter(
+            Q(date_of_birth__month=month)
+            | Q(anniversary_date__month=month)
+            | Q(id__in=Client.tags.through.objects.filter(customertag_id__in=event_tag_ids).values('client_id'))
+        )
+
+    def sync_time_based(self, queryset):
+        """Bring calendar tags of ``queryset`` up to date: add the ones due, drop expired ones."""
+        through = Client.tags.through
+        time_tag_ids = {self.tag_ids[slug]: slug for slug in TIME_BASED_TAGS if slug in self.tag_ids}
+        if not time_tag_ids:
+            return 0, 0
+
+        for batch in self.iter_batches(queryset):
+            wanted = {
+                (client.pk, self.tag_ids[slug])
+                for client in batch
+                for slug in rules.time_based_slugs_for(client, self.today)
+                if slug in self.tag_ids
+            }
+            existing = {
+                (client_id, tag_id): link_id
+                for link_id, client_id, tag_id in through.objects.filter(
+                    client_id__in=[client.pk for client in batch], customertag_id__in=time_tag_ids
+                ).values_list('id', 'client_id', 'customertag_id')
+            }
+            stale = [link_id for key, link_id in existing.items() if key not in wanted]
+            missing = wanted - existing.keys()
+            if stale:
+                through.objects.filter(id__in=stale).delete()
+            through.objects.bulk_create(
+                [through(client_id=client_id, customertag_id=tag_id) for client_id, tag_id in missing],
+                ignore_conflicts=True,
+            )
+            self.tagged += len(batch)
+            self.added += len(missing)
+            self.removed += len(stale)
+        return self.added, self.removed
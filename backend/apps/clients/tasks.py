@@ -0,0 +1,23 @@
+from .models import Client
+from .statuses import recompute_client_statuses
+from .tagging import ClientTagger
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; statuses are then recomputed in-process
+    shared_task = None
+
+
+if shared_task is not None:
+    @shared_task(name='clients.recompute_client_statuses')
+    def recompute_client_statuses_task(client_ids):
+        recompute_client_statuses(client_ids)
+
+    @shared_task(name='clients.sync_time_based_tags')
+    def sync_time_based_tags_task():
+        """Nightly counterpart of ``manage.py retag_clients``."""
+        tagger = ClientTagger()
+        tagger.sync_time_based(tagger.time_based_candidates(Client.objects.filter(is_deleted=False)))
+else:
+    recompute_client_statuses_task = None
+    sync_time_based_tags_task = None
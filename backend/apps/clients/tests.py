@@ -1,3 +1,818 @@
-from django.test import TestCase
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.tenants.models import Tenant
+from apps.stores.models import Store
+from apps.products.models import Category, Product
+from apps.sales.models import Sale, SalesPipeline
+from apps.analytics.models import ActivityEvent
+from apps.analytics.rollups import flush_rollup_updates
+from .audit import _AuditBuffer
+from .imports import ClientBulkImporter, estimate_upload_rows, read_upload_rows
+from .management.commands.benchmark_xlsx_import import legacy_read_workbook_rows
+from .models import AuditLog, Client, CustomerInterest, CustomerTag
+from .statuses import ClientStatusRecompute, defer_status_updates, flush_status_updates
+from .tagging import ClientTagger, get_auto_tag_slugs, tag_ids
+
+User = get_user_model()
+
+
+class ClientListPaginationTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        self.client.force_authenticate(user=self.manager)
+
+        # Two clients share a timestamp so the id tie-breaker is exercised
+        now = timezone.now()
+        timestamps = [now - timedelta(minutes=i // 2) for i in range(7)]
+        self.clients = []
+        for i, created_at in enumerate(timestamps):
+            client = Client.objects.create(email=f"client{i}@test.com", tenant=self.tenant, store=self.store)
+            Client.objects.filter(pk=client.pk).update(created_at=created_at)
+            self.clients.append(client)
+
+        self.expected_ids = list(
+            Client.objects.filter(tenant=self.tenant).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def test_list_without_page_size_returns_plain_list(self):
+        """The legacy unpaginated response is kept for existing callers"""
+        response = self.client.get('/api/clients/clients/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_cursor_pages_cover_every_client_once(self):
+        """Walking the next links visits each client exactly once, newest first"""
+        seen = []
+        url = '/api/clients/clients/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, self.expected_ids)
+
+    def test_total_estimate_is_opt_in(self):
+        response = self.client.get('/api/clients/clients/?page_size=2')
+        self.assertNotIn('total_estimate', response.data)
+
+        response = self.client.get('/api/clients/clients/?page_size=2&include_total=true')
+        self.assertEqual(response.data['total_estimate'], 7)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get('/api/clients/clients/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ClientSerializerQueryCountTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        self.client.force_authenticate(user=self.manager)
+
+        category = Category.objects.create(name="Rings", tenant=self.tenant)
+        product = Product.objects.create(
+            name="Gold Ring",
+            sku="GR001",
+            category=category,
+            cost_price=Decimal('100.00'),
+            selling_price=Decimal('150.00'),
+            tenant=self.tenant
+        )
+        tag = CustomerTag.objects.create(name="VIP", slug="vip", category="value")
+
+        clients = Client.objects.bulk_create([
+            Client(
+                email=f"client{i}@test.com",
+                first_name="Client",
+                last_name=str(i),
+                tenant=self.tenant,
+                store=self.store,
+                created_by=self.manager,
+            )
+            for i in range(100)
+        ])
+        Client.tags.through.objects.bulk_create([
+            Client.tags.through(client_id=client.id, customertag_id=tag.id) for client in clients
+        ])
+        CustomerInterest.objects.bulk_create([
+            CustomerInterest(
+                client=client,
+                category=category,
+                product=product,
+                revenue=Decimal('150.00'),
+                tenant=self.tenant
+            )
+            for client in clients
+            for _ in range(2)
+        ])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_client_page_query_count_is_constant(self):
+        """A 100-client page costs the same number of queries as a 10-client page"""
+        small_count, _ = self.count_queries('/api/clients/clients/?page_size=10')
+        large_count, response = self.count_queries('/api/clients/clients/?page_size=100')
+
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(small_count, large_count)
+        # page + tags prefetch + interests prefetch
+        self.assertEqual(large_count, 3)
+
+        row = response.data['results'][0]
+        self.assertEqual(row['tags'][0]['slug'], 'vip')
+        self.assertEqual(len(row['customer_interests']), 2)
+        self.assertEqual(row['customer_interests'][0]['product']['name'], 'Gold Ring')
+        self.assertEqual(row['customer_interests_display'][0]['category'], 'Rings')
+        self.assertEqual(row['created_by']['username'], 'manager')
+
+    def test_client_detail_query_count(self):
+        client_id = Client.objects.filter(tenant=self.tenant).values_list('id', flat=True).first()
+        query_count, response = self.count_queries(f'/api/clients/clients/{client_id}/')
+
+        self.assertEqual(response.data['id'], client_id)
+        self.assertEqual(query_count, 3)
+
+
+class ClientExportTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        self.client.force_authenticate(user=self.manager)
+
+        tag = CustomerTag.objects.create(name="VIP", slug="vip", category="value")
+        clients = Client.objects.bulk_create([
+            Client(email=f"client{i}@test.com", first_name=f"Client{i}", tenant=self.tenant, store=self.store)
+            for i in range(25)
+        ])
+        Client.tags.through.objects.bulk_create([
+            Client.tags.through(client_id=client.id, customertag_id=tag.id) for client in clients
+        ])
+        Client.objects.create(
+            email="lead@test.com", first_name="Expo", status='exhibition',
+            tenant=self.tenant, store=self.store
+        )
+
+    def read_stream(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_csv_streams_rows_with_tags(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/clients/clients/export_csv/?fields=email,first_name,tags')
+            content = self.read_stream(response)
+
+        lines = content.strip().splitlines()
+        self.assertEqual(lines[0], 'email,first_name,tags')
+        self.assertEqual(len(lines), 26)
+        self.assertIn('client0@test.com,Client0,VIP', lines)
+        # clients + one tags prefetch per chunk, independent of row count
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_export_json_is_a_valid_array(self):
+        response = self.client.get('/api/clients/clients/export_json/?fields=email,tags')
+        data = json.loads(self.read_stream(response))
+
+        self.assertEqual(len(data), 25)
+        self.assertEqual(data[0]['tags'], ['VIP'])
+
+    def test_export_ndjson_emits_one_object_per_line(self):
+        response = self.client.get('/api/clients/clients/export_json/?fields=email&json_format=ndjson')
+        lines = self.read_stream(response).splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(lines), 25)
+        self.assertIn('email', json.loads(lines[0]))
+
+    def test_exhibition_export_uses_streaming_engine(self):
+        response = self.client.get('/api/exhibition/exhibition-leads/export/')
+        lines = self.read_stream(response).strip().splitlines()
+
+        self.assertTrue(lines[0].startswith('ID,First Name,Last Name,Email'))
+        self.assertEqual(len(lines), 2)
+        self.assertIn('lead@test.com', lines[1])
+
+
+class ClientBulkImportTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        self.client.force_authenticate(user=self.manager)
+        CustomerTag.objects.create(name="Social Lead", slug="social-lead", category="source")
+        Client.objects.create(email="existing@test.com", phone="9999999999", tenant=self.tenant, store=self.store)
+
+    def upload(self, lines):
+        upload = SimpleUploadedFile('customers.csv', '\n'.join(lines).encode(), content_type='text/csv')
+        return self.client.post('/api/clients/clients/import_file/', {'file': upload}, format='multipart')
+
+    def upload_counting_queries(self, prefix, phone_prefix, count):
+        lines = ['first_name,email,phone,lead_source']
+        lines += [f'Client{i},{prefix}{i}@test.com,{phone_prefix}{i:08d},instagram' for i in range(count)]
+        # Django splits bulk inserts into batches of 999 parameters on SQLite; count only the importer's queries
+        with CaptureQueriesContext(connection) as context, \
+                mock.patch.object(connection.ops, 'bulk_batch_size', lambda fields, objs: len(objs)):
+            response = self.upload(lines)
+        return response, len(context.captured_queries)
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        small, small_queries = self.upload_counting_queries('small', '71', 10)
+        large, large_queries = self.upload_counting_queries('large', '72', 200)
+        self.assertEqual((small.data['imported'], large.data['imported']), (10, 200))
+        self.assertEqual(small_queries, large_queries)
+
+    def test_import_creates_clients_in_bulk(self):
+        lines = ['first_name,email,phone,lead_source']
+        lines += [f'Client{i},client{i}@test.com,90000{i:05d},instagram' for i in range(250)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload(lines)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 250)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Client.objects.filter(tenant=self.tenant, store=self.store).count(), 251)
+
+        imported = Client.objects.get(email='client7@test.com')
+        self.assertEqual(imported.created_by, self.manager)
+        self.assertEqual(list(imported.tags.values_list('slug', flat=True)), ['social-lead'])
+        self.assertTrue(AuditLog.objects.filter(client=imported, action='create').exists())
+        self.assertEqual(ActivityEvent.objects.filter(kind='customer', tenant=self.tenant).count(), 251)
+        # Imported days are queued for a rollup rebuild on commit
+        self.assertIn(flush_rollup_updates, callbacks)
+
+    def test_import_reports_duplicates_and_invalid_rows(self):
+        response = self.upload([
+            'first_name,email,phone',
+            'Dup,existing@test.com,',
+            'Phone dup,,9999999999',
+            'Nobody,,',
+            'Bad,not-an-email,',
+            'New,new@test.com,',
+            'Again,new@test.com,',
+            'PhoneOnly,,+91 12345',
+        ])
+
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 5)
+        self.assertEqual(response.data['errors'][0], 'Row 2: Customer with existing@test.com already exists')
+        self.assertEqual(response.data['errors'][1], 'Row 3: Customer with phone 9999999999 already exists')
+        self.assertEqual(response.data['errors'][2], 'Row 4: Either email or phone is required')
+        self.assertTrue(Client.objects.filter(email='imported_9112345@imported.local').exists())
+
+    def test_import_rejects_invalid_choices_and_follow_up_dates(self):
+        response = self.upload([
+            'email,status,customer_type,next_follow_up,date_of_birth',
+            'a@test.com,vip,,,',
+            'b@test.com,,reseller,,',
+            'c@test.com,,,Call next week,',
+            'd@test.com,customer,corporate,2030-01-15,not a date',
+        ])
+
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['errors'], [
+            'Row 2: status: "vip" is not a valid choice.',
+            'Row 3: customer_type: "reseller" is not a valid choice.',
+            'Row 4: next_follow_up: Enter a valid date (YYYY-MM-DD).',
+        ])
+        imported = Client.objects.get(email='d@test.com')
+        self.assertEqual((imported.status, imported.customer_type), ('customer', 'corporate'))
+        self.assertEqual(str(imported.next_follow_up), '2030-01-15')
+        # Unparseable birth dates are still skipped rather than rejected
+        self.assertIsNone(imported.date_of_birth)
+
+    def test_failed_batch_does_not_roll_back_other_batches(self):
+        importer = ClientBulkImporter(self.tenant.id, self.store.id, user=self.manager, batch_size=2)
+        importer.load_existing()
+        valid = importer.validate([{'email': f'batch{i}@test.com'} for i in range(4)])
+
+        # A concurrent insert collides with the second batch after validation
+        Client.objects.create(email='batch3@test.com', tenant=self.tenant)
+        importer.insert_batch(valid[:2])
+        importer.insert_batch(valid[2:])
+        result = {'imported': importer.imported, 'errors': importer.errors, 'batches': importer.batches}
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual([batch['imported'] for batch in result['batches']], [2, 0])
+        self.assertTrue(result['errors'][0].startswith('Rows 4-5: Failed to save batch'))
+        self.assertTrue(Client.objects.filter(email='batch0@test.com').exists())
+
+
+class UploadReaderTest(APITestCase):
+    def build_workbook(self):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['first_name', 'email', 'phone', 'city'])
+        ws.append(['Asha', 'asha@test.com', 9876543210, 'Pune'])
+        ws.append(['Ravi', None, None])
+        ws.append([None, 'blank@test.com', '', None])
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+
+    def test_streaming_workbook_reader_matches_legacy_reader(self):
+        content = self.build_workbook()
+
+        streamed = read_upload_rows(SimpleUploadedFile('customers.xlsx', content))
+        self.assertNotIsInstance(streamed, list)
+        legacy = legacy_read_workbook_rows(SimpleUploadedFile('customers.xlsx', content))
+
+        self.assertEqual(list(streamed), legacy)
+        self.assertEqual(legacy[0], {'first_name': 'Asha', 'email': 'asha@test.com', 'phone': '9876543210', 'city': 'Pune'})
+        self.assertEqual(legacy[1]['city'], '')
+
+    def test_csv_rows_are_streamed(self):
+        upload = SimpleUploadedFile('customers.csv', 'first_name,email\nAsha,asha@test.com\nRavi,ravi@test.com\n'.encode())
+        rows = read_upload_rows(upload)
+
+        self.assertEqual(next(rows), {'first_name': 'Asha', 'email': 'asha@test.com'})
+        self.assertEqual(len(list(rows)), 1)
+
+    def test_estimate_upload_rows_rewinds_file(self):
+        upload = SimpleUploadedFile('customers.xlsx', self.build_workbook())
+
+        self.assertEqual(estimate_upload_rows(upload), 3)
+        self.assertEqual(len(list(read_upload_rows(upload))), 3)
+
+
+class ClientStatusRecomputeTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.user = User.objects.create_user(
+            username="admin",
+            password="testpass123",
+            role=User.Role.BUSINESS_ADMIN,
+            tenant=self.tenant
+        )
+        self.big_spender = Client.objects.create(email="big@test.com", tenant=self.tenant, store=self.store)
+        self.small_buyer = Client.objects.create(email="small@test.com", tenant=self.tenant, store=self.store)
+        self.interested = Client.objects.create(email="pipe@test.com", tenant=self.tenant, store=self.store)
+        self.idle = Client.objects.create(email="idle@test.com", tenant=self.tenant, store=self.store)
+        self.other = Client.objects.create(email="other@test.com", tenant=self.other_tenant)
+
+        self.make_sale(self.big_spender, "15000.00")
+        self.make_sale(self.small_buyer, "500.00")
+        # Unpaid sales don't count towards the purchase history
+        self.make_sale(self.idle, "90000.00", payment_status=Sale.PaymentStatus.PENDING)
+        self.make_sale(self.other, "500.00")
+        SalesPipeline.objects.create(
+            title="Ring",
+            client=self.interested,
+            sales_representative=self.user,
+            stage='negotiation',
+            expected_value=Decimal("2000.00"),
+            tenant=self.tenant
+        )
+
+        # Sale/pipeline signals already set statuses; make them all stale
+        Client.objects.update(status=Client.Status.LEAD)
+        Client.objects.filter(pk=self.idle.pk).update(status=Client.Status.CUSTOMER)
+
+    def make_sale(self, client, amount, payment_status=Sale.PaymentStatus.PAID):
+        return Sale.objects.create(
+            order_number=f"ORD-{Sale.objects.count() + 1}",
+            client=client,
+            sales_representative=self.user,
+            status=Sale.Status.CONFIRMED,
+            payment_status=payment_status,
+            subtotal=Decimal(amount),
+            total_amount=Decimal(amount),
+            paid_amount=Decimal(amount),
+            tenant=client.tenant
+        )
+
+    def statuses(self):
+        return dict(Client.objects.values_list('email', 'status'))
+
+    def test_recompute_matches_per_client_rules(self):
+        """The set-based recompute agrees with update_status_based_on_behavior"""
+        ClientStatusRecompute(tenant_id=self.tenant.id).run()
+        recomputed = self.statuses()
+
+        Client.objects.update(status=Client.Status.LEAD)
+        for client in Client.objects.filter(tenant=self.tenant):
+            client.update_status_based_on_behavior()
+        expected = self.statuses()
+
+        self.assertEqual(recomputed, expected)
+        self.assertEqual(recomputed["big@test.com"], Client.Status.CUSTOMER)
+        self.assertEqual(recomputed["small@test.com"], Client.Status.PROSPECT)
+        self.assertEqual(recomputed["pipe@test.com"], Client.Status.PROSPECT)
+        self.assertEqual(recomputed["idle@test.com"], Client.Status.LEAD)
+        # Other tenants are left alone
+        self.assertEqual(recomputed["other@test.com"], Client.Status.LEAD)
+
+    def test_changes_are_batched_and_audited(self):
+        """One aggregate read plus one UPDATE and one audit INSERT per batch"""
+        with CaptureQueriesContext(connection) as context:
+            changes = ClientStatusRecompute(tenant_id=self.tenant.id, batch_size=2).run()
+
+        self.assertEqual(len(changes), 4)
+        updates = [q for q in context.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('CASE WHEN', updates[0]['sql'])
+        log = AuditLog.objects.get(client=self.idle, action='update')
+        self.assertEqual(log.before, {'status': 'customer'})
+        self.assertEqual(log.after, {'status': 'lead'})
+
+    def test_since_only_touches_clients_with_new_activity(self):
+        """--since skips clients whose sales and pipelines are older"""
+        Sale.objects.exclude(client=self.small_buyer).update(updated_at=timezone.now() - timedelta(days=3))
+        SalesPipeline.objects.update(updated_at=timezone.now() - timedelta(days=3))
+
+        out = io.StringIO()
+        call_command(
+            'update_customer_statuses',
+            tenant=self.tenant.id,
+            since=(timezone.now() - timedelta(days=1)).date().isoformat(),
+            stdout=out,
+        )
+
+        statuses = self.statuses()
+        self.assertEqual(statuses["small@test.com"], Client.Status.PROSPECT)
+        self.assertEqual(statuses["big@test.com"], Client.Status.LEAD)
+        self.assertEqual(statuses["pipe@test.com"], Client.Status.LEAD)
+        self.assertIn('Total customers processed: 1', out.getvalue())
+
+    def test_dry_run_changes_nothing(self):
+        call_command('update_customer_statuses', dry_run=True, stdout=io.StringIO())
+        self.assertEqual(Client.objects.exclude(status=Client.Status.LEAD).count(), 1)
+        self.assertFalse(AuditLog.objects.filter(before={'status': 'lead'}).exists())
+
+    def test_sale_saves_are_coalesced_until_commit(self):
+        """Many sale saves in one transaction trigger one recompute after commit"""
+        Client.objects.update(status=Client.Status.LEAD)
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    self.make_sale(self.small_buyer, "100.00")
+                self.make_sale(self.idle, "100.00")
+                # Nothing is recomputed inline
+                self.assertEqual(self.statuses()["small@test.com"], Client.Status.LEAD)
+
+        # The daily sales rollups are refreshed from the same commit; only count the status recompute
+        aggregates = [q for q in context.captured_queries if 'SUM(' in q['sql'] and 'FROM "clients_client"' in q['sql']]
+        self.assertEqual(len(aggregates), 1)
+        statuses = self.statuses()
+        self.assertEqual(statuses["small@test.com"], Client.Status.CUSTOMER)
+        self.assertEqual(statuses["idle@test.com"], Client.Status.PROSPECT)
+
+    def test_deferred_updates_flush_once(self):
+        """defer_status_updates holds the queue until the block exits"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with defer_status_updates():
+                self.make_sale(self.small_buyer, "100.00")
+                self.make_sale(self.big_spender, "100.00")
+                self.assertEqual(callbacks, [])
+
+        self.assertEqual(callbacks.count(flush_status_updates), 1)
+        self.assertEqual(self.statuses()["small@test.com"], Client.Status.CUSTOMER)
+
+
+class AutoTaggingTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        for slug in ['social-lead', 'wedding-buyer', 'birthday-week', 'young-adult',
+                     'millennial-shopper', 'gold-interested', 'diamond-interested', 'mixed-buyer']:
+            CustomerTag.objects.create(name=slug, slug=slug)
+        self.today = date(2024, 6, 15)
+
+    def tag_slugs(self, client):
+        return set(client.tags.values_list('slug', flat=True))
+
+    def test_rules(self):
+        """Each rule table maps client fields to the expected slugs"""
+        client = Client(
+            email="a@test.com",
+            reason_for_visit=" Wedding ",
+            lead_source="Instagram",
+            community="cross community",
+            status="prospect",
+            date_of_birth=date(2000, 6, 10),
+            anniversary_date=date(2020, 6, 30),
+            next_follow_up="call back",
+        )
+        slugs = get_auto_tag_slugs(client, interest_categories=["Gold", "diamond"], today=self.today)
+        self.assertEqual(slugs, {
+            'wedding-buyer', 'social-lead', 'cross-community', 'interested-lead',
+            'young-adult', 'birthday-week', 'gold-interested', 'diamond-interested',
+            'mixed-buyer', 'needs-follow-up',
+        })
+
+    def test_signal_tags_new_client_in_one_insert(self):
+        """A new client is tagged without reading interests or tags one by one"""
+        with CaptureQueriesContext(connection) as context:
+            client = Client.objects.create(email="b@test.com", lead_source="instagram", tenant=self.tenant)
+        tag_queries = [q['sql'] for q in context.captured_queries if 'clients_client_tags' in q['sql']]
+        self.assertEqual(len(tag_queries), 1)
+        self.assertTrue(tag_queries[0].startswith('INSERT'))
+        self.assertEqual(self.tag_slugs(client), {'social-lead'})
+
+    def test_bulk_tagging_uses_one_insert_per_batch(self):
+        """ClientTagger tags many clients with one interests query and one insert per batch"""
+        category = Category.objects.create(name="Gold", tenant=self.tenant)
+        clients = Client.objects.bulk_create([
+            Client(email=f"c{i}@test.com", lead_source="instagram", tenant=self.tenant) for i in range(30)
+        ])
+        product = Product.objects.create(
+            name="Gold Ring",
+            sku="GR001",
+            category=category,
+            cost_price=Decimal('100.00'),
+            selling_price=Decimal('150.00'),
+            tenant=self.tenant
+        )
+        CustomerInterest.objects.create(
+            client=clients[0], category=category, product=product, revenue=Decimal('150.00'), tenant=self.tenant
+        )
+
+        tagger = ClientTagger(today=self.today, batch_size=10)
+        with CaptureQueriesContext(connection) as context:
+            tagger.tag_queryset(Client.objects.filter(tenant=self.tenant))
+
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Client.tags.through.objects.filter(customertag__slug='social-lead').count(), 30)
+        self.assertEqual(self.tag_slugs(clients[0]), {'social-lead', 'gold-interested'})
+
+    def test_nightly_sync_adds_and_expires_calendar_tags(self):
+        """retag_clients adds birthday-week when due and removes it once the week has passed"""
+        client = Client.objects.create(email="d@test.com", date_of_birth=date(1999, 6, 12), tenant=self.tenant)
+        Client.tags.through.objects.filter(client=client).delete()
+
+        call_command('retag_clients', date='2024-06-15', stdout=io.StringIO())
+        self.assertEqual(self.tag_slugs(client), {'birthday-week', 'young-adult'})
+
+        call_command('retag_clients', date='2024-06-25', stdout=io.StringIO())
+        self.assertEqual(self.tag_slugs(client), {'young-adult'})
+
+        # Past the next birthday the age band moves on
+        call_command('retag_clients', date='2025-06-30', stdout=io.StringIO())
+        self.assertEqual(self.tag_slugs(client), {'millennial-shopper'})
+
+    def test_age_band_alone_does_not_make_a_nightly_candidate(self):
+        banded = Client.objects.create(email="e@test.com", date_of_birth=date(2000, 2, 1), tenant=self.tenant)
+        self.assertTrue(self.tag_slugs(banded) & {'young-adult', 'millennial-shopper'})
+        tagger = ClientTagger(today=self.today)
+        self.assertFalse(tagger.time_based_candidates(Client.objects.filter(pk=banded.pk)).exists())
+
+        banded.tags.add(CustomerTag.objects.get(slug='birthday-week'))
+        self.assertTrue(tagger.time_based_candidates(Client.objects.filter(pk=banded.pk)).exists())
+
+    def test_tag_ids_follow_tag_writes_through_the_shared_cache(self):
+        stale = {'social-lead': 999999}
+        cache.set(tag_ids._map_key(cache.get(tag_ids.generation_key, 0)), stale)
+        self.assertEqual(tag_ids.get(), stale)
+
+        tag = CustomerTag.objects.create(name='gifting', slug='gifting')
+        ids = tag_ids.get()
+        self.assertEqual(ids['gifting'], tag.id)
+        self.assertEqual(ids['social-lead'], CustomerTag.objects.get(slug='social-lead').id)
+
+        tag.delete()
+        self.assertNotIn('gifting', tag_ids.get())
+
+
+class ClientAuditLogTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        # Audit rows are written by one hook per transaction; commit the create's before the test's own
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_obj = Client.objects.create(email="a@test.com", first_name="Asha", tenant=self.tenant)
+
+    def test_update_logs_only_changed_fields_without_refetch(self):
+        """An update stores a diff and doesn't re-read the client row"""
+        client = Client.objects.get(pk=self.client_obj.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as context:
+                client.city = "Jaipur"
+                client.save()
+
+        rereads = [q for q in context.captured_queries if q['sql'].startswith('SELECT "clients_client"')]
+        self.assertEqual(rereads, [])
+        log = AuditLog.objects.get(client=client, action='update')
+        self.assertEqual(log.before, {'city': None})
+        self.assertEqual(log.after, {'city': 'Jaipur'})
+
+    def test_unchanged_save_is_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.get(pk=self.client_obj.pk).save()
+        self.assertFalse(AuditLog.objects.filter(action='update').exists())
+
+    def test_rows_are_written_in_one_insert_on_commit(self):
+        """Several saves in a transaction produce one bulk insert at commit"""
+        client = Client.objects.get(pk=self.client_obj.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            for city in ["Pune", "Delhi", "Goa"]:
+                client.city = city
+                client.save()
+            self.assertFalse(AuditLog.objects.filter(action='update').exists())
+
+        with CaptureQueriesContext(connection) as context:
+            for callback in callbacks:
+                callback()
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT INTO "clients_auditlog"')]
+        self.assertEqual(len(inserts), 1)
+        logs = list(AuditLog.objects.filter(action='update').order_by('id'))
+        self.assertEqual([log.after['city'] for log in logs], ["Pune", "Delhi", "Goa"])
+        # Consecutive saves of one instance diff against the previous save
+        self.assertEqual(logs[1].before, {'city': 'Pune'})
+
+    def test_rolled_back_savepoint_discards_its_rows(self):
+        client = Client.objects.get(pk=self.client_obj.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    client.city = "Delhi"
+                    client.save()
+                    raise ValueError
+            except ValueError:
+                pass
+            client.city = "Pune"
+            client.save()
+            client.city = "Goa"
+            client.save()
+
+        # One hook per transaction, registered again after the savepoint dropped the first
+        self.assertEqual(len([callback for callback in callbacks if isinstance(callback, _AuditBuffer)]), 1)
+        self.assertEqual(
+            [log.after for log in AuditLog.objects.filter(action='update').order_by('id')],
+            [{'city': 'Pune'}, {'city': 'Goa'}]
+        )
+
+    def test_rows_of_clients_rolled_back_in_a_savepoint_are_skipped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            client = Client.objects.get(pk=self.client_obj.pk)
+            client.city = "Pune"
+            client.save()
+            try:
+                with transaction.atomic():
+                    Client.objects.create(email="gone@test.com", tenant=self.tenant)
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertFalse(AuditLog.objects.filter(action='create').exclude(client=self.client_obj).exists())
+        self.assertTrue(AuditLog.objects.filter(client=client, action='update').exists())
+
+    def test_prune_deletes_whole_months_past_retention(self):
+        old = AuditLog.objects.create(client=self.client_obj, action='update', after={'city': 'Old'})
+        recent = AuditLog.objects.create(client=self.client_obj, action='update', after={'city': 'New'})
+        AuditLog.objects.filter(pk=old.pk).update(timestamp=timezone.now() - timedelta(days=500))
+
+        out = io.StringIO()
+        call_command('prune_audit_logs', months=12, batch_size=1, stdout=out)
+
+        self.assertFalse(AuditLog.objects.filter(pk=old.pk).exists())
+        self.assertTrue(AuditLog.objects.filter(pk=recent.pk).exists())
+
+
+class AuditLogApiTest(APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant
+        )
+        self.client.force_authenticate(user=self.manager)
+        self.customer = Client.objects.create(email="a@test.com", tenant=self.tenant)
+        self.other = Client.objects.create(email="b@test.com", tenant=self.other_tenant)
+
+        now = timezone.now()
+        for days_ago in range(5):
+            log = AuditLog.objects.create(client=self.customer, action='update', after={'n': days_ago})
+            AuditLog.objects.filter(pk=log.pk).update(timestamp=now - timedelta(days=days_ago))
+        AuditLog.objects.create(client=self.other, action='update', after={'n': 'other'})
+
+    def test_tenant_is_copied_from_client(self):
+        self.assertEqual(
+            set(AuditLog.objects.filter(client=self.customer).values_list('tenant_id', flat=True)),
+            {self.tenant.id}
+        )
+
+    def test_keyset_pages_cover_tenant_history_once(self):
+        """Cursor pages walk the tenant's history newest first without overlap"""
+        seen = []
+        url = f'/api/clients/audit-logs/?client={self.customer.id}&action=update&page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row['after']['n'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+
+    def test_other_tenants_are_hidden(self):
+        response = self.client.get('/api/clients/audit-logs/?page_size=50')
+        clients = {row['client'] for row in response.data['results']}
+        self.assertEqual(clients, {self.customer.id})
+
+    def test_time_range(self):
+        since = (timezone.now() - timedelta(days=2, hours=12)).isoformat()
+        until = (timezone.now() - timedelta(hours=12)).isoformat()
+        response = self.client.get('/api/clients/audit-logs/', {'since': since, 'until': until, 'action': 'update', 'page_size': 50})
+        self.assertEqual([row['after']['n'] for row in response.data['results']], [1, 2])
+
+        response = self.client.get('/api/clients/audit-logs/?since=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_date_only_until_includes_that_day(self):
+        today = timezone.localdate().isoformat()
+        response = self.client.get('/api/clients/audit-logs/', {'since': today, 'until': today, 'action': 'update', 'page_size': 50})
+        self.assertEqual([row['after']['n'] for row in response.data['results']], [0])
+
+    def test_non_numeric_ids_are_rejected(self):
+        for param in ['client', 'user']:
+            response = self.client.get('/api/clients/audit-logs/', {param: 'abc'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(param, response.data)
@@ -2,8 +2,10 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework import status
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.db.models import Q, Count
 from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, Purchase, AuditLog, CustomerTag, serialize_field
 from .serializers import (
@@ -13,14 +15,18 @@ from .serializers import (
 )
 from apps.users.permissions import IsRoleAllowed, CanDeleteCustomer
 from apps.users.middleware import ScopedVisibilityMixin
+from .pagination import AuditLogKeysetPagination, ClientKeysetPagination
+from .exports import ClientExport, DEFAULT_EXPORT_FIELDS
+from .imports import ClientBulkImporter, read_upload_rows
+from apps.imports.jobs import create_import_job, is_background_request
+from apps.imports.models import ImportJob
+from apps.imports.views import import_job_accepted
 from rest_framework import mixins
 from rest_framework import permissions
 import csv
-import io
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.http import HttpResponse
-from django.db import transaction
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 # import openpyxl
 # from openpyxl import Workbook
@@ -90,6 +96,9 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
         # Exhibition leads should ONLY be visible in the exhibition leads view
         # This ensures complete separation until they are promoted
         queryset = queryset.exclude(status='exhibition')
+
+        if getattr(self, 'action', None) in ['list', 'retrieve']:
+            queryset = ClientSerializer.setup_eager_loading(queryset)
         
         return queryset
     
@@ -111,10 +120,11 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
             # Set tenant and store automatically
-            if request.user.tenant:
-                request.data['tenant'] = request.user.tenant.id
-            if request.user.store:
-                request.data['store'] = request.user.store.id
+            principal = self.get_principal()
+            if principal.tenant_id:
+                request.data['tenant'] = principal.tenant_id
+            if principal.store_id:
+                request.data['store'] = principal.store_id
             
             # Set created_by automatically
             request.data['created_by'] = request.user.id
@@ -132,7 +142,7 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                 print(f"=== APPOINTMENT CREATION DEBUG ===")
                 print(f"Client data: {client_data}")
                 print(f"Next follow up: {next_follow_up}")
-                print(f"User tenant: {request.user.tenant}")
+                print(f"User tenant: {principal.tenant_name}")
                 print(f"User: {request.user}")
                 
                 if next_follow_up:
@@ -153,7 +163,7 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                         # Create appointment for the follow-up
                         appointment_data = {
                             'client_id': client_data['id'],
-                            'tenant': request.user.tenant,
+                            'tenant_id': principal.tenant_id,
                             'date': follow_up_date,
                             'time': follow_up_time,
                             'purpose': f"Follow-up for {client_data.get('first_name', '')} {client_data.get('last_name', '')}",
@@ -214,11 +224,16 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
         print(f"Request user: {request.user}")
         print(f"Request authenticated: {request.user.is_authenticated}")
         if request.user.is_authenticated:
-            print(f"User tenant: {request.user.tenant}")
+            print(f"User tenant: {self.get_principal().tenant_name}")
         
         queryset = self.get_queryset()
-        print(f"Queryset count: {queryset.count()}")
-        print(f"Queryset SQL: {queryset.query}")
+
+        # Opt-in keyset pagination (?page_size= / ?cursor=) keeps latency flat on large tenants
+        paginator = ClientKeysetPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.get_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         
         serializer = self.get_serializer(queryset, many=True)
         response_data = serializer.data
@@ -247,15 +262,19 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
     def perform_create(self, serializer):
         """Automatically set tenant and store when creating a client."""
         user = self.request.user
+        principal = self.get_principal()
         instance = serializer.save()
         
         # Set tenant and store if not already set
-        if user.tenant and not instance.tenant:
-            instance.tenant = user.tenant
-        if user.store and not instance.store:
-            instance.store = user.store
+        needs_save = False
+        if principal.tenant_id and not instance.tenant_id:
+            instance.tenant_id = principal.tenant_id
+            needs_save = True
+        if principal.store_id and not instance.store_id:
+            instance.store_id = principal.store_id
+            needs_save = True
         
-        if instance.tenant or instance.store:
+        if needs_save:
             instance.save()
         
         # Set audit log user for tracking
@@ -444,11 +463,12 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
         """List all soft-deleted clients for the tenant."""
         queryset = Client.objects.filter(is_deleted=True)
         if request.user.is_authenticated:
-            user_tenant = request.user.tenant
-            if user_tenant:
-                queryset = queryset.filter(tenant=user_tenant)
+            tenant_id = self.get_principal().tenant_id
+            if tenant_id:
+                queryset = queryset.filter(tenant_id=tenant_id)
             else:
                 queryset = Client.objects.none()
+        queryset = ClientSerializer.setup_eager_loading(queryset)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -490,54 +510,18 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
             return Response({'status': 'client permanently deleted'})
         return Response({'error': 'client must be soft-deleted first'}, status=status.HTTP_400_BAD_REQUEST)
 
+    def get_export_fields(self, request):
+        fields_param = request.GET.get('fields', '')
+        if fields_param:
+            return fields_param.split(',')
+        return DEFAULT_EXPORT_FIELDS
+
     @action(detail=False, methods=['get'], permission_classes=[ImportExportPermission])
     def export_csv(self, request):
         """Export customers to CSV - only for business admin and managers"""
         try:
-            queryset = self.get_queryset()
-            
-            # Get requested fields from query parameters
-            fields_param = request.GET.get('fields', '')
-            if fields_param:
-                requested_fields = fields_param.split(',')
-            else:
-                # Default fields if none specified
-                requested_fields = [
-                    'first_name', 'last_name', 'email', 'phone', 'customer_type',
-                    'address', 'city', 'state', 'country', 'postal_code',
-                    'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
-                    'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
-                    'mother_tongue', 'reason_for_visit', 'age_of_end_user', 'saving_scheme',
-                    'catchment_area', 'next_follow_up', 'summary_notes', 'status',
-                    'created_at', 'updated_at', 'tags'
-                ]
-            
-            # Create CSV response
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-            
-            writer = csv.DictWriter(response, fieldnames=requested_fields)
-            writer.writeheader()
-            
-            for client in queryset:
-                row = {}
-                for field in requested_fields:
-                    if field == 'date_of_birth' and client.date_of_birth:
-                        row[field] = client.date_of_birth.strftime('%Y-%m-%d')
-                    elif field == 'anniversary_date' and client.anniversary_date:
-                        row[field] = client.anniversary_date.strftime('%Y-%m-%d')
-                    elif field in ['created_at', 'updated_at']:
-                        row[field] = getattr(client, field).strftime('%Y-%m-%d %H:%M:%S')
-                    elif field == 'tags':
-                        row[field] = ', '.join([tag.name for tag in client.tags.all()])
-                    else:
-                        value = getattr(client, field, '')
-                        row[field] = str(value) if value is not None else ''
-                
-                writer.writerow(row)
-            
-            return response
-            
+            export = ClientExport(self.get_queryset(), self.get_export_fields(request))
+            return export.csv_response(f'customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
         except Exception as e:
             return Response(
                 {'error': f'Export failed: {str(e)}'}, 
@@ -546,52 +530,18 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
 
     @action(detail=False, methods=['get'], permission_classes=[ImportExportPermission])
     def export_json(self, request):
-        """Export customers to JSON - only for business admin and managers"""
+        """
+        Export customers to JSON - only for business admin and managers.
+        Pass ?json_format=ndjson for one JSON object per line.
+        """
         try:
-            queryset = self.get_queryset()
-            
-            # Get requested fields from query parameters
-            fields_param = request.GET.get('fields', '')
-            if fields_param:
-                requested_fields = fields_param.split(',')
-            else:
-                # Default fields if none specified
-                requested_fields = [
-                    'first_name', 'last_name', 'email', 'phone', 'customer_type',
-                    'address', 'city', 'state', 'country', 'postal_code',
-                    'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
-                    'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
-                    'mother_tongue', 'reason_for_visit', 'age_of_end_user', 'saving_scheme',
-                    'catchment_area', 'next_follow_up', 'summary_notes', 'status',
-                    'created_at', 'updated_at', 'tags'
-                ]
-            
-            # Serialize data with only requested fields
-            data = []
-            for client in queryset:
-                client_data = {}
-                for field in requested_fields:
-                    if field == 'date_of_birth' and client.date_of_birth:
-                        client_data[field] = client.date_of_birth.strftime('%Y-%m-%d')
-                    elif field == 'anniversary_date' and client.anniversary_date:
-                        client_data[field] = client.anniversary_date.strftime('%Y-%m-%d')
-                    elif field in ['created_at', 'updated_at']:
-                        client_data[field] = getattr(client, field).strftime('%Y-%m-%d %H:%M:%S')
-                    elif field == 'tags':
-                        client_data[field] = [tag.name for tag in client.tags.all()]
-                    else:
-                        value = getattr(client, field, '')
-                        client_data[field] = value if value is not None else ''
-                data.append(client_data)
-            
-            response = HttpResponse(
-                json.dumps(data, indent=2, default=str),
-                content_type='application/json'
+            export = ClientExport(self.get_queryset(), self.get_export_fields(request))
+            ndjson = request.GET.get('json_format') == 'ndjson'
+            extension = 'ndjson' if ndjson else 'json'
+            return export.json_response(
+                f'customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}',
+                ndjson=ndjson,
             )
-            response['Content-Disposition'] = f'attachment; filename="customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json"'
-            
-            return response
-            
         except Exception as e:
             return Response(
                 {'error': f'Export failed: {str(e)}'}, 
@@ -681,251 +631,54 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Process file based on type
-            if file.name.lower().endswith('.csv'):
-                # Read CSV file
-                decoded_file = file.read().decode('utf-8')
-                csv_data = csv.DictReader(io.StringIO(decoded_file))
-                rows = list(csv_data)
-            else:
-                # Read Excel file (XLSX or XLS)
-                try:
-                    import openpyxl
-                    from openpyxl import load_workbook
-                    
-                    # Load the workbook
-                    wb = load_workbook(file, data_only=True)
-                    ws = wb.active
-                    
-                    # Get headers from first row
-                    headers = []
-                    for cell in ws[1]:
-                        headers.append(cell.value or f'column_{len(headers)}')
-                    
-                    # Convert Excel data to list of dictionaries
-                    rows = []
-                    for row_num in range(2, ws.max_row + 1):  # Start from row 2 (skip header)
-                        row_data = {}
-                        for col_num, header in enumerate(headers, 1):
-                            cell_value = ws.cell(row=row_num, column=col_num).value
-                            row_data[header] = str(cell_value) if cell_value is not None else ''
-                        rows.append(row_data)
-                        
-                except ImportError:
-                    return Response(
-                        {'error': 'Excel file processing not available. Please install openpyxl.'}, 
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-                except Exception as e:
-                    return Response(
-                        {'error': f'Error reading Excel file: {str(e)}'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            imported_count = 0
-            errors = []
-            
-            print(f"=== IMPORT START ===")
-            print(f"User: {request.user}")
-            print(f"User tenant: {request.user.tenant}")
-            print(f"User store: {request.user.store}")
-            print(f"Total rows to process: {len(rows)}")
-            print(f"First row sample: {rows[0] if rows else 'No rows'}")
+            principal = self.get_principal()
             
             # Check if user has required assignments
-            if not request.user.tenant:
+            if not principal.tenant_id:
                 return Response(
                     {'error': 'User does not have a tenant assigned. Please contact your administrator.'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            if not request.user.store:
+            if not principal.store_id:
                 return Response(
                     {'error': 'User does not have a store assigned. Please contact your administrator to assign you to a store.'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            with transaction.atomic():
-                for row_num, row in enumerate(rows, start=2):  # Start from 2 to account for header
-                    try:
-                        # Clean and validate data - email is required by serializer, so we need to handle this
-                        email = row.get('email', '').strip()
-                        phone = row.get('phone', '').strip()
-                        
-                        # Require either email or phone
-                        if not email and not phone:
-                            errors.append(f'Row {row_num}: Either email or phone is required')
-                            continue
-                        
-                        # If no email provided, generate a placeholder email using phone
-                        if not email and phone:
-                            email = f"imported_{phone.replace('+', '').replace('-', '').replace(' ', '')}@imported.local"
-                        
-                        # Check if customer already exists (by email or phone)
-                        existing_customer = None
-                        if email:
-                            existing_customer = Client.objects.filter(email=email, tenant=request.user.tenant, is_deleted=False).first()
-                        if not existing_customer and phone:
-                            existing_customer = Client.objects.filter(phone=phone, tenant=request.user.tenant, is_deleted=False).first()
-                        
-                        if existing_customer:
-                            identifier = email if email else phone
-                            errors.append(f'Row {row_num}: Customer with {identifier} already exists')
-                            continue
-                        
-                        # Prepare data for creation - email is now guaranteed to have a value
-                        client_data = {
-                            'first_name': row.get('first_name', '').strip() or '',
-                            'last_name': row.get('last_name', '').strip() or '',
-                            'email': email,
-                            'phone': phone or '',
-                            'customer_type': row.get('customer_type', 'individual'),
-                            'address': row.get('address', '').strip() or '',
-                            'city': row.get('city', '').strip() or '',
-                            'state': row.get('state', '').strip() or '',
-                            'country': row.get('country', '').strip() or '',
-                            'postal_code': row.get('postal_code', '').strip() or '',
-                            'preferred_metal': row.get('preferred_metal', '').strip() or '',
-                            'preferred_stone': row.get('preferred_stone', '').strip() or '',
-                            'ring_size': row.get('ring_size', '').strip() or '',
-                            'budget_range': row.get('budget_range', '').strip() or '',
-                            'lead_source': row.get('lead_source', '').strip() or '',
-                            'notes': row.get('notes', '').strip() or '',
-                            'community': row.get('community', '').strip() or '',
-                            'mother_tongue': row.get('mother_tongue', '').strip() or '',
-                            'reason_for_visit': row.get('reason_for_visit', '').strip() or '',
-                            'age_of_end_user': row.get('age_of_end_user', '').strip() or '',
-                            'saving_scheme': row.get('saving_scheme', '').strip() or '',
-                            'catchment_area': row.get('catchment_area', '').strip() or '',
-                            'next_follow_up': row.get('next_follow_up', '').strip() or '',
-                            'summary_notes': row.get('summary_notes', '').strip() or '',
-                            'status': row.get('status', 'lead'),
-                            'tenant': request.user.tenant.id if request.user.tenant else None,
-                            'store': request.user.store.id if request.user.store else None,
-                        }
-                        
-                        # Handle date fields - completely exclude if empty
-                        date_of_birth = row.get('date_of_birth', '').strip()
-                        if date_of_birth and date_of_birth != '':
-                            try:
-                                client_data['date_of_birth'] = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
-                                print(f"Row {row_num}: Parsed date_of_birth: {client_data['date_of_birth']}")
-                            except ValueError:
-                                print(f"Row {row_num}: Invalid date_of_birth format: '{date_of_birth}'. Expected YYYY-MM-DD")
-                                # Don't add invalid date to client_data
-                        # If empty, don't add the field at all
-                        
-                        anniversary_date = row.get('anniversary_date', '').strip()
-                        if anniversary_date and anniversary_date != '':
-                            try:
-                                client_data['anniversary_date'] = datetime.strptime(anniversary_date, '%Y-%m-%d').date()
-                                print(f"Row {row_num}: Parsed anniversary_date: {client_data['anniversary_date']}")
-                            except ValueError:
-                                print(f"Row {row_num}: Invalid anniversary_date format: '{anniversary_date}'. Expected YYYY-MM-DD")
-                                # Don't add invalid date to client_data
-                        # If empty, don't add the field at all
-                        
-                        # Clean data - remove empty strings and None values
-                        cleaned_data = {}
-                        for key, value in client_data.items():
-                            if value is not None and value != '':
-                                cleaned_data[key] = value
-                            elif value == '':
-                                print(f"Row {row_num}: Removing empty string for field '{key}'")
-                        
-                        print(f"=== IMPORT DEBUG - Row {row_num} ===")
-                        print(f"Original client data: {client_data}")
-                        print(f"Cleaned client data: {cleaned_data}")
-                        print(f"Date fields - date_of_birth: {cleaned_data.get('date_of_birth')}, anniversary_date: {cleaned_data.get('anniversary_date')}")
-                        
-                        # Use cleaned data for serializer
-                        client_data = cleaned_data
-                        
-                        # Final check - ensure no empty strings are passed to serializer
-                        for key, value in client_data.items():
-                            if value == '':
-                                print(f"Row {row_num}: WARNING - Empty string found for field '{key}', removing it")
-                                del client_data[key]
-                        
-                        print(f"Final data for serializer: {client_data}")
-                        
-                        # Add request context to serializer for validation
-                        serializer = self.get_serializer(data=client_data, context={'request': request})
-                        print(f"Serializer context: {serializer.context}")
-                        
-                        if serializer.is_valid():
-                            try:
-                                # Save the client
-                                client = serializer.save()
-                                print(f"Client created successfully: {client.id}")
-                                
-                                # Ensure tenant and store are set (in case they weren't set by serializer)
-                                if not client.tenant and request.user.tenant:
-                                    client.tenant = request.user.tenant
-                                if not client.store and request.user.store:
-                                    client.store = request.user.store
-                                
-                                if client.tenant or client.store:
-                                    client.save()
-                                    print(f"Client updated with tenant: {client.tenant}, store: {client.store}")
-                                
-                                # Handle tags if present
-                                tags_str = row.get('tags', '').strip()
-                                if tags_str:
-                                    tag_names = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-                                    for tag_name in tag_names:
-                                        # You might want to create tags if they don't exist
-                                        # For now, we'll skip tag creation
-                                        pass
-                                
-                                imported_count += 1
-                            except Exception as save_error:
-                                print(f"=== SAVE ERROR - Row {row_num} ===")
-                                print(f"Error saving client: {save_error}")
-                                print(f"Error type: {type(save_error)}")
-                                print(f"Error args: {getattr(save_error, 'args', 'No args')}")
-                                import traceback
-                                print(f"Traceback: {traceback.format_exc()}")
-                                
-                                # Get more detailed error information
-                                if hasattr(save_error, 'detail'):
-                                    error_detail = str(save_error.detail)
-                                elif hasattr(save_error, 'message'):
-                                    error_detail = str(save_error.message)
-                                else:
-                                    error_detail = str(save_error)
-                                
-                                errors.append(f'Row {row_num}: Failed to save customer: {error_detail}')
-                                continue
-                        else:
-                            # Format serializer errors in a more user-friendly way
-                            print(f"=== VALIDATION FAILED - Row {row_num} ===")
-                            print(f"Serializer errors: {serializer.errors}")
-                            
-                            error_messages = []
-                            for field, field_errors in serializer.errors.items():
-                                if isinstance(field_errors, list):
-                                    for error in field_errors:
-                                        if hasattr(error, 'code'):
-                                            error_messages.append(f"{field}: {error}")
-                                        else:
-                                            error_messages.append(f"{field}: {error}")
-                                else:
-                                    error_messages.append(f"{field}: {field_errors}")
-                            
-                            if error_messages:
-                                errors.append(f'Row {row_num}: {"; ".join(error_messages)}')
-                            else:
-                                errors.append(f'Row {row_num}: Validation failed')
-                    
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: An error occurred while creating the customer. Please try again.')
+            if is_background_request(request):
+                job = create_import_job(
+                    ImportJob.Kind.CLIENTS, file, request.user, principal.tenant_id, principal.store_id
+                )
+                return import_job_accepted(job, request)
+            
+            try:
+                rows = read_upload_rows(file)
+            except ImportError:
+                return Response(
+                    {'error': 'Excel file processing not available. Please install openpyxl.'}, 
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            except Exception as e:
+                return Response(
+                    {'error': f'Error reading file: {str(e)}'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            print(f"=== IMPORT START ===")
+            print(f"User: {request.user}")
+            print(f"User tenant: {principal.tenant_name}")
+            print(f"User store: {principal.store_name}")
+            
+            importer = ClientBulkImporter(principal.tenant_id, principal.store_id, user=request.user)
+            result = importer.run(rows)
             
             return Response({
-                'message': f'Import completed. {imported_count} customers imported successfully.',
-                'imported': imported_count,
-                'failed': len(errors),
-                'errors': errors
+                'message': f'Import completed. {result["imported"]} customers imported successfully.',
+                'imported': result['imported'],
+                'failed': len(result['errors']),
+                'errors': result['errors'],
+                'batches': result['batches'],
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -953,6 +706,18 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            if is_background_request(request):
+                principal = self.get_principal()
+                if not principal.tenant_id:
+                    return Response(
+                        {'error': 'User does not have a tenant assigned. Please contact your administrator.'}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                job = create_import_job(
+                    ImportJob.Kind.CLIENTS_JSON, json_file, request.user, principal.tenant_id, principal.store_id
+                )
+                return import_job_accepted(job, request)
+            
             # Read JSON file
             json_data = json.loads(json_file.read().decode('utf-8'))
             
@@ -962,63 +727,13 @@ class ClientViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            imported_count = 0
-            errors = []
-            
-            with transaction.atomic():
-                for row_num, customer_data in enumerate(json_data, start=1):
-                    try:
-                        # Clean and validate data
-                        email = customer_data.get('email', '').strip()
-                        if not email:
-                            errors.append(f'Row {row_num}: Email is required')
-                            continue
-                        
-                        # Check if customer already exists
-                        if Client.objects.filter(email=email, tenant=request.user.tenant, is_deleted=False).exists():
-                            errors.append(f'Row {row_num}: Customer with email {email} already exists')
-                            continue
-                        
-                        # Prepare data for creation
-                        client_data = {
-                            'first_name': customer_data.get('first_name', '').strip(),
-                            'last_name': customer_data.get('last_name', '').strip(),
-                            'email': email,
-                            'phone': customer_data.get('phone', '').strip(),
-                            'customer_type': customer_data.get('customer_type', 'individual'),
-                            'address': customer_data.get('address', '').strip(),
-                            'city': customer_data.get('city', '').strip(),
-                            'state': customer_data.get('state', '').strip(),
-                            'country': customer_data.get('country', '').strip(),
-                            'postal_code': customer_data.get('postal_code', '').strip(),
-                            'preferred_metal': customer_data.get('preferred_metal', '').strip(),
-                            'preferred_stone': customer_data.get('preferred_stone', '').strip(),
-                            'ring_size': customer_data.get('ring_size', '').strip(),
-                            'budget_range': customer_data.get('budget_range', '').strip(),
-                            'lead_source': customer_data.get('lead_source', '').strip(),
-                            'notes': customer_data.get('notes', '').strip(),
-                            'community': customer_data.get('community', '').strip(),
-                            'mother_tongue': customer_data.get('mother_tongue', '').strip(),
-                            'reason_for_visit': customer_data.get('reason_for_visit', '').strip(),
-                            'age_of_end_user': customer_data.get('age_of_end_user', '').strip(),
-                            'saving_scheme': customer_data.get('saving_scheme', '').strip(),
-                            'catchment_area': customer_data.get('catchment_area', '').strip(),
-                            'next_follow_up': customer_data.get('next_follow_up', '').strip(),
-                            'summary_notes': customer_data.get('summary_notes', '').strip(),
-                            'status': customer_data.get('status', 'lead'),
-                            'tenant': request.user.tenant.id if request.user.tenant else None,
-                        }
-                        
-                        # Create client
-                        serializer = self.get_serializer(data=client_data)
-                        if serializer.is_valid():
-                            client = serializer.save()
-                            imported_count += 1
-                        else:
-                            errors.append(f'Row {row_num}: {serializer.errors}')
-                    
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: {str(e)}')
+            principal = self.get_principal()
+            importer = ClientBulkImporter(
+                principal.tenant_id, principal.store_id, user=request.user, require_email=True
+            )
+            result = importer.run(json_data, first_row_num=1)
+            imported_count = result['imported']
+            errors = result['errors']
             
             return Response({
                 'message': f'Import completed. {imported_count} customers imported successfully.',
@@ -1700,24 +1415,75 @@ class PurchaseViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(client_id=client_id)
         return queryset
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(ScopedVisibilityMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Audit history, newest first. Filters: ?client=, ?user=, ?action= and the
+    time range ?since= / ?until= (ISO date or datetime, both inclusive; a
+    date-only ?until= covers that whole day). ?page_size= or ?cursor= switch
+    to keyset pagination, which stays fast at any depth.
+    """
     serializer_class = AuditLogSerializer
     permission_classes = [IsRoleAllowed.for_roles(['inhouse_sales','business_admin','manager'])]
 
     def get_queryset(self):
-        queryset = AuditLog.objects.all().order_by('-timestamp')
-        client_id = self.request.query_params.get('client')
-        user = self.request.user
-        if user.is_authenticated and user.is_manager:
-            # Managers see audit logs for customers in their tenant only
-            if user.tenant:
-                queryset = queryset.filter(client__tenant=user.tenant)
+        # Scoped through the denormalized tenant column, not a join on client
+        tenant_id = self.get_principal().tenant_id
+        if not tenant_id:
+            return AuditLog.objects.none()
+        queryset = AuditLog.objects.filter(tenant_id=tenant_id).select_related('user').order_by('-timestamp', '-id')
+
+        params = self.request.query_params
+        if params.get('client'):
+            queryset = queryset.filter(client_id=self.parse_id_param('client'))
+        if params.get('user'):
+            queryset = queryset.filter(user_id=self.parse_id_param('user'))
+        if params.get('action'):
+            queryset = queryset.filter(action=params['action'])
+        if params.get('since'):
+            since, _is_date = self.parse_time_param('since')
+            queryset = queryset.filter(timestamp__gte=since)
+        if params.get('until'):
+            until, is_date = self.parse_time_param('until')
+            if is_date:
+                # Up to the start of the next day, so the index on timestamp is still used
+                queryset = queryset.filter(timestamp__lt=until + timedelta(days=1))
             else:
-                queryset = AuditLog.objects.none()
-        if client_id:
-            queryset = queryset.filter(client_id=client_id)
+                queryset = queryset.filter(timestamp__lte=until)
         return queryset
 
+    def parse_id_param(self, name):
+        value = self.request.query_params[name]
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: 'Enter a whole number.'})
+
+    def parse_time_param(self, name):
+        """Return ``(aware datetime, whether only a date was given)``."""
+        value = self.request.query_params[name]
+        try:
+            day = parse_date(value)
+            is_date = day is not None
+            if is_date:
+                parsed = datetime.combine(day, datetime.min.time())
+            else:
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    raise ValueError(value)
+        except ValueError:
+            raise ValidationError({name: 'Enter an ISO date or datetime.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed, is_date
+
+    def list(self, request, *args, **kwargs):
+        paginator = AuditLogKeysetPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+            serializer = self.get_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        return super().list(request, *args, **kwargs)
+
 
 class CustomerTagViewSet(viewsets.ReadOnlyModelViewSet):
     """
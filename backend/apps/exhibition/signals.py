@@ -1,7 +1,8 @@
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from django.utils import timezone
-from apps.clients.models import Client, AuditLog
+from apps.clients.audit import record_audit_log
+from apps.clients.models import Client
 
 
 @receiver(pre_save, sender=Client)
@@ -20,9 +21,9 @@ def log_exhibition_status_change(sender, instance, created, **kwargs):
     """
     if created and instance.lead_source == 'exhibition':
         # Log the creation of an exhibition lead
-        AuditLog.objects.create(
-            client=instance,
-            action='create',
+        record_audit_log(
+            instance,
+            'create',
             user=getattr(instance, 'created_by', None),
             after={
                 'status': instance.status,
@@ -31,29 +32,3 @@ def log_exhibition_status_change(sender, instance, created, **kwargs):
             },
             timestamp=timezone.now()
         )
-
-
-@receiver(post_save, sender=Client)
-def log_exhibition_promotion(sender, instance, **kwargs):
-    """
-    Log when an exhibition lead is promoted to main customer system
-    """
-    if hasattr(instance, '_state') and not instance._state.adding:
-        # This is an update, not a creation
-        try:
-            old_instance = Client.objects.get(pk=instance.pk)
-            if (old_instance.status == 'exhibition' and 
-                instance.status == 'lead' and 
-                instance.lead_source == 'exhibition'):
-                
-                # Log the promotion
-                AuditLog.objects.create(
-                    client=instance,
-                    action='update',
-                    user=getattr(instance, 'updated_by', None),
-                    before={'status': 'exhibition'},
-                    after={'status': 'lead'},
-                    timestamp=timezone.now()
-                )
-        except Client.DoesNotExist:
-            pass
@@ -5,10 +5,26 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from apps.clients.models import Client
 from apps.clients.serializers import ClientSerializer
+from apps.clients.exports import ClientExport
 from apps.users.permissions import IsRoleAllowed
 from apps.users.middleware import ScopedVisibilityMixin
 
 
+# CSV header -> client field
+EXHIBITION_EXPORT_COLUMNS = {
+    'ID': 'id',
+    'First Name': 'first_name',
+    'Last Name': 'last_name',
+    'Email': 'email',
+    'Phone': 'phone',
+    'City': 'city',
+    'Status': 'status',
+    'Lead Source': 'lead_source',
+    'Summary Notes': 'summary_notes',
+    'Created Date': 'created_at',
+}
+
+
 class ExhibitionLeadViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
     """
     ViewSet for managing exhibition leads.
@@ -269,33 +285,5 @@ class ExhibitionLeadViewSet(viewsets.ModelViewSet, ScopedVisibilityMixin):
     @action(detail=False, methods=['get'])
     def export(self, request):
         """Export exhibition leads to CSV"""
-        from django.http import HttpResponse
-        import csv
-        
-        queryset = self.get_queryset()
-        
-        # Create the HttpResponse object with CSV header
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="exhibition_leads.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'ID', 'First Name', 'Last Name', 'Email', 'Phone', 'City', 
-            'Status', 'Lead Source', 'Summary Notes', 'Created Date'
-        ])
-        
-        for client in queryset:
-            writer.writerow([
-                client.id,
-                client.first_name or '',
-                client.last_name or '',
-                client.email or '',
-                client.phone or '',
-                client.city or '',
-                client.status,
-                client.lead_source or '',
-                client.summary_notes or '',
-                client.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        return response
+        export = ClientExport(self.get_queryset(), EXHIBITION_EXPORT_COLUMNS.values())
+        return export.csv_response('exhibition_leads.csv', header=EXHIBITION_EXPORT_COLUMNS.keys())
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ImportJob
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'tenant', 'created_by', 'total_rows', 'imported_rows', 'failed_rows', 'created_at']
+    list_filter = ['kind', 'status', 'tenant']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
@@ -0,0 +1,63 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .jobs import run_import_job
+
+logger = logging.getLogger(__name__)
+
+_local_pool = None
+
+
+def get_local_pool():
+    global _local_pool
+    if _local_pool is None:
+        _local_pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMPORT_JOBS_LOCAL_WORKERS', 2),
+            thread_name_prefix='import-job',
+        )
+    return _local_pool
+
+
+def _run_locally(job_id):
+    try:
+        run_import_job(job_id)
+    except Exception:
+        logger.exception('Import job %s failed', job_id)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def dispatch_import_job(job_id):
+    """
+    Hand a job to the configured executor and return its name.
+
+    IMPORT_JOBS_EXECUTOR selects 'celery', 'local' (in-process thread pool),
+    'sync' (run inline, for tests and management commands) or 'auto', which
+    uses Celery when it is installed and the broker accepts the task and
+    falls back to the local pool otherwise.
+    """
+    executor = getattr(settings, 'IMPORT_JOBS_EXECUTOR', 'auto')
+
+    if executor == 'sync':
+        run_import_job(job_id)
+        return 'sync'
+
+    if executor in ['auto', 'celery']:
+        from .tasks import run_import_job_task
+        if run_import_job_task is not None:
+            try:
+                run_import_job_task.delay(job_id)
+                return 'celery'
+            except Exception:
+                if executor == 'celery':
+                    raise
+                logger.warning('Celery broker unavailable, running import job %s locally', job_id, exc_info=True)
+        elif executor == 'celery':
+            raise RuntimeError('IMPORT_JOBS_EXECUTOR is "celery" but Celery is not installed')
+
+    get_local_pool().submit(_run_locally, job_id)
+    return 'local'
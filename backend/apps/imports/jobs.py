@@ -0,0 +1,155 @@
+import codecs
+import csv
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ImportJob
+
+
+def is_background_request(request):
+    """Background processing is opt-in with ?background=true (or a form field)."""
+    value = request.query_params.get('background') or request.data.get('background', '')
+    return str(value).lower() in ['1', 'true', 'yes']
+
+
+def create_import_job(kind, upload, user, tenant_id, store_id=None):
+    """Persist the uploaded file and queue it for processing once the transaction commits."""
+    from .executors import dispatch_import_job
+
+    job = ImportJob.objects.create(
+        kind=kind,
+        file=upload,
+        original_name=upload.name,
+        tenant_id=tenant_id,
+        store_id=store_id,
+        created_by=user,
+    )
+    transaction.on_commit(lambda: dispatch_import_job(job.pk))
+    return job
+
+
+def _progress_callback(job):
+    def update(imported, failed):
+        ImportJob.objects.filter(pk=job.pk).update(
+            imported_rows=imported, failed_rows=failed, heartbeat_at=timezone.now()
+        )
+    return update
+
+
+def read_client_rows(upload):
+    from apps.clients.imports import estimate_upload_rows, read_upload_rows
+
+    total = estimate_upload_rows(upload)
+    return read_upload_rows(upload), total
+
+
+def read_client_json_rows(upload):
+    rows = json.loads(upload.read().decode('utf-8'))
+    if not isinstance(rows, list):
+        raise ValueError('JSON file should contain an array of customer objects')
+    return rows, len(rows)
+
+
+def read_product_rows(upload):
+    total = max(sum(1 for _line in upload) - 1, 0)
+    upload.seek(0)
+    return csv.DictReader(codecs.iterdecode(upload, 'utf-8')), total
+
+
+def import_clients(job, rows, first_row_num):
+    from apps.clients.imports import ClientBulkImporter
+
+    importer = ClientBulkImporter(
+        job.tenant_id, job.store_id, user=job.created_by, on_progress=_progress_callback(job),
+        # JSON imports require an email per row, as they do when run synchronously
+        require_email=job.kind == ImportJob.Kind.CLIENTS_JSON,
+    )
+    result = importer.run(rows, first_row_num=first_row_num)
+    return result['imported'], result['failed'], result['errors']
+
+
+def import_products(job, rows, first_row_num):
+    from apps.products.imports import import_product_rows
+
+    if job.created_by is None:
+        raise ValueError('The user who started this import no longer exists')
+    imported, errors = import_product_rows(rows, job.created_by, on_progress=_progress_callback(job))
+    return imported, len(errors), errors
+
+
+# kind -> (reader returning (rows, estimated total), row importer, number of the first data row)
+IMPORT_HANDLERS = {
+    ImportJob.Kind.CLIENTS: (read_client_rows, import_clients, 2),
+    ImportJob.Kind.CLIENTS_JSON: (read_client_json_rows, import_clients, 1),
+    ImportJob.Kind.PRODUCTS: (read_product_rows, import_products, 2),
+}
+
+
+def run_import_job(job_id):
+    """
+    Process a pending import job. Safe to call more than once for the same
+    job: only the first caller claims it.
+
+    If the worker dies mid-import the job is left RUNNING; see
+    ``fail_stale_import_jobs``.
+    """
+    now = timezone.now()
+    claimed = ImportJob.objects.filter(pk=job_id, status=ImportJob.Status.PENDING).update(
+        status=ImportJob.Status.RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+    )
+    if not claimed:
+        return None
+
+    job = ImportJob.objects.select_related('created_by__tenant', 'created_by__store').get(pk=job_id)
+    read_rows, import_rows, first_row_num = IMPORT_HANDLERS[job.kind]
+    # Don't overwrite a job that was failed as stale while this worker was stalled
+    running = ImportJob.objects.filter(pk=job.pk, status=ImportJob.Status.RUNNING)
+    try:
+        # Rows are streamed from the stored file, so it stays open for the whole import
+        with job.file.open('rb') as upload:
+            rows, total = read_rows(upload)
+            ImportJob.objects.filter(pk=job.pk).update(total_rows=total)
+            imported, failed, errors = import_rows(job, rows, first_row_num)
+    except Exception as e:
+        running.update(
+            status=ImportJob.Status.FAILED,
+            error_message=str(e),
+            finished_at=timezone.now(),
+        )
+    else:
+        running.update(
+            status=ImportJob.Status.COMPLETED,
+            total_rows=imported + failed,
+            imported_rows=imported,
+            failed_rows=failed,
+            errors=errors,
+            finished_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    return job
+
+
+def fail_stale_import_jobs(stale_after=None):
+    """
+    Mark RUNNING jobs with no progress for ``stale_after`` seconds (default
+    ``IMPORT_JOBS_STALE_AFTER``) as FAILED, keeping the counts of the rows
+    they had already imported. Returns the number of jobs failed.
+    """
+    if stale_after is None:
+        stale_after = settings.IMPORT_JOBS_STALE_AFTER
+    now = timezone.now()
+    return ImportJob.objects.filter(
+        status=ImportJob.Status.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=stale_after),
+    ).update(
+        status=ImportJob.Status.FAILED,
+        error_message='The import stopped before finishing (worker stopped). Rows counted as imported '
+                      'were saved; re-upload the remaining rows.',
+        finished_at=now,
+    )
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.imports.jobs import fail_stale_import_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Mark import jobs left running by a crashed worker as failed. A job counts as abandoned once '
+        'it has made no progress for IMPORT_JOBS_STALE_AFTER seconds. Run it periodically.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=settings.IMPORT_JOBS_STALE_AFTER,
+            help='Seconds without progress after which a running job is failed',
+        )
+
+    def handle(self, *args, **options):
+        failed = fail_stale_import_jobs(options['stale_after'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Marked {failed} stale import jobs as failed'))
@@ -0,0 +1,70 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ImportJob(models.Model):
+    """
+    A customer or product file import processed outside the HTTP request.
+
+    A running job refreshes ``heartbeat_at`` as it makes progress. A job
+    whose worker died mid-import stays RUNNING with a stale heartbeat until
+    ``manage.py fail_stale_import_jobs`` (or its Celery task) marks it
+    FAILED; it is not retried, because batches it already committed would
+    be imported twice.
+    """
+    class Kind(models.TextChoices):
+        CLIENTS = 'clients', _('Customers (CSV/XLSX)')
+        CLIENTS_JSON = 'clients_json', _('Customers (JSON)')
+        PRODUCTS = 'products', _('Products (CSV)')
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to='imports/%Y/%m/%d/')
+    original_name = models.CharField(max_length=255, blank=True)
+
+    # Progress
+    total_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True, help_text=_('Set when the job as a whole failed'))
+
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='import_jobs')
+    store = models.ForeignKey('stores.Store', on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    created_by = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Import Job')
+        verbose_name_plural = _('Import Jobs')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.pk} ({self.status})"
+
+    @property
+    def processed_rows(self):
+        return self.imported_rows + self.failed_rows
+
+    @property
+    def progress(self):
+        """Percentage of rows processed, 0-100."""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+    @property
+    def is_finished(self):
+        return self.status in [self.Status.COMPLETED, self.Status.FAILED]
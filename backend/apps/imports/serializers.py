@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from .models import ImportJob
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    processed_rows = serializers.IntegerField(read_only=True)
+    progress = serializers.IntegerField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    error_count = serializers.SerializerMethodField()
+    error_report_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'status', 'original_name',
+            'total_rows', 'processed_rows', 'imported_rows', 'failed_rows', 'progress',
+            'is_finished', 'error_count', 'error_message', 'error_report_url',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_error_count(self, obj):
+        return len(obj.errors)
+
+    def get_error_report_url(self, obj):
+        if not obj.errors:
+            return None
+        path = f'/api/imports/jobs/{obj.pk}/errors/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
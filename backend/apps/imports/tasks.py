@@ -0,0 +1,20 @@
+from .jobs import fail_stale_import_jobs, run_import_job
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; jobs then run on the local executor
+    shared_task = None
+
+
+if shared_task is not None:
+    @shared_task(name='imports.run_import_job')
+    def run_import_job_task(job_id):
+        run_import_job(job_id)
+
+    @shared_task(name='imports.fail_stale_import_jobs')
+    def fail_stale_import_jobs_task():
+        """Periodic counterpart of ``manage.py fail_stale_import_jobs``."""
+        fail_stale_import_jobs()
+else:
+    run_import_job_task = None
+    fail_stale_import_jobs_task = None
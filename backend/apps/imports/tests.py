@@ -0,0 +1,168 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.clients.models import Client
+from apps.products.models import Product
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from .executors import dispatch_import_job
+from .jobs import fail_stale_import_jobs
+from .models import ImportJob
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMPORT_JOBS_EXECUTOR='sync')
+class ImportJobTest(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username="manager",
+            password="testpass123",
+            role=User.Role.MANAGER,
+            tenant=self.tenant,
+            store=self.store
+        )
+        self.client.force_authenticate(user=self.manager)
+
+    def upload(self, url, name, content):
+        upload = SimpleUploadedFile(name, content.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'file': upload, 'background': 'true'}, format='multipart')
+        return response
+
+    def test_background_client_import(self):
+        response = self.upload(
+            '/api/clients/clients/import_file/',
+            'customers.csv',
+            'first_name,email\nAsha,asha@test.com\nRavi,ravi@test.com\nNobody,\n',
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ImportJob.Status.PENDING)
+
+        status_response = self.client.get(f"/api/imports/jobs/{response.data['id']}/")
+        self.assertEqual(status_response.data['status'], ImportJob.Status.COMPLETED)
+        self.assertEqual(status_response.data['total_rows'], 3)
+        self.assertEqual(status_response.data['imported_rows'], 2)
+        self.assertEqual(status_response.data['failed_rows'], 1)
+        self.assertEqual(status_response.data['progress'], 100)
+        self.assertEqual(Client.objects.filter(tenant=self.tenant, store=self.store).count(), 2)
+
+        report = self.client.get(status_response.data['error_report_url'])
+        lines = report.content.decode().strip().splitlines()
+        self.assertEqual(lines, ['row,error', '4,Either email or phone is required'])
+
+    def test_background_json_import(self):
+        response = self.upload(
+            '/api/clients/clients/import_json/',
+            'customers.json',
+            '[{"email": "json@test.com", "first_name": "Json"}]',
+        )
+        job = ImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, ImportJob.Status.COMPLETED)
+        self.assertTrue(Client.objects.filter(email='json@test.com', tenant=self.tenant).exists())
+
+    def test_sync_and_background_json_imports_require_an_email(self):
+        content = '[{"email": "json@test.com", "first_name": "Json"}, {"phone": "9800000001"}, "oops"]'
+        expected_errors = ['Row 2: Email is required', 'Row 3: Expected a customer object']
+
+        response = self.client.post(
+            '/api/clients/clients/import_json/',
+            {'file': SimpleUploadedFile('customers.json', content.encode())},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported_count'], 1)
+        self.assertEqual(response.data['errors'], expected_errors)
+
+        Client.objects.filter(tenant=self.tenant).delete()
+        response = self.upload('/api/clients/clients/import_json/', 'customers.json', content)
+        job = ImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual((job.imported_rows, job.failed_rows), (1, 2))
+        self.assertEqual(job.errors, expected_errors)
+
+    def test_background_product_import(self):
+        response = self.upload(
+            '/api/products/import/',
+            'products.csv',
+            'name,sku,category,selling_price,cost_price\nRing,R1,Rings,150,100\nBad,R2,Rings,abc,100\n',
+        )
+        job = ImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, ImportJob.Status.COMPLETED)
+        self.assertEqual((job.imported_rows, job.failed_rows), (1, 1))
+        self.assertTrue(Product.objects.filter(sku='R1', tenant=self.tenant).exists())
+
+    def test_unreadable_file_fails_job(self):
+        response = self.upload('/api/clients/clients/import_json/', 'customers.json', '{"not": "a list"}')
+
+        job = ImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertIn('array of customer objects', job.error_message)
+
+    def test_jobs_are_visible_only_to_their_owner(self):
+        job = ImportJob.objects.create(
+            kind=ImportJob.Kind.CLIENTS, file='imports/x.csv', tenant=self.tenant, created_by=self.manager
+        )
+        other = User.objects.create_user(
+            username="other", password="testpass123", role=User.Role.INHOUSE_SALES,
+            tenant=self.tenant, store=self.store
+        )
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f'/api/imports/jobs/{job.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+
+        admin = User.objects.create_user(
+            username="admin", password="testpass123", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant
+        )
+        self.client.force_authenticate(user=admin)
+        self.assertEqual(self.client.get(f'/api/imports/jobs/{job.pk}/').status_code, status.HTTP_200_OK)
+
+    def test_jobs_abandoned_by_a_crashed_worker_are_failed(self):
+        now = timezone.now()
+        stale = ImportJob.objects.create(
+            kind=ImportJob.Kind.CLIENTS, file='imports/x.csv', tenant=self.tenant, created_by=self.manager,
+            status=ImportJob.Status.RUNNING, imported_rows=1000, heartbeat_at=now - timedelta(hours=2),
+        )
+        busy = ImportJob.objects.create(
+            kind=ImportJob.Kind.CLIENTS, file='imports/y.csv', tenant=self.tenant, created_by=self.manager,
+            status=ImportJob.Status.RUNNING, heartbeat_at=now,
+        )
+
+        self.assertEqual(fail_stale_import_jobs(stale_after=3600), 1)
+
+        stale.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual(stale.status, ImportJob.Status.FAILED)
+        self.assertEqual(stale.imported_rows, 1000)
+        self.assertIn('worker stopped', stale.error_message)
+        self.assertEqual(busy.status, ImportJob.Status.RUNNING)
+
+    @override_settings(IMPORT_JOBS_EXECUTOR='auto')
+    def test_auto_executor_falls_back_to_local_pool_without_broker(self):
+        with mock.patch('apps.imports.tasks.run_import_job_task', None), \
+                mock.patch('apps.imports.executors.get_local_pool') as get_local_pool:
+            self.assertEqual(dispatch_import_job(123), 'local')
+        get_local_pool.return_value.submit.assert_called_once()
@@ -0,0 +1,57 @@
+import csv
+import re
+
+from django.http import HttpResponse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.users.principal import get_request_principal
+from .models import ImportJob
+from .serializers import ImportJobSerializer
+
+ROW_PREFIX = re.compile(r'^Rows? ([\d-]+): ')
+
+
+def import_job_accepted(job, request):
+    """202 response returned by import endpoints when a job is queued."""
+    data = ImportJobSerializer(job, context={'request': request}).data
+    data['message'] = 'Import queued. Poll the job status URL for progress.'
+    data['status_url'] = request.build_absolute_uri(f'/api/imports/jobs/{job.pk}/')
+    return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of background import jobs. Admins see every job in their tenant,
+    other users only the jobs they started.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        principal = get_request_principal(self.request)
+        if principal.is_platform_admin:
+            return ImportJob.objects.all()
+        queryset = ImportJob.objects.filter(tenant_id=principal.tenant_id)
+        if not principal.is_business_admin:
+            queryset = queryset.filter(created_by_id=principal.user_id)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """Download the job's row errors as CSV."""
+        job = self.get_object()
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="import_{job.pk}_errors.csv"'
+
+        writer = csv.writer(response)
+        writer.writerow(['row', 'error'])
+        for error in job.errors:
+            match = ROW_PREFIX.match(error)
+            if match:
+                writer.writerow([match.group(1), error[match.end():]])
+            else:
+                writer.writerow(['', error])
+        return response
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.utils import timezone
 from django.db.models import Q
 from apps.users.middleware import ScopedVisibilityMiddleware
+from apps.users.principal import get_request_principal
 from .models import Notification, NotificationSettings
 from .serializers import (
     NotificationSerializer, NotificationSettingsSerializer,
@@ -20,40 +21,27 @@ class NotificationViewSet(viewsets.ModelViewSet):
         """Filter notifications based on user's tenant and store access"""
         user = self.request.user
         
-        print(f"=== NOTIFICATION FILTERING DEBUG ===")
-        print(f"User: {user.username}")
-        print(f"User role: {user.role}")
-        print(f"User tenant: {user.tenant}")
-        print(f"User store: {user.store}")
-        print(f"User is_active: {user.is_active}")
-        
         if not user.is_authenticated:
             print("User not authenticated, returning none")
             return Notification.objects.none()
         
+        principal = get_request_principal(self.request)
+        
         # Business admin can see all notifications in their tenant
-        if user.role == 'business_admin':
-            queryset = Notification.objects.filter(tenant=user.tenant)
-            print(f"Business admin - found {queryset.count()} notifications in tenant")
-            return queryset
+        if principal.role == 'business_admin':
+            return Notification.objects.filter(tenant_id=principal.tenant_id)
         
         # Store users can see their store's notifications and their own
-        if user.store:
-            queryset = Notification.objects.filter(
-                Q(tenant=user.tenant) &
-                (Q(store=user.store) | Q(user=user))
+        if principal.store_id:
+            return Notification.objects.filter(
+                Q(tenant_id=principal.tenant_id) &
+                (Q(store_id=principal.store_id) | Q(user_id=principal.user_id))
             )
-            print(f"Store user - found {queryset.count()} notifications (store: {user.store.name})")
-            print(f"Store notifications: {queryset.filter(store=user.store).count()}")
-            print(f"User's own notifications: {queryset.filter(user=user).count()}")
-            return queryset
         
         # Users without store can only see their own notifications
-        queryset = Notification.objects.filter(
-            Q(tenant=user.tenant) & Q(user=user)
+        return Notification.objects.filter(
+            Q(tenant_id=principal.tenant_id) & Q(user_id=principal.user_id)
         )
-        print(f"User without store - found {queryset.count()} own notifications")
-        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create':
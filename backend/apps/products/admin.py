@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, Category, ProductVariant, ProductInventory, StockTransfer
+from .models import Product, Category, ProductVariant, ProductInventory, StockTransfer, InventoryMovement, InventorySnapshot
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -32,3 +32,22 @@ class StockTransferAdmin(admin.ModelAdmin):
     search_fields = ('product__name', 'product__sku', 'from_store__name', 'to_store__name')
     list_filter = ('status', 'from_store', 'to_store', 'created_at')
     readonly_fields = ('requested_by', 'created_at', 'updated_at')
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = ('product', 'store', 'kind', 'quantity', 'balance', 'shortfall', 'transfer', 'sale', 'created_by', 'created_at')
+    search_fields = ('product__name', 'product__sku', 'store__name')
+    list_filter = ('kind', 'store', 'created_at')
+
+    # The ledger is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(InventorySnapshot)
+class InventorySnapshotAdmin(admin.ModelAdmin):
+    list_display = ('product', 'store', 'quantity', 'taken_at')
+    search_fields = ('product__name', 'product__sku', 'store__name')
+    list_filter = ('store', 'taken_at')
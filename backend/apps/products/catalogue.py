@@ -0,0 +1,173 @@
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.stores.models import Store
+from .models import Product, ProductInventory
+
+
+# Every key a catalogue entry can have, in response order; ``?fields=`` picks from these
+CATALOGUE_FIELDS = [
+    'product_id',
+    'product_name',
+    'product_sku',
+    'scope',
+    'store_name',
+    'total_quantity',
+    'inventory_by_store',
+]
+
+
+class InventoryMatrix:
+    """
+    Inventory figures of a tenant's products × stores, pivoted from one
+    ProductInventory fetch.
+
+    Each figure is a flat ``array`` with one cell per (product, store) pair,
+    row-major by product, so a 5,000 × 20 catalogue is a few hundred KB of
+    machine ints instead of 100,000 dicts. ``stocked`` marks the cells that
+    have an inventory row at all.
+    """
+
+    def __init__(self, product_ids, store_ids, rows):
+        self.product_ids = list(product_ids)
+        self.store_ids = list(store_ids)
+        self.product_index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        self.store_index = {store_id: j for j, store_id in enumerate(self.store_ids)}
+        width = len(self.store_ids)
+        size = len(self.product_ids) * width
+        self.quantity = array('I', bytes(4 * size))
+        self.reserved = array('I', bytes(4 * size))
+        self.reorder_point = array('I', bytes(4 * size))
+        self.stocked = bytearray(size)
+        for product_id, store_id, quantity, reserved, reorder_point in rows:
+            i, j = self.product_index.get(product_id), self.store_index.get(store_id)
+            # Rows of other tenants' products held in this tenant's stores
+            if i is None or j is None:
+                continue
+            cell = i * width + j
+            self.quantity[cell] = quantity
+            self.reserved[cell] = reserved
+            self.reorder_point[cell] = reorder_point
+            self.stocked[cell] = 1
+
+    def row(self, product_id):
+        """Cell offsets of one product's row."""
+        start = self.product_index[product_id] * len(self.store_ids)
+        return range(start, start + len(self.store_ids))
+
+
+class CatalogueSnapshot:
+    """The stores, products and inventory matrix of one tenant's catalogue."""
+
+    def __init__(self, stores, products, matrix):
+        # [(id, name)] and [(id, name, sku, scope, store name, total quantity)], in display order
+        self.stores = stores
+        self.products = products
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, tenant_id):
+        """Three queries, whatever the number of products and stores."""
+        stores = list(Store.objects.filter(tenant_id=tenant_id).order_by('id').values_list('id', 'name'))
+        products = list(
+            Product.objects.filter(tenant_id=tenant_id)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'name', 'sku', 'scope', 'store__name', 'total_quantity')
+        )
+        rows = ProductInventory.objects.filter(store__tenant_id=tenant_id).values_list(
+            'product_id', 'store_id', 'quantity', 'reserved_quantity', 'reorder_point'
+        )
+        matrix = InventoryMatrix([product[0] for product in products], [store[0] for store in stores], rows)
+        return cls(stores, products, matrix)
+
+    def entries(self, products, fields=CATALOGUE_FIELDS):
+        """Catalogue entries of ``products`` (a slice of ``self.products``) with only ``fields``."""
+        fields = set(fields)
+        matrix = self.matrix
+        entries = []
+        for product_id, name, sku, scope, store_name, total_quantity in products:
+            entry = {
+                'product_id': product_id,
+                'product_name': name,
+                'product_sku': sku,
+                'scope': scope,
+                'store_name': store_name or 'Global',
+                # The maintained stock summary, rather than a sum over the matrix row
+                'total_quantity': total_quantity,
+            }
+            if 'inventory_by_store' in fields:
+                entry['inventory_by_store'] = [
+                    self.inventory_entry(store, cell) for store, cell in zip(self.stores, matrix.row(product_id))
+                ]
+            entries.append({field: entry[field] for field in CATALOGUE_FIELDS if field in fields})
+        return entries
+
+    def inventory_entry(self, store, cell):
+        store_id, store_name = store
+        matrix = self.matrix
+        if not matrix.stocked[cell]:
+            return {
+                'store_id': store_id,
+                'store_name': store_name,
+                'quantity': 0,
+                'available_quantity': 0,
+                'is_low_stock': False,
+                'is_out_of_stock': True
+            }
+        quantity = matrix.quantity[cell]
+        return {
+            'store_id': store_id,
+            'store_name': store_name,
+            'quantity': quantity,
+            'available_quantity': max(0, quantity - matrix.reserved[cell]),
+            'is_low_stock': quantity <= matrix.reorder_point[cell],
+            'is_out_of_stock': quantity == 0
+        }
+
+
+def _generation_key(tenant_id):
+    return f'catalogue:gen:{tenant_id}'
+
+
+def _snapshot_key(tenant_id, generation):
+    return f'catalogue:snapshot:{tenant_id}:{generation}'
+
+
+def get_catalogue_snapshot(tenant_id):
+    """
+    The tenant's catalogue snapshot, from the cache when present. Inventory,
+    product and store writes move the tenant to a new cache generation (see
+    ``invalidate_catalogue``), and entries expire after
+    CATALOGUE_CACHE_TIMEOUT seconds regardless.
+    """
+    timeout = getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300)
+    if timeout <= 0:
+        return CatalogueSnapshot.build(tenant_id)
+    # Read before building: a snapshot built from data that changes meanwhile
+    # is stored under the generation that the change has already left behind
+    key = _snapshot_key(tenant_id, cache.get(_generation_key(tenant_id), 0))
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = CatalogueSnapshot.build(tenant_id)
+        cache.set(key, snapshot, timeout)
+    return snapshot
+
+
+def _bump_generation(tenant_id):
+    key = _generation_key(tenant_id)
+    # add() is a no-op when the counter exists; incr() then works on every backend
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between the two calls
+        cache.set(key, 1, timeout=None)
+
+
+def invalidate_catalogue(tenant_id):
+    """Retire the tenant's cached snapshots once the current transaction commits."""
+    if tenant_id:
+        transaction.on_commit(lambda: _bump_generation(tenant_id))
@@ -0,0 +1,146 @@
+import logging
+from decimal import Decimal
+
+from .models import Product, Category
+
+logger = logging.getLogger(__name__)
+
+
+def import_product_rows(rows, user, on_progress=None, progress_every=100):
+    """
+    Create products from uploaded CSV rows on behalf of ``user``.
+
+    Returns ``(imported_count, errors)``. ``on_progress(imported, failed)`` is
+    called every ``progress_every`` rows so background jobs can report
+    progress.
+    """
+    imported_count = 0
+    errors = []
+
+    for row_num, row in enumerate(rows, start=2):  # Start from 2 because row 1 is header
+        if on_progress and row_num > 2 and (row_num - 2) % progress_every == 0:
+            on_progress(imported_count, len(errors))
+
+        try:
+            # Validate required fields
+            required_fields = ['name', 'sku', 'category', 'selling_price', 'cost_price']
+            missing_fields = []
+            for field in required_fields:
+                if not row.get(field):
+                    missing_fields.append(field)
+
+            if missing_fields:
+                errors.append(f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}")
+                continue
+
+            # Validate numeric fields
+            try:
+                selling_price = Decimal(row['selling_price'])
+                cost_price = Decimal(row['cost_price'])
+                quantity_str = row.get('quantity', '0')
+                quantity = int(quantity_str) if quantity_str.strip() else 0  # Default to 0 if empty or not provided
+            except (ValueError, TypeError) as e:
+                errors.append(f"Row {row_num}: Invalid numeric values - {str(e)}")
+                continue
+
+            # Get or create category
+            category_name = row['category'].strip()
+            try:
+                # Set store and scope for category based on user role
+                store = None
+                scope = 'global'
+
+                if user.role == 'manager':
+                    store = user.store
+                    scope = 'store'
+                elif user.role == 'business_admin':
+                    # Business admin can create global categories
+                    scope = 'global'
+                else:
+                    # Other roles create store-specific categories
+                    store = user.store
+                    scope = 'store'
+
+                category, created = Category.objects.get_or_create(
+                    name=category_name,
+                    tenant=user.tenant,
+                    store=store,
+                    scope=scope,
+                    defaults={
+                        'description': f'Category for {category_name}',
+                        'is_active': True,
+                        'store': store,
+                        'scope': scope
+                    }
+                )
+                if created:
+                    logger.debug('Created new category: %s', category.name)
+            except Exception as e:
+                errors.append(f"Row {row_num}: Error with category '{category_name}' - {str(e)}")
+                continue
+
+            # Check if SKU already exists (unique per tenant)
+            if Product.objects.filter(sku=row['sku'], tenant=user.tenant).exists():
+                errors.append(f"Row {row_num}: SKU '{row['sku']}' already exists in your tenant")
+                continue
+
+            # Create product
+            try:
+                # Set store and scope based on user role
+                store = None
+                scope = 'global'
+
+                if user.role == 'manager':
+                    store = user.store
+                    scope = 'store'
+                elif user.role == 'business_admin':
+                    # Business admin can create global products
+                    scope = 'global'
+                else:
+                    # Other roles create store-specific products
+                    store = user.store
+                    scope = 'store'
+
+                product = Product.objects.create(
+                    name=row['name'].strip(),
+                    sku=row['sku'].strip(),
+                    category=category,
+                    selling_price=selling_price,
+                    cost_price=cost_price,
+                    quantity=quantity,
+                    description=row.get('description', '').strip(),
+                    status='active',
+                    tenant=user.tenant,
+                    store=store,
+                    scope=scope,
+                    is_featured=False,
+                    is_bestseller=False,
+                    min_quantity=0,
+                    max_quantity=999999,
+                    weight=Decimal('0'),
+                    dimensions='',
+                    material='',
+                    color='',
+                    size='',
+                    brand='',
+                    main_image='',
+                    additional_images=[],
+                    meta_title='',
+                    meta_description='',
+                    tags=[]
+                )
+            except Exception as e:
+                errors.append(f"Row {row_num}: Error creating product - {str(e)}")
+                continue
+
+            logger.debug('Created product %s (SKU: %s)', product.name, product.sku)
+            imported_count += 1
+
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+            continue
+
+    if on_progress:
+        on_progress(imported_count, len(errors))
+
+    return imported_count, errors
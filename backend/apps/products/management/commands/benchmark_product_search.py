@@ -0,0 +1,114 @@
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.products.models import Category, Product
+from apps.products.search import search_products, trigram_available, update_search_vectors
+from apps.tenants.models import Tenant
+
+
+METALS = ['Gold', 'Silver', 'Platinum', 'Rose Gold', 'White Gold']
+ITEMS = ['Ring', 'Chain', 'Necklace', 'Bangle', 'Earrings', 'Pendant', 'Bracelet', 'Anklet', 'Nose Pin', 'Mangalsutra']
+STYLES = ['Classic', 'Floral', 'Antique', 'Temple', 'Minimal', 'Bridal', 'Kundan', 'Polki', 'Filigree', 'Solitaire']
+CATEGORIES = ['Rings', 'Chains', 'Necklaces', 'Bangles', 'Earrings', 'Pendants', 'Bracelets', 'Anklets']
+
+
+def legacy_search(queryset, text):
+    """The previous name/SKU substring filter."""
+    return queryset.filter(Q(name__icontains=text) | Q(sku__icontains=text)).order_by('-created_at')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the product search against the previous name/SKU icontains filter on a synthetic '
+        'tenant: p50/p95 time of the first result page per query. All data is created in a '
+        'transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=100_000,
+            help='Products generated for the tenant',
+        )
+        parser.add_argument(
+            '--queries',
+            default='gold,temple neck,solitaire ri,SKU-0042,bridal bangle',
+            help='Comma-separated search terms',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs per query and implementation',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=20,
+            help='Results fetched per run',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'pg_trgm: {"installed" if trigram_available() else "not installed"}')
+        with transaction.atomic():
+            started = time.perf_counter()
+            tenant = self.make_tenant(options['products'])
+            self.stdout.write(f'Generated {options["products"]} products in {time.perf_counter() - started:.1f}s')
+            products = Product.objects.filter(tenant=tenant)
+
+            self.stdout.write(
+                f'{"Query":<18}{"Legacy p50":>12}{"Legacy p95":>12}{"Search p50":>12}{"Search p95":>12}{"Matches":>9}'
+            )
+            self.stdout.write('-' * 75)
+            for text in options['queries'].split(','):
+                legacy = self.measure(lambda: list(legacy_search(products, text)[:options['page_size']]), options['repeat'])
+                ranked = self.measure(lambda: list(search_products(products, text)[:options['page_size']]), options['repeat'])
+                matches = search_products(products, text).count()
+                self.stdout.write(
+                    f'{text:<18}{legacy[0]:>12.1f}{legacy[1]:>12.1f}{ranked[0]:>12.1f}{ranked[1]:>12.1f}{matches:>9}'
+                )
+            transaction.set_rollback(True)
+
+    def make_tenant(self, product_count):
+        suffix = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(name=f'Search benchmark {suffix}', slug=f'search-benchmark-{suffix}')
+        categories = Category.objects.bulk_create([Category(name=name, tenant=tenant) for name in CATEGORIES])
+        rng = random.Random(42)
+        batch = []
+        for i in range(product_count):
+            batch.append(Product(
+                name=f'{rng.choice(METALS)} {rng.choice(STYLES)} {rng.choice(ITEMS)}',
+                sku=f'SKU-{i:06d}',
+                description=f'{rng.choice(STYLES)} design, handcrafted',
+                category=rng.choice(categories),
+                cost_price=Decimal('100.00'),
+                selling_price=Decimal('150.00'),
+                tenant=tenant,
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        # bulk_create skips Product.save(), which maintains the vectors
+        update_search_vectors(Product.objects.filter(tenant=tenant))
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Product._meta.db_table}')
+        return tenant
+
+    @staticmethod
+    def measure(run, repeat):
+        """(p50, p95) milliseconds over ``repeat`` runs."""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))]
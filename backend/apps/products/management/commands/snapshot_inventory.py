@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.movements import snapshot_tenant_inventory
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = (
+        'Snapshot the current stock of every store (and of products without store inventory) so '
+        'point-in-time stock only replays the ledger movements since the latest snapshot. Run it '
+        'periodically, e.g. nightly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=int,
+            help='Only snapshot this tenant id',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('id').values_list('id', flat=True)
+        if options['tenant']:
+            tenants = tenants.filter(id=options['tenant'])
+
+        started = time.perf_counter()
+        written = 0
+        for tenant_id in tenants:
+            written += snapshot_tenant_inventory(tenant_id)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {written} inventory snapshots in {elapsed:.2f}s'))
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:08
+
+from django.db import migrations, models
+from django.db.models import Case, Exists, F, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThanOrEqual
+
+
+def backfill_stock_summary(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductInventory = apps.get_model('products', 'ProductInventory')
+    inventory = ProductInventory.objects.filter(product=OuterRef('pk'))
+    inventory_total = Subquery(
+        inventory.order_by().values('product').annotate(total=Sum('quantity')).values('total')
+    )
+    Product.objects.update(inventory_tracked=Exists(inventory))
+    total = Case(
+        When(inventory_tracked=True, then=Coalesce(inventory_total, 0)),
+        default=F('quantity'),
+    )
+    Product.objects.update(total_quantity=total)
+    Product.objects.update(low_stock=LessThanOrEqual(F('total_quantity'), F('min_quantity')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_category_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='inventory_tracked',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='low_stock',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('low_stock', True)), fields=['tenant', 'store'], name='product_low_stock_idx'),
+        ),
+        migrations.RunPython(backfill_stock_summary, migrations.RunPython.noop),
+    ]
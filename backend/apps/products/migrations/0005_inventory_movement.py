@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_tenant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('products', '0004_product_stock_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('transfer_out', 'Transfer Out'), ('transfer_in', 'Transfer In')], max_length=20)),
+                ('quantity', models.IntegerField(help_text='Units added (positive) or removed (negative)')),
+                ('balance', models.PositiveIntegerField(help_text='Store quantity after the movement')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_movements', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='products.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='stores.store')),
+                ('transfer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='products.stocktransfer')),
+            ],
+            options={
+                'verbose_name': 'Inventory Movement',
+                'verbose_name_plural': 'Inventory Movements',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:17
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def snapshot_current_stock(apps, schema_editor):
+    # The ledger starts here: point-in-time stock before this migration is not known
+    InventorySnapshot = apps.get_model('products', 'InventorySnapshot')
+    ProductInventory = apps.get_model('products', 'ProductInventory')
+    Product = apps.get_model('products', 'Product')
+    taken_at = timezone.now()
+    InventorySnapshot.objects.bulk_create(
+        [
+            InventorySnapshot(product_id=product_id, store_id=store_id, quantity=quantity, taken_at=taken_at)
+            for product_id, store_id, quantity in ProductInventory.objects.values_list('product_id', 'store_id', 'quantity').iterator()
+        ]
+        + [
+            InventorySnapshot(product_id=product_id, store_id=None, quantity=quantity, taken_at=taken_at)
+            for product_id, quantity in Product.objects.filter(inventory_tracked=False).values_list('id', 'quantity').iterator()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0003_salespipeline_sale'),
+        ('stores', '0002_store_tenant'),
+        ('products', '0005_inventory_movement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('taken_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Inventory Snapshot',
+                'verbose_name_plural': 'Inventory Snapshots',
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='sale',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_movements', to='sales.sale'),
+        ),
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='kind',
+            field=models.CharField(choices=[('receipt', 'Receipt'), ('sale', 'Sale'), ('transfer_out', 'Transfer Out'), ('transfer_in', 'Transfer In'), ('adjustment', 'Adjustment')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='stores.store'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['store', 'product', 'created_at'], name='movement_store_product_idx'),
+        ),
+        migrations.AddField(
+            model_name='inventorysnapshot',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='products.product'),
+        ),
+        migrations.AddField(
+            model_name='inventorysnapshot',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_snapshots', to='stores.store'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorysnapshot',
+            index=models.Index(fields=['store', 'product', 'taken_at'], name='snapshot_store_product_idx'),
+        ),
+        migrations.RunPython(snapshot_current_stock, migrations.RunPython.noop),
+    ]
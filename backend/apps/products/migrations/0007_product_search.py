@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:31
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Func, OuterRef, Subquery, Value
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    A GIN index on the search vector, and pg_trgm GIN indexes on name and SKU
+    where the extension is available. Postgres only: other databases search
+    without them.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    Category = apps.get_model('products', 'Category')
+    category_name = Subquery(Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1])
+    sku_words = Func(F('sku'), Value('[^[:alnum:]]+'), Value(' '), Value('g'), function='regexp_replace')
+    # The same expression as apps.products.search.product_search_vector
+    Product.objects.update(search_vector=(
+        SearchVector('name', sku_words, weight='A', config='simple')
+        + SearchVector(category_name, weight='B', config='simple')
+        + SearchVector('description', weight='C', config='simple')
+    ))
+    table = Product._meta.db_table
+    schema_editor.execute(f'CREATE INDEX product_search_idx ON {table} USING gin (search_vector)')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(f'CREATE INDEX product_name_trgm_idx ON {table} USING gin (name gin_trgm_ops)')
+    schema_editor.execute(f'CREATE INDEX product_sku_trgm_idx ON {table} USING gin (sku gin_trgm_ops)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index in ['product_search_idx', 'product_name_trgm_idx', 'product_sku_trgm_idx']:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_inventory_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
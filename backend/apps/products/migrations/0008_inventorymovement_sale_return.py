@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='kind',
+            field=models.CharField(choices=[('receipt', 'Receipt'), ('sale', 'Sale'), ('sale_return', 'Sale Return'), ('transfer_out', 'Transfer Out'), ('transfer_in', 'Transfer In'), ('adjustment', 'Adjustment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_inventorymovement_sale_return'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='shortfall',
+            field=models.PositiveIntegerField(default=0, help_text='Units the movement should have taken but the stock did not hold (oversold)'),
+        ),
+    ]
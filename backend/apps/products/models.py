@@ -1,4 +1,5 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
@@ -67,6 +68,10 @@ class Category(models.Model):
         return self.name
 
 
+# The Product fields that make up its search vector
+SEARCHED_FIELDS = {'name', 'sku', 'description', 'category', 'category_id'}
+
+
 class Product(models.Model):
     """
     Product model for inventory management.
@@ -155,6 +160,15 @@ class Product(models.Model):
         help_text=_('Global products are visible to all stores, Store products are store-specific')
     )
     
+    # Stock summary, maintained by apps.products.stock: the sum of the store
+    # inventories once the product has any, its own quantity until then
+    total_quantity = models.PositiveIntegerField(default=0, editable=False)
+    inventory_tracked = models.BooleanField(default=False, editable=False)
+    low_stock = models.BooleanField(default=False, editable=False)
+
+    # Name, SKU, category and description for search, maintained by apps.products.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -164,18 +178,71 @@ class Product(models.Model):
         verbose_name_plural = _('Products')
         ordering = ['-created_at']
         unique_together = ['sku', 'tenant', 'store']
+        indexes = [
+            # Low-stock lists and counts only ever read the (few) low rows
+            models.Index(
+                fields=['tenant', 'store'],
+                condition=models.Q(low_stock=True),
+                name='product_low_stock_idx',
+            ),
+        ]
 
     def __str__(self):
         store_info = f" ({self.store.name})" if self.store else ""
         return f"{self.name} ({self.sku}){store_info}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the stock ledger last recorded for the product's own quantity
+        instance._recorded_quantity = instance.__dict__.get('quantity')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .search import update_search_vectors
+        from .stock import STOCK_SUMMARY_FIELDS, sync_product_stock
+
+        if self._state.adding:
+            # No store inventory yet: the product's own quantity is its stock
+            self.total_quantity = self.quantity
+            self.low_stock = self.total_quantity <= self.min_quantity
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self._record_quantity(InventoryMovement.Kind.RECEIPT)
+                update_search_vectors(Product.objects.filter(pk=self.pk))
+            return
+
+        # The summary and search columns are only written by UPDATEs computed in the database,
+        # never from a possibly stale instance
+        derived_fields = {*STOCK_SUMMARY_FIELDS, 'search_vector'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+        kwargs['update_fields'] = [name for name in update_fields if name not in derived_fields]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if 'quantity' in kwargs['update_fields']:
+                self._record_quantity(InventoryMovement.Kind.ADJUSTMENT)
+            if SEARCHED_FIELDS & set(kwargs['update_fields']):
+                update_search_vectors(Product.objects.filter(pk=self.pk))
+        if {'quantity', 'min_quantity'} & set(kwargs['update_fields']):
+            sync_product_stock(self.pk)
+            self.refresh_from_db(fields=STOCK_SUMMARY_FIELDS)
+
+    def _record_quantity(self, kind):
+        """Ledger a change of the product's own quantity made by a plain save."""
+        change = self.quantity - (getattr(self, '_recorded_quantity', None) or 0)
+        if change:
+            InventoryMovement.objects.create(product=self, store=None, kind=kind, quantity=change, balance=self.quantity)
+        self._recorded_quantity = self.quantity
+
     @property
     def is_in_stock(self):
-        return self.quantity > 0 and self.status == self.Status.ACTIVE
+        return self.total_quantity > 0 and self.status == self.Status.ACTIVE
 
     @property
     def is_low_stock(self):
-        return self.quantity <= self.min_quantity
+        return self.low_stock
 
     @property
     def current_price(self):
@@ -187,20 +254,24 @@ class Product(models.Model):
             return ((self.current_price - self.cost_price) / self.current_price) * 100
         return 0
 
-    def update_stock(self, quantity_change, operation='add'):
-        """Update product stock quantity."""
+    def update_stock(self, quantity_change, operation='add', kind=None, sale=None, created_by=None):
+        """
+        Update product stock quantity under a row lock, recording the
+        movement in the stock ledger (a receipt or an adjustment by default).
+        """
+        from .movements import adjust_product_stock
+        from .stock import STOCK_SUMMARY_FIELDS
+
         if operation == 'add':
-            self.quantity += quantity_change
+            change, default_kind = quantity_change, InventoryMovement.Kind.RECEIPT
         elif operation == 'subtract':
-            self.quantity = max(0, self.quantity - quantity_change)
-        
-        # Update status based on quantity
-        if self.quantity == 0:
-            self.status = self.Status.OUT_OF_STOCK
-        elif self.status == self.Status.OUT_OF_STOCK and self.quantity > 0:
-            self.status = self.Status.ACTIVE
-        
-        self.save()
+            change, default_kind = -quantity_change, InventoryMovement.Kind.ADJUSTMENT
+        else:
+            return None
+        movement = adjust_product_stock(self.pk, change, kind or default_kind, sale=sale, created_by=created_by)
+        self.refresh_from_db(fields=['quantity', 'status', 'updated_at', *STOCK_SUMMARY_FIELDS])
+        self._recorded_quantity = self.quantity
+        return movement
 
 
 class ProductInventory(models.Model):
@@ -233,6 +304,32 @@ class ProductInventory(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.store.name} ({self.quantity})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the product's stock summary currently counts for this row
+        instance._counted_quantity = instance.__dict__.get('quantity')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .stock import apply_inventory_delta
+
+        adding = self._state.adding
+        delta = self.quantity - (0 if adding else getattr(self, '_counted_quantity', None) or 0)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if delta or adding:
+                apply_inventory_delta(self.product_id, delta)
+            if delta:
+                InventoryMovement.objects.create(
+                    product_id=self.product_id,
+                    store_id=self.store_id,
+                    kind=InventoryMovement.Kind.RECEIPT if adding else InventoryMovement.Kind.ADJUSTMENT,
+                    quantity=delta,
+                    balance=self.quantity,
+                )
+        self._counted_quantity = self.quantity
+
     @property
     def available_quantity(self):
         """Available quantity (total - reserved)"""
@@ -313,33 +410,31 @@ class StockTransfer(models.Model):
         self.approved_by = approved_by_user
         self.save()
 
-    def complete(self):
-        """Complete the transfer"""
-        # Update inventory
-        from_inventory, created = ProductInventory.objects.get_or_create(
-            product=self.product,
-            store=self.from_store,
-            defaults={'quantity': 0}
-        )
-        to_inventory, created = ProductInventory.objects.get_or_create(
-            product=self.product,
-            store=self.to_store,
-            defaults={'quantity': 0}
-        )
-
-        # Transfer the stock
-        if from_inventory.quantity >= self.quantity:
-            from_inventory.quantity -= self.quantity
-            to_inventory.quantity += self.quantity
-            from_inventory.save()
-            to_inventory.save()
-            
-            self.status = 'completed'
-            self.transfer_date = timezone.now()
-            self.save()
-            return True
-        else:
+    def complete(self, completed_by=None):
+        """
+        Complete the transfer: move the stock between the stores' inventory
+        rows, under row locks, and record both legs in the stock ledger.
+        Returns False when the sending store holds too little stock or the
+        transfer was already completed.
+        """
+        from .movements import InsufficientStock, transfer_stock
+
+        try:
+            with transaction.atomic():
+                # Concurrent completions of the same transfer queue here, and only the first moves stock
+                status = StockTransfer.objects.select_for_update().values_list('status', flat=True).get(pk=self.pk)
+                if status == 'completed':
+                    return False
+                transfer_stock(
+                    self.product_id, self.from_store_id, self.to_store_id, self.quantity,
+                    transfer=self, created_by=completed_by,
+                )
+                self.status = 'completed'
+                self.transfer_date = timezone.now()
+                self.save()
+        except InsufficientStock:
             return False
+        return True
 
     def cancel(self):
         """Cancel the transfer"""
@@ -347,6 +442,116 @@ class StockTransfer(models.Model):
         self.save()
 
 
+class InventoryMovement(models.Model):
+    """
+    Append-only stock ledger: one row per change of a store's inventory of
+    a product, with the signed quantity and the store's balance after it.
+    Rows without a store record the product's own ``quantity``.
+    """
+    class Kind(models.TextChoices):
+        RECEIPT = 'receipt', _('Receipt')
+        SALE = 'sale', _('Sale')
+        SALE_RETURN = 'sale_return', _('Sale Return')
+        TRANSFER_OUT = 'transfer_out', _('Transfer Out')
+        TRANSFER_IN = 'transfer_in', _('Transfer In')
+        ADJUSTMENT = 'adjustment', _('Adjustment')
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='movements'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='inventory_movements',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    quantity = models.IntegerField(help_text=_('Units added (positive) or removed (negative)'))
+    balance = models.PositiveIntegerField(help_text=_('Store quantity after the movement'))
+    shortfall = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Units the movement should have taken but the stock did not hold (oversold)')
+    )
+    transfer = models.ForeignKey(
+        StockTransfer,
+        on_delete=models.SET_NULL,
+        related_name='movements',
+        null=True,
+        blank=True
+    )
+    sale = models.ForeignKey(
+        'sales.Sale',
+        on_delete=models.SET_NULL,
+        related_name='inventory_movements',
+        null=True,
+        blank=True
+    )
+    created_by = models.ForeignKey(
+        'users.User',
+        on_delete=models.SET_NULL,
+        related_name='inventory_movements',
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Inventory Movement')
+        verbose_name_plural = _('Inventory Movements')
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Point-in-time stock and per-store movement totals are range reads of this index
+            models.Index(fields=['store', 'product', 'created_at'], name='movement_store_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.store_id}: {self.quantity:+d} ({self.get_kind_display()})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Inventory movements are append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Inventory movements are append-only')
+
+
+class InventorySnapshot(models.Model):
+    """
+    A store's stock of a product at ``taken_at`` (no store: the product's
+    own quantity). Stock at any time is the latest snapshot before it plus
+    the ledger movements since; see ``apps.products.movements.stock_at``.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='snapshots'
+    )
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        related_name='inventory_snapshots',
+        null=True,
+        blank=True
+    )
+    quantity = models.PositiveIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('Inventory Snapshot')
+        verbose_name_plural = _('Inventory Snapshots')
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['store', 'product', 'taken_at'], name='snapshot_store_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.store_id}: {self.quantity} ({self.taken_at:%Y-%m-%d %H:%M})"
+
+
 class ProductVariant(models.Model):
     """
     Product variant model for products with multiple options (size, color, etc.).
@@ -0,0 +1,278 @@
+import logging
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .catalogue import invalidate_catalogue
+from .models import InventoryMovement, InventorySnapshot, Product, ProductInventory
+from .stock import apply_inventory_delta, sync_product_stock
+
+
+logger = logging.getLogger(__name__)
+
+Kind = InventoryMovement.Kind
+
+# Sales whose items have left the shelf; pending sales don't hold stock, and
+# cancelled or refunded ones give theirs back
+STOCK_TAKING_SALE_STATUSES = ['confirmed', 'processing', 'shipped', 'delivered']
+
+
+class InsufficientStock(Exception):
+    """The store holds fewer units of the product than the movement takes."""
+
+
+def lock_inventory(product_id, store_ids):
+    """
+    The product's inventory rows at ``store_ids`` as {store_id: row},
+    locked FOR UPDATE until the transaction ends.
+
+    Rows are locked in store-id order, so movements touching the same
+    stores in opposite directions queue instead of deadlocking. Call it
+    inside ``transaction.atomic``.
+    """
+    rows = (
+        ProductInventory.objects.select_for_update()
+        .filter(product_id=product_id, store_id__in=store_ids)
+        .order_by('store_id')
+    )
+    return {row.store_id: row for row in rows}
+
+
+def transfer_stock(product_id, from_store_id, to_store_id, quantity, transfer=None, created_by=None):
+    """
+    Move ``quantity`` units of a product from one store to another.
+
+    Both inventory rows are locked, the stock is taken with a conditional
+    ``UPDATE ... SET quantity = quantity - n WHERE quantity >= n`` and both
+    legs go to the stock ledger, all in one transaction. Raises
+    InsufficientStock (and changes nothing) when the sending store holds
+    fewer than ``quantity`` units.
+
+    The product's stock summary is unchanged: the units only change store.
+    """
+    with transaction.atomic():
+        # The receiving store may have no row yet; get_or_create copes with a concurrent insert
+        ProductInventory.objects.get_or_create(product_id=product_id, store_id=to_store_id, defaults={'quantity': 0})
+        rows = lock_inventory(product_id, [from_store_id, to_store_id])
+        source, destination = rows.get(from_store_id), rows[to_store_id]
+
+        now = timezone.now()
+        taken = source is not None and ProductInventory.objects.filter(
+            pk=source.pk, quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity, last_updated=now)
+        if not taken:
+            raise InsufficientStock(f'Store {from_store_id} holds fewer than {quantity} units of product {product_id}')
+        ProductInventory.objects.filter(pk=destination.pk).update(quantity=F('quantity') + quantity, last_updated=now)
+
+        # The rows stay locked, so their balances are the locked quantities plus the movement
+        InventoryMovement.objects.bulk_create([
+            InventoryMovement(
+                product_id=product_id, store_id=from_store_id, kind=Kind.TRANSFER_OUT, quantity=-quantity,
+                balance=source.quantity - quantity, transfer=transfer, created_by=created_by,
+            ),
+            InventoryMovement(
+                product_id=product_id, store_id=to_store_id, kind=Kind.TRANSFER_IN, quantity=quantity,
+                balance=destination.quantity + quantity, transfer=transfer, created_by=created_by,
+            ),
+        ])
+        # .update() bypasses the inventory signals
+        invalidate_catalogue(destination.store.tenant_id)
+
+
+def adjust_store_stock(product_id, store_id, change, kind, sale=None, created_by=None):
+    """
+    Add ``change`` units (negative to take) to a store's inventory of a
+    product, under the row lock, and record the movement.
+
+    Stock never goes below zero: a take larger than the stock empties the
+    row, and the movement records what was actually taken plus the units
+    that were missing as its ``shortfall`` (also logged as a warning).
+    Returns the movement, or None when the store has no inventory row for
+    the product.
+    """
+    with transaction.atomic():
+        row = lock_inventory(product_id, [store_id]).get(store_id)
+        if row is None:
+            return None
+        balance = max(0, row.quantity + change)
+        ProductInventory.objects.filter(pk=row.pk).update(quantity=balance, last_updated=timezone.now())
+        apply_inventory_delta(product_id, balance - row.quantity)
+        invalidate_catalogue(row.store.tenant_id)
+        return _record_movement(
+            product_id, store_id, kind, row.quantity, balance, change, sale=sale, created_by=created_by
+        )
+
+
+def adjust_product_stock(product_id, change, kind, sale=None, created_by=None):
+    """
+    ``adjust_store_stock`` for a product's own ``quantity`` (the stock of
+    products without store inventory), recorded with no store. An emptied
+    product is marked out of stock, and a restocked one active again.
+    """
+    with transaction.atomic():
+        product = Product.objects.select_for_update().only('quantity', 'status', 'tenant_id').get(pk=product_id)
+        balance = max(0, product.quantity + change)
+        status = product.status
+        if balance == 0:
+            status = Product.Status.OUT_OF_STOCK
+        elif status == Product.Status.OUT_OF_STOCK:
+            status = Product.Status.ACTIVE
+        Product.objects.filter(pk=product_id).update(quantity=balance, status=status, updated_at=timezone.now())
+        sync_product_stock(product_id)
+        invalidate_catalogue(product.tenant_id)
+        return _record_movement(
+            product_id, None, kind, product.quantity, balance, change, sale=sale, created_by=created_by
+        )
+
+
+def _record_movement(product_id, store_id, kind, previous, balance, change, sale=None, created_by=None):
+    shortfall = max(0, -(previous + change))
+    if shortfall:
+        logger.warning(
+            'Oversold product %s at store %s: %s more units taken than were in stock (sale %s)',
+            product_id, store_id, shortfall, sale.pk if sale else None,
+        )
+    return InventoryMovement.objects.create(
+        product_id=product_id, store_id=store_id, kind=kind, quantity=balance - previous,
+        balance=balance, shortfall=shortfall, sale=sale, created_by=created_by,
+    )
+
+
+def _sale_store_id(sale):
+    # A sale belongs to its rep's store, or to the client's for reps without one
+    return sale.sales_representative.store_id or sale.client.store_id
+
+
+def record_sale_item(item):
+    """
+    Take a sale item's units from the selling store's inventory, or from the
+    product's own stock while it has no store inventory at all. Returns the
+    movement, or None when the product is only stocked in other stores.
+    """
+    sale = item.sale
+    store_id = _sale_store_id(sale)
+    movement = None
+    if store_id:
+        movement = adjust_store_stock(item.product_id, store_id, -item.quantity, Kind.SALE, sale=sale)
+    if movement is None and not Product.objects.filter(pk=item.product_id, inventory_tracked=True).exists():
+        movement = adjust_product_stock(item.product_id, -item.quantity, Kind.SALE, sale=sale)
+    return movement
+
+
+def sale_holds_stock(sale):
+    """Whether the sale's latest stock movement took its items (rather than returned them)."""
+    latest = (
+        InventoryMovement.objects.filter(sale=sale, kind__in=[Kind.SALE, Kind.SALE_RETURN])
+        .order_by('-id').values_list('kind', flat=True).first()
+    )
+    return latest == Kind.SALE
+
+
+def return_sale_stock(sale):
+    """
+    Put back every unit the sale still holds, with one SALE_RETURN movement
+    per store (or product's own stock) it was taken from.
+    """
+    held = (
+        InventoryMovement.objects.filter(sale=sale, kind__in=[Kind.SALE, Kind.SALE_RETURN])
+        .values('product_id', 'store_id')
+        .annotate(units=Sum('quantity'))
+        .order_by('product_id', 'store_id')
+    )
+    with transaction.atomic():
+        for row in held:
+            if row['units'] >= 0:
+                continue
+            if row['store_id']:
+                adjust_store_stock(row['product_id'], row['store_id'], -row['units'], Kind.SALE_RETURN, sale=sale)
+            else:
+                adjust_product_stock(row['product_id'], -row['units'], Kind.SALE_RETURN, sale=sale)
+
+
+def sync_sale_stock(sale):
+    """
+    Take the items of a sale that has just reached a stock-taking status, or
+    return the stock of one that has left them (e.g. was cancelled).
+    """
+    takes_stock = sale.status in STOCK_TAKING_SALE_STATUSES
+    if takes_stock == sale_holds_stock(sale):
+        return
+    if takes_stock:
+        for item in sale.items.all():
+            item.sale = sale
+            record_sale_item(item)
+    else:
+        return_sale_stock(sale)
+
+
+def snapshot_inventory(store_id=None, tenant_id=None):
+    """
+    Record the current stock of one store's inventory rows, or with
+    ``store_id`` None the own quantities of ``tenant_id``'s products that
+    have no store inventory, as InventorySnapshot rows. Returns the number
+    of snapshots written.
+
+    The rows are locked while they are read, so every movement either
+    happened before ``taken_at`` and is in the snapshot, or after it.
+    """
+    with transaction.atomic():
+        if store_id is None:
+            rows = Product.objects.select_for_update().filter(tenant_id=tenant_id, inventory_tracked=False)
+            quantities = list(rows.order_by('pk').values_list('pk', 'quantity'))
+        else:
+            rows = ProductInventory.objects.select_for_update().filter(store_id=store_id)
+            quantities = list(rows.order_by('product_id').values_list('product_id', 'quantity'))
+        taken_at = timezone.now()
+        InventorySnapshot.objects.bulk_create([
+            InventorySnapshot(product_id=product_id, store_id=store_id, quantity=quantity, taken_at=taken_at)
+            for product_id, quantity in quantities
+        ])
+    return len(quantities)
+
+
+def snapshot_tenant_inventory(tenant_id):
+    """Snapshot every store of a tenant, one transaction each, then its products' own stock."""
+    from apps.stores.models import Store
+
+    written = 0
+    for store_id in Store.objects.filter(tenant_id=tenant_id).order_by('id').values_list('id', flat=True):
+        written += snapshot_inventory(store_id=store_id)
+    return written + snapshot_inventory(tenant_id=tenant_id)
+
+
+def stock_at(product_id, store_id, at):
+    """
+    A store's stock of a product at ``at`` (store None: the product's own
+    stock): the latest snapshot before it plus the movements since, two
+    index range reads. Pairs without a snapshot start from zero.
+    """
+    snapshot = (
+        InventorySnapshot.objects.filter(product_id=product_id, store_id=store_id, taken_at__lte=at)
+        .order_by('-taken_at')
+        .values_list('quantity', 'taken_at')
+        .first()
+    )
+    movements = InventoryMovement.objects.filter(product_id=product_id, store_id=store_id, created_at__lte=at)
+    quantity = 0
+    if snapshot:
+        quantity, taken_at = snapshot
+        movements = movements.filter(created_at__gt=taken_at)
+    return quantity + (movements.aggregate(change=Sum('quantity'))['change'] or 0)
+
+
+def store_movements(store_id, start, end):
+    """
+    Net units moved per product and kind at a store between ``start`` and
+    ``end``, as {product_id: {kind: units}}.
+    """
+    totals = {}
+    rows = (
+        InventoryMovement.objects.filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .values('product_id', 'kind')
+        .annotate(units=Sum('quantity'))
+        .order_by()
+    )
+    for row in rows:
+        totals.setdefault(row['product_id'], {})[row['kind']] = row['units']
+    return totals
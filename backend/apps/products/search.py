@@ -0,0 +1,85 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Greatest
+
+
+# No stemming: product names and SKUs are not English prose, and prefix matching covers plurals
+SEARCH_CONFIG = 'simple'
+
+
+def product_search_vector(category_model):
+    """
+    The ``Product.search_vector`` expression: name and SKU weighted A, the
+    category name B and the description C. It reads the category with a
+    subquery so one UPDATE can refresh any number of products.
+    """
+    category_name = Subquery(category_model.objects.filter(pk=OuterRef('category_id')).values('name')[:1])
+    # The parser reads "GR-0042" as "gr" and the number "-0042", which "0042:*" would not match
+    sku_words = Func(F('sku'), Value('[^[:alnum:]]+'), Value(' '), Value('g'), function='regexp_replace')
+    return (
+        SearchVector('name', sku_words, weight='A', config=SEARCH_CONFIG)
+        + SearchVector(category_name, weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(products):
+    """Refresh the search vector of a Product queryset (Postgres only; other databases search without it)."""
+    from .models import Category
+
+    if connection.vendor != 'postgresql':
+        return 0
+    return products.update(search_vector=product_search_vector(Category))
+
+
+@lru_cache(maxsize=None)
+def trigram_available():
+    """Whether the pg_trgm extension (and so the trigram indexes) is installed."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def prefix_query(text):
+    """Every word of ``text`` as a prefix, so "gold ri" finds "Gold Ring"."""
+    terms = re.findall(r'\w+', text.lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_products(queryset, text):
+    """
+    Filter ``queryset`` to products matching ``text``, best matches first.
+
+    On Postgres the words are prefix-matched against the search vector (GIN
+    index) and ranked with ``ts_rank``. With pg_trgm installed, names that
+    are similar to the text (typos) and SKUs containing it also match,
+    through the trigram indexes, and the trigram similarity counts towards
+    the rank. Other databases fall back to case-insensitive substring
+    matching on the same fields, with name and SKU matches ranked first.
+    """
+    text = text.strip()
+    if not text:
+        return queryset
+    if connection.vendor != 'postgresql':
+        primary = Q(name__icontains=text) | Q(sku__icontains=text)
+        return queryset.filter(
+            primary | Q(category__name__icontains=text) | Q(description__icontains=text)
+        ).annotate(
+            search_rank=Case(When(primary, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+        ).order_by('-search_rank', '-created_at')
+
+    query = prefix_query(text)
+    match = Q(search_vector=query) if query else Q(pk__in=[])
+    rank = SearchRank(F('search_vector'), query) if query else Value(0.0, output_field=FloatField())
+    if trigram_available():
+        match |= Q(name__trigram_word_similar=text) | Q(sku__icontains=text)
+        rank = Greatest(rank, TrigramWordSimilarity(text, 'name'))
+    return queryset.filter(match).annotate(search_rank=rank).order_by('-search_rank', '-created_at')
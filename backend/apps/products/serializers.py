@@ -78,10 +78,10 @@ class ProductSerializer(serializers.ModelSerializer):
         return []
     
     def get_is_in_stock(self, obj):
-        return obj.quantity > 0
+        return obj.total_quantity > 0
     
     def get_is_low_stock(self, obj):
-        return obj.quantity <= obj.min_quantity
+        return obj.low_stock
     
     def get_current_price(self, obj):
         return obj.discount_price if obj.discount_price else obj.selling_price
@@ -154,7 +154,7 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'sku', 'description', 'category', 'category_name',
             'brand', 'cost_price', 'selling_price', 'discount_price',
-            'quantity', 'min_quantity', 'max_quantity', 'weight',
+            'quantity', 'total_quantity', 'min_quantity', 'max_quantity', 'weight',
             'dimensions', 'material', 'color', 'size', 'status',
             'is_featured', 'is_bestseller', 'main_image_url',
             'is_in_stock', 'is_low_stock', 'current_price',
@@ -171,10 +171,10 @@ class ProductListSerializer(serializers.ModelSerializer):
         return None
     
     def get_is_in_stock(self, obj):
-        return obj.quantity > 0
+        return obj.total_quantity > 0
     
     def get_is_low_stock(self, obj):
-        return obj.quantity <= obj.min_quantity
+        return obj.low_stock
     
     def get_current_price(self, obj):
         return obj.discount_price if obj.discount_price else obj.selling_price
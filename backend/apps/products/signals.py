@@ -0,0 +1,56 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.sales.models import Sale, SaleItem
+from apps.stores.models import Store
+from .catalogue import invalidate_catalogue
+from .models import Category, Product, ProductInventory
+from .movements import STOCK_TAKING_SALE_STATUSES, record_sale_item, return_sale_stock, sync_sale_stock
+from .search import update_search_vectors
+from .stock import apply_inventory_delta
+
+
+@receiver(post_save, sender=ProductInventory)
+@receiver(post_delete, sender=ProductInventory)
+def refresh_catalogue_for_inventory(sender, instance, **kwargs):
+    invalidate_catalogue(instance.store.tenant_id)
+
+
+@receiver(post_delete, sender=ProductInventory)
+def remove_deleted_inventory_from_stock(sender, instance, **kwargs):
+    # Also runs for rows deleted along with their store
+    apply_inventory_delta(instance.product_id, -instance.quantity)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def refresh_catalogue(sender, instance, **kwargs):
+    invalidate_catalogue(instance.tenant_id)
+
+
+@receiver(post_save, sender=SaleItem)
+def take_sold_stock(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.sale.status in STOCK_TAKING_SALE_STATUSES:
+        record_sale_item(instance)
+
+
+@receiver(post_save, sender=Sale)
+def sync_stock_with_sale_status(sender, instance, created=False, raw=False, **kwargs):
+    # A new sale has no items yet; they take their stock as they are added
+    if not created and not raw:
+        sync_sale_stock(instance)
+
+
+@receiver(pre_delete, sender=Sale)
+def return_deleted_sale_stock(sender, instance, **kwargs):
+    # Before the movements' sale is set to NULL
+    return_sale_stock(instance)
+
+
+@receiver(post_save, sender=Category)
+def refresh_search_for_category(sender, instance, created=False, raw=False, **kwargs):
+    # Products carry their category's name in their search vector
+    if not created and not raw:
+        update_search_vectors(Product.objects.filter(category=instance))
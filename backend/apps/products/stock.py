@@ -0,0 +1,44 @@
+from django.db.models import Case, F, Value, When
+from django.db.models.lookups import LessThanOrEqual
+
+
+# Product columns maintained here rather than by Product.save()
+STOCK_SUMMARY_FIELDS = ['total_quantity', 'inventory_tracked', 'low_stock']
+
+
+def _summary_update(total):
+    """UPDATE values that set the stock summary to ``total`` (an expression over the row)."""
+    return {'total_quantity': total, 'low_stock': LessThanOrEqual(total, F('min_quantity'))}
+
+
+def apply_inventory_delta(product_id, delta):
+    """
+    Add ``delta`` units of store inventory to a product's stock summary.
+
+    One UPDATE whose SET expressions read the row being updated, so
+    concurrent writers serialize on the product row and every delta is
+    applied to the latest total. The first inventory a product gets
+    replaces its legacy own ``quantity`` as the total.
+    """
+    from .models import Product
+
+    total = Case(
+        When(inventory_tracked=True, then=F('total_quantity') + delta),
+        default=Value(delta),
+    )
+    Product.objects.filter(pk=product_id).update(inventory_tracked=True, **_summary_update(total))
+
+
+def sync_product_stock(product_id):
+    """
+    Refresh a product's summary after its own ``quantity`` or
+    ``min_quantity`` changed (the total only follows ``quantity`` until the
+    product has store inventory).
+    """
+    from .models import Product
+
+    total = Case(
+        When(inventory_tracked=True, then=F('total_quantity')),
+        default=F('quantity'),
+    )
+    Product.objects.filter(pk=product_id).update(**_summary_update(total))
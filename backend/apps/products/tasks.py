@@ -0,0 +1,17 @@
+from apps.tenants.models import Tenant
+from .movements import snapshot_tenant_inventory
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; snapshots are then taken by manage.py snapshot_inventory
+    shared_task = None
+
+
+if shared_task is not None:
+    @shared_task(name='products.snapshot_inventory')
+    def snapshot_inventory_task():
+        """Nightly counterpart of ``manage.py snapshot_inventory``."""
+        for tenant_id in Tenant.objects.order_by('id').values_list('id', flat=True):
+            snapshot_tenant_inventory(tenant_id)
+else:
+    snapshot_inventory_task = None
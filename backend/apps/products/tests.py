@@ -1,3 +1,555 @@
-from django.test import TestCase
+import io
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.clients.models import Client
+from apps.sales.models import Sale, SaleItem
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from .catalogue import CatalogueSnapshot, get_catalogue_snapshot, invalidate_catalogue
+from .models import Category, InventoryMovement, InventorySnapshot, Product, ProductInventory, StockTransfer
+from .movements import stock_at, store_movements
+from .search import search_products, trigram_available
+
+User = get_user_model()
+
+
+class CatalogueTestMixin:
+    def make_store(self, code, tenant=None):
+        return Store.objects.create(
+            name=f"Store {code}", code=code, address="-", city="-", state="-", tenant=tenant or self.tenant
+        )
+
+    def make_product(self, sku, store=None, tenant=None, quantity=0):
+        tenant = tenant or self.tenant
+        category, _created = Category.objects.get_or_create(name="Rings", tenant=tenant, store=None)
+        return Product.objects.create(
+            name=f"Product {sku}",
+            sku=sku,
+            category=category,
+            cost_price=Decimal('100.00'),
+            selling_price=Decimal('150.00'),
+            quantity=quantity,
+            tenant=tenant,
+            store=store,
+        )
+
+    def get(self, url, user=None):
+        token = RefreshToken.for_user(user or self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, context.captured_queries
+
+
+class GlobalCatalogueTest(CatalogueTestMixin, APITestCase):
+    url = '/api/products/global-catalogue/'
+
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.north, self.south = self.make_store("N1"), self.make_store("S1")
+        self.ring = self.make_product("RING", store=self.north)
+        self.chain = self.make_product("CHAIN")
+        ProductInventory.objects.create(product=self.ring, store=self.north, quantity=5, reserved_quantity=2, reorder_point=5)
+        ProductInventory.objects.create(product=self.ring, store=self.south, quantity=0)
+        ProductInventory.objects.create(product=self.chain, store=self.south, quantity=12, reorder_point=3)
+
+        # Another tenant's products and stores never show up
+        other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        other_store = self.make_store("X1", tenant=other_tenant)
+        other_product = self.make_product("OTHER", tenant=other_tenant)
+        ProductInventory.objects.create(product=other_product, store=other_store, quantity=99)
+
+    def test_catalogue_pivots_inventory_per_store(self):
+        response, _queries = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_products'], 2)
+        self.assertEqual(response.data['stores_count'], 2)
+
+        chain, ring = response.data['catalogue']
+        self.assertEqual((chain['product_sku'], chain['store_name'], chain['total_quantity']), ("CHAIN", 'Global', 12))
+        self.assertEqual((ring['product_sku'], ring['store_name'], ring['total_quantity']), ("RING", "Store N1", 5))
+        self.assertEqual(ring['inventory_by_store'], [
+            {'store_id': self.north.id, 'store_name': "Store N1", 'quantity': 5, 'available_quantity': 3,
+             'is_low_stock': True, 'is_out_of_stock': False},
+            {'store_id': self.south.id, 'store_name': "Store S1", 'quantity': 0, 'available_quantity': 0,
+             'is_low_stock': True, 'is_out_of_stock': True},
+        ])
+        # No inventory row at all reads as out of stock
+        self.assertEqual(chain['inventory_by_store'][0], {
+            'store_id': self.north.id, 'store_name': "Store N1", 'quantity': 0, 'available_quantity': 0,
+            'is_low_stock': False, 'is_out_of_stock': True,
+        })
+
+    def test_query_count_does_not_grow_with_catalogue(self):
+        for i in range(20):
+            product = self.make_product(f"P{i}")
+            ProductInventory.objects.create(product=product, store=self.north, quantity=i)
+        cache.clear()
+
+        response, queries = self.get(self.url)
+        self.assertEqual(response.data['total_products'], 22)
+        # auth + stores + products + inventory
+        self.assertEqual(len(queries), 4, [q['sql'] for q in queries])
+        # The snapshot is cached: only authentication is left
+        _response, queries = self.get(self.url)
+        self.assertEqual(len(queries), 1)
+
+    def test_inventory_writes_invalidate_the_snapshot(self):
+        self.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory = ProductInventory.objects.get(product=self.chain, store=self.south)
+            inventory.quantity = 40
+            inventory.save()
+
+        response, _queries = self.get(self.url)
+        self.assertEqual(response.data['catalogue'][0]['total_quantity'], 40)
+
+    def test_snapshot_built_across_a_commit_is_not_served(self):
+        """A build that overlaps an inventory commit can't store a snapshot later reads get"""
+        build = CatalogueSnapshot.build
+
+        def build_around_a_commit(tenant_id):
+            snapshot = build(tenant_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_catalogue(tenant_id)
+            return snapshot
+
+        with mock.patch.object(CatalogueSnapshot, 'build', side_effect=build_around_a_commit) as patched:
+            get_catalogue_snapshot(self.tenant.id)
+            get_catalogue_snapshot(self.tenant.id)
+        self.assertEqual(patched.call_count, 2)
+
+    def test_fields_and_pagination(self):
+        response, _queries = self.get(f'{self.url}?fields=product_sku,total_quantity&page_size=1')
+        self.assertEqual(response.data['catalogue'], [{'product_sku': "CHAIN", 'total_quantity': 12}])
+        self.assertEqual(response.data['total_products'], 2)
+        self.assertIsNotNone(response.data['next'])
+
+        response, _queries = self.get(response.data['next'])
+        self.assertEqual(response.data['catalogue'], [{'product_sku': "RING", 'total_quantity': 5}])
+        self.assertIsNone(response.data['next'])
+
+    def test_unknown_fields_are_rejected(self):
+        response, _queries = self.get(f'{self.url}?fields=product_id,price')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('price', str(response.data['fields']))
+
+
+class StockSummaryTest(CatalogueTestMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.north, self.south = self.make_store("N1"), self.make_store("S1")
+
+    def assertStock(self, product, total_quantity, low_stock):
+        product.refresh_from_db()
+        self.assertEqual((product.total_quantity, product.low_stock), (total_quantity, low_stock))
+
+    def test_own_quantity_until_inventory_is_tracked(self):
+        product = self.make_product("RING", quantity=4)
+        self.assertStock(product, 4, False)
+        product.min_quantity = 4
+        product.save()
+        self.assertStock(product, 4, True)
+
+        # The first inventory row replaces the product's own quantity
+        ProductInventory.objects.create(product=product, store=self.north, quantity=10)
+        self.assertStock(product, 10, False)
+        product.quantity = 1
+        product.save()
+        self.assertStock(product, 10, False)
+
+    def test_inventory_writes_maintain_the_total(self):
+        product = self.make_product("RING")
+        product.min_quantity = 5
+        product.save()
+        north = ProductInventory.objects.create(product=product, store=self.north, quantity=3)
+        south = ProductInventory.objects.create(product=product, store=self.south, quantity=6)
+        self.assertStock(product, 9, False)
+
+        north = ProductInventory.objects.get(pk=north.pk)
+        north.quantity = 0
+        north.save()
+        self.assertStock(product, 6, False)
+        south.delete()
+        self.assertStock(product, 0, True)
+
+    def test_a_stale_product_instance_does_not_overwrite_the_summary(self):
+        product = self.make_product("RING")
+        ProductInventory.objects.create(product=product, store=self.north, quantity=8)
+        product.name = "Renamed"
+        product.save()
+        self.assertStock(product, 8, False)
+
+    def test_transfer_keeps_the_total(self):
+        product = self.make_product("RING")
+        ProductInventory.objects.create(product=product, store=self.north, quantity=8)
+        transfer = StockTransfer.objects.create(
+            from_store=self.north, to_store=self.south, product=product, quantity=3, reason="-", requested_by=self.admin
+        )
+        self.assertTrue(transfer.complete())
+        self.assertStock(product, 8, False)
+        self.assertEqual(
+            dict(product.inventory.values_list('store__code', 'quantity')), {"N1": 5, "S1": 3}
+        )
+
+    def test_stock_filters_and_stats_use_the_summary(self):
+        low, out, stocked = self.make_product("LOW"), self.make_product("OUT"), self.make_product("STOCKED")
+        low.min_quantity = 5
+        low.save()
+        ProductInventory.objects.create(product=low, store=self.north, quantity=2)
+        ProductInventory.objects.create(product=stocked, store=self.north, quantity=20)
+
+        response, _queries = self.get('/api/products/list/?stock=low')
+        self.assertEqual({product['sku'] for product in response.data['results']}, {"LOW", "OUT"})
+        response, _queries = self.get('/api/products/list/?stock=out')
+        self.assertEqual([product['sku'] for product in response.data['results']], ["OUT"])
+
+        response, _queries = self.get('/api/products/stats/')
+        self.assertEqual((response.data['out_of_stock'], response.data['low_stock']), (1, 2))
+
+
+class StockTransferTest(CatalogueTestMixin, APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.north, self.south = self.make_store("N1"), self.make_store("S1")
+        self.product = self.make_product("RING")
+        ProductInventory.objects.create(product=self.product, store=self.north, quantity=8)
+
+    def transfer(self, quantity, from_store=None, to_store=None):
+        return StockTransfer.objects.create(
+            from_store=from_store or self.north, to_store=to_store or self.south, product=self.product,
+            quantity=quantity, reason="-", requested_by=self.admin, status='approved',
+        )
+
+    def test_complete_records_both_legs(self):
+        transfer = self.transfer(3)
+        self.assertTrue(transfer.complete(completed_by=self.admin))
+        self.assertEqual(transfer.status, 'completed')
+        self.assertEqual(
+            list(transfer.movements.order_by('id').values_list('store__code', 'kind', 'quantity', 'balance', 'created_by')),
+            [("N1", 'transfer_out', -3, 5, self.admin.id), ("S1", 'transfer_in', 3, 3, self.admin.id)],
+        )
+        # Completing again moves nothing
+        self.assertFalse(transfer.complete())
+        self.assertEqual(transfer.movements.count(), 2)
+
+    def test_insufficient_stock_changes_nothing(self):
+        transfer = self.transfer(9)
+        self.assertFalse(transfer.complete())
+        transfer.refresh_from_db()
+        self.assertEqual(transfer.status, 'approved')
+        self.assertEqual(dict(self.product.inventory.values_list('store__code', 'quantity')), {"N1": 8})
+        self.assertFalse(InventoryMovement.objects.filter(transfer__isnull=False).exists())
+
+    def test_ledger_is_append_only(self):
+        self.transfer(3).complete()
+        movement = InventoryMovement.objects.first()
+        with self.assertRaises(ValueError):
+            movement.save()
+        with self.assertRaises(ValueError):
+            movement.delete()
+
+
+# SQLite locks the whole database for writes, so the threads fail with "database table is locked"
+@skipUnless(connection.vendor == 'postgresql', 'Needs row-level locks')
+class StockTransferConcurrencyTest(CatalogueTestMixin, TransactionTestCase):
+    """Transfers completed from many threads at once, each on its own connection."""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.north, self.south = self.make_store("N1"), self.make_store("S1")
+        self.product = self.make_product("RING")
+        ProductInventory.objects.create(product=self.product, store=self.north, quantity=50)
+        ProductInventory.objects.create(product=self.product, store=self.south, quantity=50)
+
+    def run_concurrently(self, transfers):
+        barrier = threading.Barrier(len(transfers))
+        results, errors = [], []
+
+        def complete(transfer):
+            try:
+                barrier.wait()
+                results.append(transfer.complete())
+            except Exception as error:  # surfaced by the assertion below
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=complete, args=(transfer,)) for transfer in transfers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def stock(self):
+        return dict(self.product.inventory.values_list('store__code', 'quantity'))
+
+    def test_concurrent_transfers_never_oversell(self):
+        transfers = [
+            StockTransfer.objects.create(
+                from_store=self.north, to_store=self.south, product=self.product, quantity=7,
+                reason="-", requested_by=self.admin, status='approved',
+            )
+            for _i in range(12)
+        ]
+        results = self.run_concurrently(transfers)
+
+        # 50 units cover seven transfers of 7; the rest fail rather than going negative
+        self.assertEqual(results.count(True), 7)
+        self.assertEqual(self.stock(), {"N1": 1, "S1": 99})
+        self.assertEqual(StockTransfer.objects.filter(status='completed').count(), 7)
+        self.assertEqual(InventoryMovement.objects.filter(transfer__isnull=False).count(), 14)
+        # Every ledger balance is one the store really passed through
+        balances = sorted(InventoryMovement.objects.filter(store=self.north, transfer__isnull=False).values_list('balance', flat=True))
+        self.assertEqual(balances, [1, 8, 15, 22, 29, 36, 43])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_quantity, 100)
+
+    def test_opposite_transfers_do_not_deadlock(self):
+        transfers = [
+            StockTransfer.objects.create(
+                from_store=from_store, to_store=to_store, product=self.product, quantity=5,
+                reason="-", requested_by=self.admin, status='approved',
+            )
+            for _i in range(8)
+            for from_store, to_store in [(self.north, self.south), (self.south, self.north)]
+        ]
+        results = self.run_concurrently(transfers)
+
+        self.assertEqual(results, [True] * 16)
+        self.assertEqual(self.stock(), {"N1": 50, "S1": 50})
+
+    def test_one_transfer_completed_twice_moves_once(self):
+        transfer = StockTransfer.objects.create(
+            from_store=self.north, to_store=self.south, product=self.product, quantity=10,
+            reason="-", requested_by=self.admin, status='approved',
+        )
+        results = self.run_concurrently([StockTransfer.objects.get(pk=transfer.pk) for _i in range(4)])
+
+        self.assertEqual(sorted(results), [False, False, False, True])
+        self.assertEqual(self.stock(), {"N1": 40, "S1": 60})
+
+
+class InventoryLedgerTest(CatalogueTestMixin, APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.north, self.south = self.make_store("N1"), self.make_store("S1")
+        self.manager = User.objects.create_user(
+            username="manager", role=User.Role.MANAGER, tenant=self.tenant, store=self.north
+        )
+        self.customer = Client.objects.create(email="c@test.com", tenant=self.tenant, store=self.south)
+
+    def sell(self, product, quantity, rep=None, status=Sale.Status.CONFIRMED):
+        sale = Sale.objects.create(
+            order_number=f"S{Sale.objects.count()}", client=self.customer, sales_representative=rep or self.manager,
+            subtotal=Decimal('100.00'), total_amount=Decimal('100.00'), tenant=self.tenant, status=status,
+        )
+        SaleItem.objects.create(sale=sale, product=product, quantity=quantity, unit_price=Decimal('10.00'))
+        return sale
+
+    def ledger(self, product):
+        return list(
+            product.movements.order_by('id').values_list('store__code', 'kind', 'quantity', 'balance')
+        )
+
+    def test_stock_writers_record_movements(self):
+        ring = self.make_product("RING")
+        north = ProductInventory.objects.create(product=ring, store=self.north, quantity=10)
+        north = ProductInventory.objects.get(pk=north.pk)
+        north.quantity = 12
+        north.save()
+        sale = self.sell(ring, 4)
+
+        self.assertEqual(self.ledger(ring), [
+            ("N1", 'receipt', 10, 10), ("N1", 'adjustment', 2, 12), ("N1", 'sale', -4, 8),
+        ])
+        self.assertEqual(sale.inventory_movements.get().product, ring)
+        ring.refresh_from_db()
+        self.assertEqual(ring.total_quantity, 8)
+
+    def test_products_without_inventory_use_their_own_stock(self):
+        chain = self.make_product("CHAIN", quantity=5)
+        chain.update_stock(3, 'subtract')
+        self.assertEqual((chain.quantity, chain.total_quantity), (2, 2))
+        # A sale takes what is left and no more, and records (and logs) what it oversold
+        with self.assertLogs('apps.products.movements', 'WARNING') as logs:
+            self.sell(chain, 4)
+        self.assertIn('2 more units taken than were in stock', logs.output[0])
+        self.assertEqual(chain.movements.get(kind='sale').shortfall, 2)
+        chain.refresh_from_db()
+        self.assertEqual((chain.quantity, chain.status), (0, Product.Status.OUT_OF_STOCK))
+        chain.update_stock(6, 'add')
+        self.assertEqual((chain.quantity, chain.status), (6, Product.Status.ACTIVE))
+
+        self.assertEqual(self.ledger(chain), [
+            (None, 'receipt', 5, 5), (None, 'adjustment', -3, 2), (None, 'sale', -2, 0), (None, 'receipt', 6, 6),
+        ])
+
+    def test_only_confirmed_sales_hold_stock(self):
+        ring = self.make_product("RING")
+        ProductInventory.objects.create(product=ring, store=self.north, quantity=10)
+        sale = self.sell(ring, 4, status=Sale.Status.PENDING)
+        self.assertEqual(ring.movements.filter(kind='sale').count(), 0)
+
+        sale.status = Sale.Status.CONFIRMED
+        sale.save()
+        sale.status = Sale.Status.SHIPPED
+        sale.save()
+        sale.status = Sale.Status.CANCELLED
+        sale.save()
+        sale.save()
+
+        self.assertEqual(self.ledger(ring), [
+            ("N1", 'receipt', 10, 10), ("N1", 'sale', -4, 6), ("N1", 'sale_return', 4, 10),
+        ])
+        ring.refresh_from_db()
+        self.assertEqual(ring.total_quantity, 10)
+
+    def test_deleted_sale_returns_its_stock(self):
+        ring, chain = self.make_product("RING"), self.make_product("CHAIN", quantity=5)
+        ProductInventory.objects.create(product=ring, store=self.north, quantity=10)
+        sale = self.sell(ring, 3)
+        SaleItem.objects.create(sale=sale, product=chain, quantity=2, unit_price=Decimal('10.00'))
+
+        sale.delete()
+
+        self.assertEqual(ProductInventory.objects.get(product=ring).quantity, 10)
+        chain.refresh_from_db()
+        self.assertEqual(chain.quantity, 5)
+        self.assertEqual(
+            set(InventoryMovement.objects.filter(kind='sale_return').values_list('product__sku', 'quantity')),
+            {("CHAIN", 2), ("RING", 3)},
+        )
+
+    def test_sale_of_a_product_stocked_elsewhere_moves_nothing(self):
+        ring = self.make_product("RING")
+        ProductInventory.objects.create(product=ring, store=self.south, quantity=3)
+        self.sell(ring, 1)
+        self.assertEqual(ring.movements.filter(kind='sale').count(), 0)
+
+    def test_stock_at_reads_the_latest_snapshot_and_later_movements(self):
+        ring = self.make_product("RING")
+        inventory = ProductInventory.objects.create(product=ring, store=self.north, quantity=10)
+        after_receipt = timezone.now()
+        self.sell(ring, 3)
+        after_sale = timezone.now()
+
+        # No snapshot yet: the ledger is replayed from zero
+        self.assertEqual(stock_at(ring.id, self.north.id, after_receipt), 10)
+        self.assertEqual(stock_at(ring.id, self.north.id, after_sale), 7)
+        self.assertEqual(stock_at(ring.id, self.north.id, after_receipt - timedelta(hours=1)), 0)
+
+        # Only movements after the snapshot are added to it
+        InventorySnapshot.objects.create(product=ring, store=self.north, quantity=100, taken_at=after_sale)
+        inventory = ProductInventory.objects.get(pk=inventory.pk)
+        inventory.quantity = 9
+        inventory.save()
+        now = timezone.now()
+        self.assertEqual(stock_at(ring.id, self.north.id, now), 102)
+        self.assertEqual(stock_at(ring.id, self.north.id, after_receipt), 10)
+
+    def test_snapshot_command_and_store_movements(self):
+        ring, chain = self.make_product("RING"), self.make_product("CHAIN", quantity=4)
+        ProductInventory.objects.create(product=ring, store=self.north, quantity=10)
+        StockTransfer.objects.create(
+            from_store=self.north, to_store=self.south, product=ring, quantity=4, reason="-", requested_by=self.admin
+        ).complete()
+        self.sell(ring, 1)
+
+        out = io.StringIO()
+        call_command('snapshot_inventory', stdout=out)
+        self.assertIn('Wrote 3 inventory snapshots', out.getvalue())
+        self.assertEqual(
+            set(InventorySnapshot.objects.values_list('product__sku', 'store__code', 'quantity')),
+            {("RING", "N1", 5), ("RING", "S1", 4), ("CHAIN", None, 4)},
+        )
+        self.assertEqual(stock_at(ring.id, self.north.id, timezone.now()), 5)
+
+        start = timezone.now() - timedelta(days=1)
+        self.assertEqual(
+            store_movements(self.north.id, start, timezone.now()),
+            {ring.id: {'receipt': 10, 'transfer_out': -4, 'sale': -1}},
+        )
+        self.assertEqual(chain.movements.get().kind, 'receipt')
+
+
+class ProductSearchTest(CatalogueTestMixin, APITestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.admin = User.objects.create_user(username="admin", role=User.Role.BUSINESS_ADMIN, tenant=self.tenant)
+        self.ring = self.make_product("GR001")
+        self.ring.name = "Gold Ring"
+        self.ring.save()
+        self.chain = self.make_product("SC002")
+        self.chain.name = "Silver Chain"
+        self.chain.description = "Pairs well with a gold pendant"
+        self.chain.save()
+
+    def search(self, text):
+        return [product.sku for product in search_products(Product.objects.filter(tenant=self.tenant), text)]
+
+    def test_words_match_as_prefixes_and_name_ranks_first(self):
+        self.assertEqual(self.search("silver ch"), ["SC002"])
+        self.assertEqual(self.search("gr00"), ["GR001"])
+        # The name (weight A) outranks the description (weight C)
+        self.assertEqual(self.search("GOLD"), ["GR001", "SC002"])
+        self.assertEqual(self.search("platinum"), [])
+        self.assertEqual(self.search("  "), ["SC002", "GR001"])
+
+    def test_sku_parts_match_on_their_own(self):
+        self.chain.sku = "SC-0042"
+        self.chain.save()
+        self.assertEqual(self.search("sc-004"), ["SC-0042"])
+        self.assertEqual(self.search("0042"), ["SC-0042"])
+
+    def test_category_renames_reach_the_search_vector(self):
+        self.assertEqual(self.search("rings"), ["SC002", "GR001"])
+        category = self.ring.category
+        category.name = "Bridal"
+        category.save()
+        self.assertEqual(self.search("bridal"), ["SC002", "GR001"])
+
+    def test_fallback_matches_substrings_without_postgres(self):
+        with mock.patch('apps.products.search.connection') as sqlite:
+            sqlite.vendor = 'sqlite'
+            self.assertEqual(self.search("old r"), ["GR001"])
+            self.assertEqual(self.search("002"), ["SC002"])
+            # Category and description match too, after name and SKU matches
+            self.assertEqual(self.search("rings"), ["SC002", "GR001"])
+            self.assertEqual(self.search("gold"), ["GR001", "SC002"])
+            self.assertEqual(self.search("platinum"), [])
+
+    def test_trigram_matches_typos_and_sku_substrings(self):
+        if not trigram_available():
+            self.skipTest("pg_trgm is not installed")
+        self.assertEqual(self.search("Goldd Ring")[0], "GR001")
+        self.assertEqual(self.search("002"), ["SC002"])
+
+    def test_list_and_public_endpoints_search(self):
+        response, _queries = self.get('/api/products/list/?search=silver')
+        self.assertEqual([product['sku'] for product in response.data['results']], ["SC002"])
+        self.client.credentials()
+        response = self.client.get('/api/products/public/test-tenant/products/?search=gold')
+        self.assertEqual([product['sku'] for product in response.data['results']], ["GR001", "SC002"])
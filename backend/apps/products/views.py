@@ -5,14 +5,20 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
 import csv
 import io
-from decimal import Decimal
 
 from .models import Product, Category, ProductVariant, ProductInventory, StockTransfer
+from .catalogue import CATALOGUE_FIELDS, get_catalogue_snapshot
+from .imports import import_product_rows
+from .search import search_products
+from apps.imports.jobs import create_import_job, is_background_request
+from apps.imports.models import ImportJob
+from apps.imports.views import import_job_accepted
 from .serializers import (
     ProductSerializer, ProductListSerializer, ProductDetailSerializer, 
     CategorySerializer, ProductVariantSerializer, ProductInventorySerializer,
@@ -73,19 +79,18 @@ class ProductListView(generics.ListAPIView):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        # Search by name or SKU
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(sku__icontains=search)
-            )
-        
         # Filter by stock level
         stock_filter = self.request.query_params.get('stock')
         if stock_filter == 'low':
-            queryset = queryset.filter(quantity__lte=F('min_quantity'))
+            # Served by the partial low-stock index
+            queryset = queryset.filter(low_stock=True)
         elif stock_filter == 'out':
-            queryset = queryset.filter(quantity=0)
+            queryset = queryset.filter(total_quantity=0)
+        
+        # Search by name, SKU, category or description, best matches first
+        search = self.request.query_params.get('search')
+        if search:
+            return search_products(queryset, search)
         
         return queryset.order_by('-created_at')
 
@@ -176,12 +181,12 @@ class ProductStatsView(generics.GenericAPIView):
         # Basic stats
         total_products = products_queryset.count()
         active_products = products_queryset.filter(status='active').count()
-        out_of_stock = products_queryset.filter(quantity=0).count()
-        low_stock = products_queryset.filter(quantity__lte=F('min_quantity')).count()
+        out_of_stock = products_queryset.filter(total_quantity=0).count()
+        low_stock = products_queryset.filter(low_stock=True).count()
         
         # Inventory value
         total_value = products_queryset.aggregate(
-            total=Sum(F('quantity') * F('cost_price'))
+            total=Sum(F('total_quantity') * F('cost_price'))
         )['total'] or 0
         
         # Category stats
@@ -469,7 +474,7 @@ class StockTransferCompleteView(generics.GenericAPIView):
                     'message': 'Transfer must be approved before completion'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            success = transfer.complete()
+            success = transfer.complete(completed_by=request.user)
             if success:
                 # Send notification for transfer completion
                 from .services import StockTransferNotificationService
@@ -530,58 +535,46 @@ class StockTransferCancelView(generics.GenericAPIView):
 
 # Global Catalogue View for Business Admin
 class GlobalCatalogueView(generics.GenericAPIView):
+    """
+    Every product of the tenant with its inventory in every store.
+
+    Built from a cached per-tenant snapshot (stores, products and one
+    ProductInventory fetch pivoted into a product × store matrix).
+    ``?fields=`` picks the entry keys (e.g. ``product_id,total_quantity``);
+    ``?page=`` / ``?page_size=`` page through the products.
+    """
     permission_classes = [IsAuthenticated, IsRoleAllowed.for_roles(['business_admin'])]
+    pagination_class = CustomProductPagination
     
+    def get_fields(self):
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return CATALOGUE_FIELDS
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = sorted(set(fields) - set(CATALOGUE_FIELDS))
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(CATALOGUE_FIELDS)}"})
+        return fields
+
     def get(self, request):
-        tenant = request.user.tenant
-        
-        # Get all products with their inventory across all stores
-        products = Product.objects.filter(tenant=tenant)
-        
-        catalogue_data = []
-        for product in products:
-            # Get inventory across all stores for this product
-            inventory_data = []
-            total_quantity = 0
-            
-            stores = tenant.stores.all()
-            for store in stores:
-                try:
-                    inventory = ProductInventory.objects.get(product=product, store=store)
-                    inventory_data.append({
-                        'store_id': store.id,
-                        'store_name': store.name,
-                        'quantity': inventory.quantity,
-                        'available_quantity': inventory.available_quantity,
-                        'is_low_stock': inventory.is_low_stock,
-                        'is_out_of_stock': inventory.is_out_of_stock
-                    })
-                    total_quantity += inventory.quantity
-                except ProductInventory.DoesNotExist:
-                    inventory_data.append({
-                        'store_id': store.id,
-                        'store_name': store.name,
-                        'quantity': 0,
-                        'available_quantity': 0,
-                        'is_low_stock': False,
-                        'is_out_of_stock': True
-                    })
-            
-            catalogue_data.append({
-                'product_id': product.id,
-                'product_name': product.name,
-                'product_sku': product.sku,
-                'scope': product.scope,
-                'store_name': product.store.name if product.store else 'Global',
-                'total_quantity': total_quantity,
-                'inventory_by_store': inventory_data
-            })
-        
-        return Response({
-            'catalogue': catalogue_data,
-            'total_products': len(catalogue_data),
-            'stores_count': tenant.stores.count()
-        })
+        fields = self.get_fields()
+        snapshot = get_catalogue_snapshot(request.user.tenant_id)
+
+        products = snapshot.products
+        # Paging is opt-in so existing clients keep receiving the whole catalogue
+        paginated = 'page' in request.query_params or 'page_size' in request.query_params
+        if paginated:
+            products = self.paginate_queryset(products)
+
+        response = {
+            'catalogue': snapshot.entries(products, fields),
+            'total_products': len(snapshot.products),
+            'stores_count': len(snapshot.stores)
+        }
+        if paginated:
+            response['next'] = self.paginator.get_next_link()
+            response['previous'] = self.paginator.get_previous_link()
+        return Response(response)
 
 
 # Keep existing views for backward compatibility
@@ -717,12 +710,10 @@ class PublicProductListView(generics.ListAPIView):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        # Search by name or SKU
+        # Search by name, SKU, category or description, best matches first
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(sku__icontains=search)
-            )
+            return search_products(queryset, search)
         
         return queryset.order_by('-created_at')
 
@@ -830,6 +821,12 @@ class ProductImportView(APIView):
                     'message': 'Please upload a CSV file'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
+            if is_background_request(request):
+                job = create_import_job(
+                    ImportJob.Kind.PRODUCTS, file, request.user, request.user.tenant_id, request.user.store_id
+                )
+                return import_job_accepted(job, request)
+            
             # Read CSV file
             try:
                 decoded_file = file.read().decode('utf-8')
@@ -842,133 +839,8 @@ class ProductImportView(APIView):
                     'message': f'Error reading CSV file: {str(e)}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            imported_count = 0
-            errors = []
-            
-            for row_num, row in enumerate(csv_data, start=2):  # Start from 2 because row 1 is header
-                try:
-                    # Validate required fields
-                    required_fields = ['name', 'sku', 'category', 'selling_price', 'cost_price']
-                    missing_fields = []
-                    for field in required_fields:
-                        if not row.get(field):
-                            missing_fields.append(field)
-                    
-                    if missing_fields:
-                        errors.append(f"Row {row_num}: Missing required fields: {', '.join(missing_fields)}")
-                        continue
-                    
-                    # Validate numeric fields
-                    try:
-                        selling_price = Decimal(row['selling_price'])
-                        cost_price = Decimal(row['cost_price'])
-                        quantity_str = row.get('quantity', '0')
-                        quantity = int(quantity_str) if quantity_str.strip() else 0  # Default to 0 if empty or not provided
-                    except (ValueError, TypeError) as e:
-                        errors.append(f"Row {row_num}: Invalid numeric values - {str(e)}")
-                        continue
-                    
-                    # Get or create category
-                    category_name = row['category'].strip()
-                    try:
-                        # Set store and scope for category based on user role
-                        store = None
-                        scope = 'global'
-                        
-                        if request.user.role == 'manager':
-                            store = request.user.store
-                            scope = 'store'
-                        elif request.user.role == 'business_admin':
-                            # Business admin can create global categories
-                            scope = 'global'
-                        else:
-                            # Other roles create store-specific categories
-                            store = request.user.store
-                            scope = 'store'
-                        
-                        category, created = Category.objects.get_or_create(
-                            name=category_name,
-                            tenant=request.user.tenant,
-                            store=store,
-                            scope=scope,
-                            defaults={
-                                'description': f'Category for {category_name}',
-                                'is_active': True,
-                                'store': store,
-                                'scope': scope
-                            }
-                        )
-                        if created:
-                            print(f"Created new category: {category.name}")
-                        else:
-                            print(f"Using existing category: {category.name}")
-                    except Exception as e:
-                        print(f"Error creating/getting category: {str(e)}")
-                        errors.append(f"Row {row_num}: Error with category '{category_name}' - {str(e)}")
-                        continue
-                    
-                    # Check if SKU already exists (unique per tenant)
-                    if Product.objects.filter(sku=row['sku'], tenant=request.user.tenant).exists():
-                        errors.append(f"Row {row_num}: SKU '{row['sku']}' already exists in your tenant")
-                        continue
-                    
-                    # Create product
-                    try:
-                        # Set store and scope based on user role
-                        store = None
-                        scope = 'global'
-                        
-                        if request.user.role == 'manager':
-                            store = request.user.store
-                            scope = 'store'
-                        elif request.user.role == 'business_admin':
-                            # Business admin can create global products
-                            scope = 'global'
-                        else:
-                            # Other roles create store-specific products
-                            store = request.user.store
-                            scope = 'store'
-                        
-                        product = Product.objects.create(
-                            name=row['name'].strip(),
-                            sku=row['sku'].strip(),
-                            category=category,
-                            selling_price=selling_price,
-                            cost_price=cost_price,
-                            quantity=quantity,
-                            description=row.get('description', '').strip(),
-                            status='active',
-                            tenant=request.user.tenant,
-                            store=store,
-                            scope=scope,
-                            is_featured=False,
-                            is_bestseller=False,
-                            min_quantity=0,
-                            max_quantity=999999,
-                            weight=Decimal('0'),
-                            dimensions='',
-                            material='',
-                            color='',
-                            size='',
-                            brand='',
-                            main_image='',
-                            additional_images=[],
-                            meta_title='',
-                            meta_description='',
-                            tags=[]
-                        )
-                    except Exception as e:
-                        print(f"Error creating product: {str(e)}")
-                        errors.append(f"Row {row_num}: Error creating product - {str(e)}")
-                        continue
-                    
-                    print(f"Successfully created product: {product.name} (SKU: {product.sku})")
-                    imported_count += 1
-                    
-                except Exception as e:
-                    print(f"Error processing row {row_num}: {str(e)}")
-                    errors.append(f"Row {row_num}: {str(e)}")
-                    continue
+            rows = list(csv_data)
+            imported_count, errors = import_product_rows(rows, request.user)
             
             if errors:
                 return Response({
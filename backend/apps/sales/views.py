@@ -4,11 +4,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
 from .models import Sale, SaleItem, SalesPipeline
 from .serializers import SaleSerializer, SaleItemSerializer, SalesPipelineSerializer
 from apps.users.middleware import ScopedVisibilityMixin
+from apps.analytics.cache import cached_dashboard
+from apps.analytics.models import DailyRollup
+from apps.analytics.rollups import period_totals
 
 
 class SaleListView(generics.ListAPIView, ScopedVisibilityMixin):
@@ -385,62 +388,38 @@ class SalesDashboardView(generics.GenericAPIView, ScopedVisibilityMixin):
     """Get sales dashboard data including sales and closed won pipeline revenue"""
     permission_classes = [IsAuthenticated]
     
+    @cached_dashboard('sales_dashboard', scope='role')
     def get(self, request):
         try:
             user = request.user
             print(f"=== SalesDashboardView.get called ===")
             print(f"User: {user.username}, Role: {user.role}")
             
-            # Get date range for current month
-            today = timezone.now()
-            start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_of_month = (start_of_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            # Base filters for user scope
-            base_sales_filter = {'tenant': user.tenant}
-            base_pipeline_filter = {'tenant': user.tenant}
+            # Current calendar month, summed from the daily rollups in the user's scope
+            today = timezone.localdate()
+            start_of_month = today.replace(day=1)
+            rollups = DailyRollup.objects.filter(tenant=user.tenant)
             
             # Apply role-based filtering
             if user.role in ['manager', 'inhouse_sales'] and hasattr(user, 'store') and user.store:
-                base_sales_filter['client__store'] = user.store
-                base_pipeline_filter['client__store'] = user.store
+                rollups = rollups.filter(store=user.store)
                 print(f"Filtering by store: {user.store.name}")
             
-            # Get sales data for current month
-            monthly_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=start_of_month,
-                created_at__lte=end_of_month
-            )
-            
-            # Get closed won pipeline data for current month
-            # Include pipelines that are closed_won but don't have actual_close_date set
-            monthly_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=start_of_month, actual_close_date__lte=end_of_month) |
-                Q(actual_close_date__isnull=True)  # Include pipelines without close date
-            )
+            totals = period_totals(rollups, start_of_month, today)
             
             # Calculate combined revenue
-            sales_revenue = monthly_sales.aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-            closed_won_revenue = monthly_closed_won.aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
+            sales_revenue = totals['sales_amount']
+            closed_won_revenue = totals['closed_won_value']
             total_monthly_revenue = sales_revenue + closed_won_revenue
             
             # Get total deals (sales + closed won pipelines)
-            total_deals = monthly_sales.count() + monthly_closed_won.count()
+            total_deals = totals['sales_count'] + totals['closed_won_count']
             
             # Sales count should include both actual sales and closed won pipelines
-            sales_count = monthly_sales.count() + monthly_closed_won.count()
-            
-            # Get total customers (unique clients from sales and pipelines)
-            from apps.clients.models import Client
-            base_client_filter = {'tenant': user.tenant}
-            if user.role in ['manager', 'inhouse_sales'] and hasattr(user, 'store') and user.store:
-                base_client_filter['store'] = user.store
+            sales_count = total_deals
             
-            total_customers = Client.objects.filter(**base_client_filter).count()
+            # Get total customers in scope
+            total_customers = totals['total_customers']
             
             # Calculate conversion rate (deals / customers)
             conversion_rate = (total_deals / total_customers * 100) if total_customers > 0 else 0
@@ -457,7 +436,7 @@ class SalesDashboardView(generics.GenericAPIView, ScopedVisibilityMixin):
                 'sales_revenue': float(sales_revenue),
                 'closed_won_revenue': float(closed_won_revenue),
                 'sales_count': sales_count,  # Now includes closed won pipelines
-                'closed_won_count': monthly_closed_won.count()
+                'closed_won_count': totals['closed_won_count']
             }
             
             return Response({
@@ -53,41 +53,29 @@ class StoreViewSet(viewsets.ModelViewSet):
         from apps.clients.models import Client
         from apps.products.models import Product
         from apps.users.models import User
+        from apps.analytics.models import DailyRollup
+        from apps.analytics.aggregates import count_sum, money_sum
         
         # Get all users assigned to this store
         store_users = User.objects.filter(store=store)
         
-        # Today's sales - filter by both sales_representative store AND client store
-        today_sales = Sale.objects.filter(
-            Q(sales_representative__store=store) | Q(client__store=store),
-            created_at__date=today
-        ).aggregate(
-            count=Count('id'),
-            revenue=Sum('total_amount')
-        )
-        
-        # This month's sales
-        this_month_sales = Sale.objects.filter(
-            Q(sales_representative__store=store) | Q(client__store=store),
-            created_at__date__gte=this_month_start,
-            created_at__date__lte=this_month_end
-        ).aggregate(
-            count=Count('id'),
-            revenue=Sum('total_amount')
+        # Sales, customers and closed-won pipelines from the daily rollups - counted for the
+        # store when either the client or the sales rep / assignee belongs to it
+        today_q = Q(date=today)
+        month_q = Q(date__gte=this_month_start, date__lte=this_month_end)
+        totals = DailyRollup.objects.filter(Q(store=store) | Q(sales_rep__store=store)).aggregate(
+            today_count=count_sum('sales_count', filter=today_q),
+            today_revenue=money_sum('sales_amount', filter=today_q),
+            month_count=count_sum('sales_count', filter=month_q),
+            month_revenue=money_sum('sales_amount', filter=month_q),
+            all_time_count=count_sum('sales_count'),
+            total_customers=count_sum('new_customers'),
+            pipeline_closed=count_sum('closed_won_count'),
         )
-        
-        # All time sales
-        all_time_sales = Sale.objects.filter(
-            Q(sales_representative__store=store) | Q(client__store=store)
-        ).aggregate(
-            count=Count('id'),
-            revenue=Sum('total_amount')
-        )
-        
-        # Customer metrics - count customers assigned to this store
-        total_customers = Client.objects.filter(
-            Q(store=store) | Q(assigned_to__store=store)
-        ).count()
+        today_sales = {'count': totals['today_count'], 'revenue': totals['today_revenue']}
+        this_month_sales = {'count': totals['month_count'], 'revenue': totals['month_revenue']}
+        all_time_sales = {'count': totals['all_time_count']}
+        total_customers = totals['total_customers']
         
         # Active deals (sales in progress + pipeline deals)
         active_deals = Sale.objects.filter(
@@ -110,12 +98,7 @@ class StoreViewSet(viewsets.ModelViewSet):
         ).count()
         
         # Add closed won pipeline deals
-        pipeline_closed = SalesPipeline.objects.filter(
-            Q(client__store=store) | Q(sales_representative__store=store),
-            stage='closed_won'
-        ).count()
-        
-        closed_won_deals += pipeline_closed
+        closed_won_deals += totals['pipeline_closed']
         
         # Staff count - both direct store users and StoreUserMap
         staff_count = store_users.count()
@@ -265,16 +248,19 @@ class StoreViewSet(viewsets.ModelViewSet):
         # Get limit from query params (default 10)
         limit = int(request.query_params.get('limit', 10))
         
-        # Import Sale model here to avoid circular imports
+        # Import models here to avoid circular imports
+        from apps.analytics.activity import recent_activity
+        from apps.analytics.models import ActivityEvent
         from apps.sales.models import Sale
         
-        # Get recent sales for staff in this store OR clients from this store
-        recent_sales = Sale.objects.filter(
-            Q(sales_representative__store=store) | Q(client__store=store)
-        ).select_related(
-            'client', 
-            'sales_representative'
-        ).order_by('-created_at')[:limit]
+        # The activity stream gives the store's newest sales (those of its staff, or of its
+        # clients for reps without a store) in index order; their current state is then
+        # loaded by primary key
+        events = recent_activity(store.tenant_id, store.id, kinds=[ActivityEvent.Kind.SALE], limit=limit)
+        sales = Sale.objects.select_related('client', 'sales_representative').in_bulk(
+            [event.object_id for event in events]
+        )
+        recent_sales = [sales[event.object_id] for event in events if event.object_id in sales]
         
         sales_data = []
         for sale in recent_sales:
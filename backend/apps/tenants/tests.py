@@ -2,6 +2,11 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.management import call_command
+from django.test import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import io
 from .models import Tenant
 from apps.clients.models import Client
 from apps.sales.models import Sale, SalesPipeline
@@ -133,6 +138,56 @@ class BusinessDashboardViewTest(APITestCase):
         self.assertIsInstance(data['top_managers'], list)
         self.assertIsInstance(data['top_salesmen'], list)
 
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_business_dashboard_figures_come_from_grouped_rollups(self):
+        """Totals and breakdowns are right and cost the same queries however many stores and staff"""
+        Sale.objects.create(
+            order_number="ORD002",
+            client=self.client_obj,
+            sales_representative=self.sales_user,
+            subtotal=Decimal("500.00"),
+            total_amount=Decimal("500.00"),
+            tenant=self.tenant
+        )
+        SalesPipeline.objects.create(
+            title="Won Pipeline",
+            client=self.client_obj,
+            sales_representative=self.sales_user,
+            stage=SalesPipeline.Stage.CLOSED_WON,
+            expected_value=Decimal("3000.00"),
+            tenant=self.tenant
+        )
+        call_command('backfill_daily_rollups', stdout=io.StringIO())
+        self.client.force_authenticate(user=self.admin_user)
+
+        with CaptureQueriesContext(connection) as context:
+            data = self.client.get('/api/tenants/dashboard/').data
+        self.assertEqual(data['total_sales']['period'], 4600.0)
+        self.assertEqual(data['total_sales']['period_count'], 3)
+        self.assertEqual(data['total_sales']['month'], 4600.0)
+        self.assertEqual(data['pipeline_revenue'], 2000.0)
+        self.assertEqual(data['pipeline_deals_count'], 1)
+        self.assertEqual(data['closed_won_pipeline_count'], 1)
+        self.assertEqual(data['store_performance'], [
+            {'id': self.store.id, 'name': "Main Store", 'revenue': 4600.0, 'closed_won_revenue': 3000.0}
+        ])
+        self.assertEqual([(m['id'], m['revenue']) for m in data['top_managers']], [(self.admin_user.id, 1100.0)])
+        self.assertEqual(data['top_salesmen'], [{
+            'id': self.sales_user.id, 'name': " ", 'revenue': 3500.0, 'deals_closed': 1,
+            'store_name': "Main Store", 'store_location': '',
+        }])
+
+        for i in range(5):
+            store = Store.objects.create(
+                name=f"Store {i}", code=f"ST{i}", address="-", city="-", state="-", tenant=self.tenant
+            )
+            User.objects.create_user(username=f"manager{i}", role=User.Role.MANAGER, tenant=self.tenant, store=store)
+            User.objects.create_user(username=f"sales{i}", role=User.Role.INHOUSE_SALES, tenant=self.tenant, store=store)
+        with CaptureQueriesContext(connection) as more_context:
+            data = self.client.get('/api/tenants/dashboard/').data
+        self.assertEqual(len(data['store_performance']), 6)
+        self.assertEqual(len(more_context.captured_queries), len(context.captured_queries))
+
     def test_business_dashboard_requires_authentication(self):
         """Test that the dashboard requires authentication"""
         response = self.client.get('/api/tenants/dashboard/')
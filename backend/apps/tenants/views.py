@@ -15,6 +15,10 @@ from apps.products.models import Product
 from apps.users.models import User, TeamMember
 from rest_framework.permissions import IsAuthenticated
 from apps.stores.models import Store
+from apps.analytics.models import DailyRollup
+from apps.analytics.aggregates import money_sum
+from apps.analytics.cache import cached_dashboard
+from apps.analytics.rollups import RollupBreakdown, period_totals
 
 User = get_user_model()
 
@@ -192,6 +196,7 @@ class PlatformAdminDashboardView(APIView):
     """Platform Admin Dashboard - Provides platform-wide statistics"""
     permission_classes = [IsRoleAllowed.for_roles(['platform_admin'])]
 
+    @cached_dashboard('platform_dashboard', scope='tenant')
     def get(self, request):
         try:
             # Get date range for analytics (last 30 days)
@@ -261,6 +266,7 @@ class ManagerDashboardView(APIView):
     """Manager Dashboard - Provides store-specific data including closed won pipelines"""
     permission_classes = [IsRoleAllowed.for_roles(['manager'])]
     
+    @cached_dashboard('manager_dashboard', scope='store')
     def get(self, request):
         try:
             user = request.user
@@ -271,44 +277,25 @@ class ManagerDashboardView(APIView):
                     'error': 'Manager not assigned to any store'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get date range for current month
-            today = timezone.now()
-            start_date = today - timedelta(days=30)
-            end_date = today
-            
-            # Base filters for manager's store only
-            base_sales_filter = {'tenant': user.tenant, 'client__store': user.store}
-            base_pipeline_filter = {'tenant': user.tenant, 'client__store': user.store}
-            
-            # Get sales data for current month
-            monthly_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            )
-            
-            # Get closed won pipeline data for current month
-            monthly_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=start_date, actual_close_date__lte=end_date) |
-                Q(actual_close_date__isnull=True)  # Include pipelines without close date
+            # Last 30 days, summed from the daily rollups of the manager's store
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=29)
+            totals = period_totals(
+                DailyRollup.objects.filter(tenant=user.tenant, store=user.store), start_date, end_date
             )
             
             # Calculate combined revenue
-            sales_revenue = monthly_sales.aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-            closed_won_revenue = monthly_closed_won.aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
+            sales_revenue = totals['sales_amount']
+            closed_won_revenue = totals['closed_won_value']
             total_monthly_revenue = sales_revenue + closed_won_revenue
             
             # Count sales (including closed won pipelines)
-            sales_count = monthly_sales.count()
-            closed_won_count = monthly_closed_won.count()
+            sales_count = totals['sales_count']
+            closed_won_count = totals['closed_won_count']
             total_sales_count = sales_count + closed_won_count
             
             # Get store customers
-            from apps.clients.models import Client
-            total_customers = Client.objects.filter(tenant=user.tenant, store=user.store).count()
+            total_customers = totals['total_customers']
             
             # Get team members for this store
             team_members = User.objects.filter(
@@ -343,6 +330,7 @@ class BusinessDashboardView(APIView):
     """Business Admin Dashboard - Provides real data for the dashboard"""
     permission_classes = [IsRoleAllowed.for_roles(['business_admin', 'manager', 'inhouse_sales'])]
 
+    @cached_dashboard('business_dashboard', scope='role')
     def get(self, request):
         user = request.user
         tenant = user.tenant
@@ -410,392 +398,135 @@ class BusinessDashboardView(APIView):
             end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
         
         try:
-            # Base filters based on user role
-            base_sales_filter = {'tenant': tenant}
-            base_pipeline_filter = {'tenant': tenant}
-            base_store_filter = {'tenant': tenant}
-            
-            # Role-based filtering
-            if user.role == 'business_admin':
-                # Business admin sees all data across all stores
-                pass
-            elif user.role == 'manager':
-                # Manager sees only their store data
-                if user.store:
-                    base_sales_filter['client__store'] = user.store
-                    base_pipeline_filter['client__store'] = user.store
-                    base_store_filter['id'] = user.store.id
-            elif user.role == 'inhouse_sales':
-                # In-house sales sees only their store data
-                if user.store:
-                    base_sales_filter['client__store'] = user.store
-                    base_pipeline_filter['client__store'] = user.store
-                    base_store_filter['id'] = user.store.id
-            
-            # 1. Total Sales for the selected date range
-            period_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
+            # Everything is scoped like the rest of the dashboard: business admins see the whole
+            # tenant, managers and in-house sales only the customers of their store
+            store_scoped = user.role in ['manager', 'inhouse_sales'] and user.store
+            rollups = DailyRollup.objects.filter(tenant=tenant)
+            pipelines = SalesPipeline.objects.filter(tenant=tenant)
+            stores = Store.objects.filter(tenant=tenant)
+            if store_scoped:
+                rollups = rollups.filter(store=user.store)
+                pipelines = pipelines.filter(client__store=user.store)
+                stores = stores.filter(id=user.store.id)
+            
+            # 1. Every time bucket, per store and sales rep, from one grouped query over the daily rollups
+            today = timezone.localdate()
+            breakdown = RollupBreakdown(
+                rollups,
+                {
+                    'period': (timezone.localdate(start_date), timezone.localdate(end_date)),
+                    'today': (today, today),
+                    'week': (today - timedelta(days=7), today),
+                    'month': (today - timedelta(days=30), today),
+                    'all': None,
+                },
+                fields=['sales_count', 'sales_amount', 'closed_won_count', 'closed_won_value'],
+            )
             
-            period_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=start_date, actual_close_date__lte=end_date) |
-                Q(actual_close_date__isnull=True, created_at__gte=start_date, created_at__lte=end_date)
-            ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
+            def bucket_revenue(bucket, **slice):
+                return breakdown.total(bucket, 'sales_amount', **slice) + breakdown.total(bucket, 'closed_won_value', **slice)
             
-            period_total = period_sales + period_closed_won
+            def bucket_count(bucket, **slice):
+                return breakdown.total(bucket, 'sales_count', **slice) + breakdown.total(bucket, 'closed_won_count', **slice)
             
-            # Count sales for the period
-            period_sales_count = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).count()
-            
-            period_closed_won_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=start_date, actual_close_date__lte=end_date) |
-                Q(actual_close_date__isnull=True, created_at__gte=start_date, created_at__lte=end_date)
-            ).count()
-            
-            period_total_sales_count = period_sales_count + period_closed_won_count
-            
-            # For backward compatibility, also calculate today, week, month
-            today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = timezone.now() - timedelta(days=7)
-            month_start = timezone.now() - timedelta(days=30)
-            
-            today_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=today_start,
-                created_at__lte=timezone.now()
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-            
-            today_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=today_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=today_start, created_at__lte=timezone.now())
-            ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-            
-            today_total = today_sales + today_closed_won
-            
-            week_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=week_start,
-                created_at__lte=timezone.now()
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-            
-            week_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=week_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=week_start, created_at__lte=timezone.now())
-            ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-            
-            week_total = week_sales + week_closed_won
-            
-            month_sales = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=month_start,
-                created_at__lte=timezone.now()
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-            
-            month_closed_won = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=month_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=month_start, created_at__lte=timezone.now())
-            ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-            
-            month_total = month_sales + month_closed_won
-            
-            # Count sales for today, week, month
-            today_sales_count = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=today_start,
-                created_at__lte=timezone.now()
-            ).count()
-            
-            today_closed_won_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=today_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=today_start, created_at__lte=timezone.now())
-            ).count()
-            
-            today_total_sales_count = today_sales_count + today_closed_won_count
-            
-            week_sales_count = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=week_start,
-                created_at__lte=timezone.now()
-            ).count()
-            
-            week_closed_won_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=week_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=week_start, created_at__lte=timezone.now())
-            ).count()
-            
-            week_total_sales_count = week_sales_count + week_closed_won_count
-            
-            month_sales_count = Sale.objects.filter(
-                **base_sales_filter,
-                created_at__gte=month_start,
-                created_at__lte=timezone.now()
-            ).count()
-            
-            month_closed_won_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).filter(
-                Q(actual_close_date__gte=month_start, actual_close_date__lte=timezone.now()) |
-                Q(actual_close_date__isnull=True, created_at__gte=month_start, created_at__lte=timezone.now())
-            ).count()
-            
-            month_total_sales_count = month_sales_count + month_closed_won_count
-            
-            # 2. Pipeline Revenue (pending deals)
-            pipeline_revenue = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage__in=['exhibition', 'social_media', 'interested', 'store_walkin', 'negotiation']
-            ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-            
-            # 3. Closed Won Pipeline Count (moved to sales section)
-            closed_won_pipeline_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage='closed_won'
-            ).count()
-            
-            # 4. Pipeline Deals Count (pending deals)
-            pipeline_deals_count = SalesPipeline.objects.filter(
-                **base_pipeline_filter,
-                stage__in=['exhibition', 'social_media', 'interested', 'store_walkin', 'negotiation']
-            ).count()
-            
-            # 5. Store Performance
-            stores = Store.objects.filter(**base_store_filter)
-            store_performance = []
+            # 2-4. Pending pipeline value and count
+            pending = Q(stage__in=['exhibition', 'social_media', 'interested', 'store_walkin', 'negotiation'])
+            pipeline_stats = pipelines.aggregate(
+                revenue=money_sum('expected_value', filter=pending),
+                deals=Count('id', filter=pending),
+            )
             
-            for store in stores:
-                # For business admin, we need to filter by the specific store
-                # For manager/inhouse_sales, they already have store filter applied
-                store_sales_filter = {**base_sales_filter}
-                store_pipeline_filter = {**base_pipeline_filter}
-                
-                if user.role == 'business_admin':
-                    # Business admin sees all stores, so filter by specific store
-                    store_sales_filter['client__store'] = store
-                    store_pipeline_filter['client__store'] = store
-                elif user.role in ['manager', 'inhouse_sales'] and user.store:
-                    # Manager/sales already have store filter, but ensure it's the right store
-                    if user.store.id == store.id:
-                        store_sales_filter['client__store'] = store
-                        store_pipeline_filter['client__store'] = store
-                    else:
-                        # Skip stores that don't match user's store
-                        continue
-                
-                store_sales = Sale.objects.filter(
-                    **store_sales_filter,
-                    created_at__gte=start_date,
-                    created_at__lte=end_date
-                )
-                
-
-                all_time_sales = Sale.objects.filter(**store_sales_filter).count()
-                all_time_pipeline = SalesPipeline.objects.filter(**store_pipeline_filter, stage='closed_won').count()
-                
-                store_revenue = store_sales.aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-                
-                store_closed_won = SalesPipeline.objects.filter(
-                    **store_pipeline_filter,
-                    stage='closed_won'
-                ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-                
-                # Total store revenue = sales + closed won pipeline
-                store_total_revenue = store_revenue + store_closed_won
-                
+            # 5. Store Performance: sales in the period plus all-time closed won pipeline
+            store_performance = []
+            for store in stores.order_by('id'):
+                store_closed_won = breakdown.total('all', 'closed_won_value', store_id=store.id)
                 store_performance.append({
                     'id': store.id,
                     'name': store.name,
-                    'revenue': float(store_total_revenue),
+                    'revenue': float(breakdown.total('period', 'sales_amount', store_id=store.id) + store_closed_won),
                     'closed_won_revenue': float(store_closed_won)
                 })
             
+            # Managers and salesmen are read together; their figures come from the breakdown
+            staff = list(
+                User.objects.filter(
+                    tenant=tenant,
+                    role__in=['business_admin', 'manager', 'inhouse_sales'],
+                    is_active=True
+                ).select_related('store').order_by('id')
+            )
+            
+            def staff_slice(member):
+                # Business admins see each member's figures for the member's own store
+                if user.role == 'business_admin' and member.store_id:
+                    return {'sales_rep_id': member.id, 'store_id': member.store_id}
+                return {'sales_rep_id': member.id}
+            
+            def with_store(data, member):
+                # Add store information for business admin to show location
+                if user.role == 'business_admin' and member.store:
+                    data['store_name'] = member.store.name
+                    data['store_location'] = member.store.location if hasattr(member.store, 'location') else ''
+                return data
+            
             # 6. Top Performing Managers (only for business admin and manager roles)
             top_managers = []
             if user.role in ['business_admin', 'manager']:
-                # For business admin, show managers from all stores with store info
-                # For manager, show only managers from their store
-                if user.role == 'business_admin':
-                    managers = User.objects.filter(
-                        tenant=tenant,
-                        role__in=['business_admin', 'manager'],
-                        is_active=True
-                    )
-                else:
+                managers = [member for member in staff if member.role in ['business_admin', 'manager']]
+                if user.role == 'manager':
                     # Manager role - only show managers from their store
-                    managers = User.objects.filter(
-                        tenant=tenant,
-                        role__in=['business_admin', 'manager'],
-                        is_active=True,
-                        store=user.store
-                    )
+                    managers = [member for member in managers if member.store_id == user.store_id]
                 
                 for manager in managers:
-                    # Filter sales and pipelines specific to this manager
-                    manager_sales_filter = {**base_sales_filter, 'sales_representative': manager}
-                    
-                    # If business admin, also filter by manager's store for accurate location-specific data
-                    if user.role == 'business_admin' and manager.store:
-                        manager_sales_filter['client__store'] = manager.store
-                    
-                    # Get all-time sales for this manager (not just last 30 days)
-                    manager_all_time_sales = Sale.objects.filter(
-                        **manager_sales_filter
-                    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-                    
-                    # Get recent sales (last 30 days)
-                    manager_recent_sales = Sale.objects.filter(
-                        **manager_sales_filter,
-                        created_at__gte=start_date,
-                        created_at__lte=end_date
-                    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-                    
-                    manager_pipeline_filter = {**base_pipeline_filter, 'sales_representative': manager}
-                    
-                    # If business admin, also filter by manager's store for accurate location-specific data
-                    if user.role == 'business_admin' and manager.store:
-                        manager_pipeline_filter['client__store'] = manager.store
-                    
-                    # Get all-time closed won pipelines
-                    manager_all_time_closed_won = SalesPipeline.objects.filter(
-                        **manager_pipeline_filter,
-                        stage='closed_won'
-                    ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-                    
-                    manager_deals = SalesPipeline.objects.filter(
-                        **manager_pipeline_filter,
-                        stage='closed_won'
-                    ).count()
-                    
+                    member_slice = staff_slice(manager)
                     # Total manager revenue = all-time sales + all-time closed won pipeline
-                    manager_total_revenue = manager_all_time_sales + manager_all_time_closed_won
+                    manager_total_revenue = bucket_revenue('all', **member_slice)
+                    manager_deals = breakdown.total('all', 'closed_won_count', **member_slice)
                     
                     # Include managers with any revenue or deals (even if 0 recent activity)
-                    if float(manager_total_revenue) > 0 or manager_deals > 0:
-                        manager_data = {
+                    if manager_total_revenue > 0 or manager_deals > 0:
+                        top_managers.append(with_store({
                             'id': manager.id,
                             'name': f"{manager.first_name} {manager.last_name}",
                             'revenue': float(manager_total_revenue),
                             'deals_closed': manager_deals,
-                            'recent_revenue': float(manager_recent_sales)
-                        }
-                        
-                        # Add store information for business admin to show location
-                        if user.role == 'business_admin' and manager.store:
-                            manager_data['store_name'] = manager.store.name
-                            manager_data['store_location'] = manager.store.location if hasattr(manager.store, 'location') else ''
-                        
-                        top_managers.append(manager_data)
-                    
-                # If no managers with sales found, show all managers for debugging
+                            'recent_revenue': float(breakdown.total('period', 'sales_amount', **member_slice))
+                        }, manager))
+                
+                # If no managers with sales found, show all managers
                 if not top_managers:
-                    for manager in managers:
-                        manager_data = {
+                    top_managers = [
+                        with_store({
                             'id': manager.id,
                             'name': f"{manager.first_name} {manager.last_name}",
                             'revenue': 0.0,
                             'deals_closed': 0,
                             'recent_revenue': 0.0
-                        }
-                        
-                        # Add store information for business admin to show location
-                        if user.role == 'business_admin' and manager.store:
-                            manager_data['store_name'] = manager.store.name
-                            manager_data['store_location'] = manager.store.location if hasattr(manager.store, 'location') else ''
-                        
-                        top_managers.append(manager_data)
+                        }, manager)
+                        for manager in managers
+                    ]
                 
                 # Sort managers by revenue
                 top_managers.sort(key=lambda x: x['revenue'], reverse=True)
                 top_managers = top_managers[:5]  # Top 5 managers
             
-            # 7. Top Performing Salesmen
-            salesmen = User.objects.filter(
-                tenant=tenant,
-                role='inhouse_sales',
-                is_active=True
-            )
+            # 7. Top Performing Salesmen: sales in the period plus all-time closed won pipeline
             top_salesmen = []
-            
-            for salesman in salesmen:
-                salesman_sales_filter = {**base_sales_filter}
-                if user.role in ['manager', 'inhouse_sales'] and user.store:
-                    salesman_sales_filter['client__store'] = user.store
-                
-                # If business admin, also filter by salesman's store for accurate location-specific data
-                if user.role == 'business_admin' and salesman.store:
-                    salesman_sales_filter['client__store'] = salesman.store
-                
-                salesman_sales = Sale.objects.filter(
-                    **salesman_sales_filter,
-                    sales_representative=salesman,
-                    created_at__gte=start_date,
-                    created_at__lte=end_date
-                ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-                
-                salesman_pipeline_filter = {**base_pipeline_filter}
-                if user.role in ['manager', 'inhouse_sales'] and user.store:
-                    salesman_pipeline_filter['client__store'] = user.store
-                
-                # If business admin, also filter by salesman's store for accurate location-specific data
-                if user.role == 'business_admin' and salesman.store:
-                    salesman_pipeline_filter['client__store'] = salesman.store
-                
-                salesman_closed_won = SalesPipeline.objects.filter(
-                    **salesman_pipeline_filter,
-                    sales_representative=salesman,
-                    stage='closed_won'
-                ).aggregate(total=Sum('expected_value'))['total'] or Decimal('0.00')
-                
-                salesman_deals = SalesPipeline.objects.filter(
-                    **salesman_pipeline_filter,
-                    sales_representative=salesman,
-                    stage='closed_won'
-                ).count()
-                
-                # Total salesman revenue = sales + closed won pipeline
-                salesman_total_revenue = salesman_sales + salesman_closed_won
-                
-                if float(salesman_total_revenue) > 0:
-                    salesman_data = {
+            for salesman in staff:
+                if salesman.role != 'inhouse_sales':
+                    continue
+                member_slice = staff_slice(salesman)
+                salesman_total_revenue = (
+                    breakdown.total('period', 'sales_amount', **member_slice)
+                    + breakdown.total('all', 'closed_won_value', **member_slice)
+                )
+                if salesman_total_revenue > 0:
+                    top_salesmen.append(with_store({
                         'id': salesman.id,
                         'name': f"{salesman.first_name} {salesman.last_name}",
                         'revenue': float(salesman_total_revenue),
-                        'deals_closed': salesman_deals
-                    }
-                    
-                    # Add store information for business admin to show location
-                    if user.role == 'business_admin' and salesman.store:
-                        salesman_data['store_name'] = salesman.store.name
-                        salesman_data['store_location'] = salesman.store.location if hasattr(salesman.store, 'location') else ''
-                    
-                    top_salesmen.append(salesman_data)
+                        'deals_closed': breakdown.total('all', 'closed_won_count', **member_slice)
+                    }, salesman))
             
             # Sort salesmen by revenue
             top_salesmen.sort(key=lambda x: x['revenue'], reverse=True)
@@ -804,18 +535,18 @@ class BusinessDashboardView(APIView):
             # Prepare response data
             dashboard_data = {
                 'total_sales': {
-                    'period': float(period_total),
-                    'today': float(today_total),
-                    'week': float(week_total),
-                    'month': float(month_total),
-                    'period_count': period_total_sales_count,
-                    'today_count': today_total_sales_count,
-                    'week_count': week_total_sales_count,
-                    'month_count': month_total_sales_count
+                    'period': float(bucket_revenue('period')),
+                    'today': float(bucket_revenue('today')),
+                    'week': float(bucket_revenue('week')),
+                    'month': float(bucket_revenue('month')),
+                    'period_count': bucket_count('period'),
+                    'today_count': bucket_count('today'),
+                    'week_count': bucket_count('week'),
+                    'month_count': bucket_count('month')
                 },
-                'pipeline_revenue': float(pipeline_revenue),
-                'closed_won_pipeline_count': closed_won_pipeline_count,
-                'pipeline_deals_count': pipeline_deals_count,
+                'pipeline_revenue': float(pipeline_stats['revenue']),
+                'closed_won_pipeline_count': breakdown.total('all', 'closed_won_count'),
+                'pipeline_deals_count': pipeline_stats['deals'],
                 'store_performance': store_performance,
                 'top_managers': top_managers,
                 'top_salesmen': top_salesmen
@@ -1,7 +1,13 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = 'Users'
+
+    def ready(self):
+        # Compile scoped visibility plans for every (model, role) pair once at startup
+        from .middleware import scope_plans
+        from .models import User
+        scope_plans.warm(apps.get_models(), User.Role.values)
@@ -0,0 +1,112 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.clients.models import Client, Appointment, FollowUp, Task
+from apps.sales.models import Sale, SalesPipeline
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from apps.users.middleware import ScopedVisibilityMiddleware, legacy_scoped_queryset, scope_plans
+from apps.users.models import User
+
+
+# Models and default filters used by the ScopedVisibilityMixin viewsets
+SCOPED_VIEWSETS = [
+    ('ClientViewSet', Client, {'is_deleted': False}),
+    ('AppointmentViewSet', Appointment, {'is_deleted': False}),
+    ('FollowUpViewSet', FollowUp, {'is_deleted': False}),
+    ('SaleListView', Sale, {}),
+    ('SalesPipelineListView', SalesPipeline, {}),
+    ('TaskViewSet', Task, {}),
+]
+
+SCOPED_ROLES = ['business_admin', 'manager', 'inhouse_sales', 'tele_calling']
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request scoping overhead of the legacy attribute walk and compiled scope plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Number of querysets to build per viewset and role',
+        )
+        parser.add_argument(
+            '--compile-sql',
+            action='store_true',
+            help='Also compile each queryset to SQL (closer to real request cost)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        compile_sql = options['compile_sql']
+
+        middleware = ScopedVisibilityMiddleware(get_response=lambda request: None)
+        factory = RequestFactory()
+
+        # In-memory principals so that neither path hits the database
+        tenant = Tenant(id=1, name='Benchmark Tenant')
+        store = Store(id=1, name='Benchmark Store', tenant=tenant)
+
+        self.stdout.write(f'Iterations per viewset/role: {iterations}')
+        self.stdout.write(f'{"Viewset":<24}{"Role":<16}{"Legacy (us)":>14}{"Compiled (us)":>16}{"Speedup":>10}  SQL')
+        self.stdout.write('-' * 86)
+
+        total_legacy = 0.0
+        total_compiled = 0.0
+        mismatches = 0
+
+        for viewset_name, model_class, filters in SCOPED_VIEWSETS:
+            for role in SCOPED_ROLES:
+                user = User(id=1, username='benchmark', role=role, tenant=tenant)
+                if role != 'business_admin':
+                    user.store = store
+                request = factory.get('/')
+                request.user = user
+
+                legacy_time = self._time(
+                    lambda: legacy_scoped_queryset(request, model_class, **filters),
+                    iterations, compile_sql,
+                )
+                compiled_time = self._time(
+                    lambda: middleware.get_scoped_queryset(request, model_class, **filters),
+                    iterations, compile_sql,
+                )
+
+                legacy_sql = str(legacy_scoped_queryset(request, model_class, **filters).query)
+                compiled_sql = str(middleware.get_scoped_queryset(request, model_class, **filters).query)
+                same_sql = legacy_sql == compiled_sql
+                if not same_sql:
+                    mismatches += 1
+
+                total_legacy += legacy_time
+                total_compiled += compiled_time
+                legacy_us = legacy_time / iterations * 1e6
+                compiled_us = compiled_time / iterations * 1e6
+                self.stdout.write(
+                    f'{viewset_name:<24}{role:<16}{legacy_us:>14.1f}{compiled_us:>16.1f}'
+                    f'{legacy_us / compiled_us:>9.2f}x  {"same" if same_sql else "DIFFERENT"}'
+                )
+
+        self.stdout.write('-' * 86)
+        self.stdout.write(f'Compiled scope plans: {len(scope_plans)}')
+        self.stdout.write(
+            f'Overall speedup: {total_legacy / total_compiled:.2f}x '
+            f'({total_legacy:.3f}s legacy vs {total_compiled:.3f}s compiled)'
+        )
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} viewset/role combinations produced different SQL'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Both paths produced identical SQL for every viewset/role'))
+
+    @staticmethod
+    def _time(build_queryset, iterations, compile_sql):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            queryset = build_queryset()
+            if compile_sql:
+                str(queryset.query)
+        return time.perf_counter() - start
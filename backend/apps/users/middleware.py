@@ -1,7 +1,139 @@
+from functools import lru_cache
+
 from django.db.models import Q
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.request import Request
 
+from .principal import get_request_principal
+
+
+# Role groups used by the scoping rules below
+STORE_SCOPED_ROLES = ('manager',)
+OWN_SCOPED_ROLES = ('inhouse_sales', 'tele_calling')
+
+# User relations checked (in order) when a model has no direct store field
+SCOPE_RELATIONS = ('assigned_to', 'sales_representative', 'created_by', 'user')
+
+
+def _client_store_path(model_class):
+    """Lookup path from a client-related model to the client's store."""
+    if hasattr(model_class.client.field.related_model, 'store'):
+        return 'client__store'
+    return 'client__assigned_to__store'
+
+
+class ScopePlan:
+    """
+    Precompiled scoping rules for a single (model, role) pair.
+
+    The filter paths are worked out once from the model's attributes, so
+    scoping a request only has to plug the user's tenant, store and id into
+    a ready-made ``Q`` object.
+    """
+
+    def __init__(self, model_class, role):
+        self.model_class = model_class
+        self.role = role
+        self.tenant_path = 'tenant' if hasattr(model_class, 'tenant') else None
+        # Each rule is a (kind, lookup) tuple where kind is 'store' or 'own'
+        self.store_rule = None       # applied when the user has a store
+        self.storeless_rule = None   # applied when the user has no store
+
+        if role in STORE_SCOPED_ROLES:
+            self.store_rule = self._compile_store_rule(model_class)
+        elif role in OWN_SCOPED_ROLES:
+            own_rule = self._compile_own_rule(model_class)
+            self.storeless_rule = own_rule
+            if model_class._meta.app_label == 'clients':
+                self.store_rule = self._compile_clients_store_rule(model_class)
+            else:
+                self.store_rule = own_rule
+
+    @staticmethod
+    def _compile_store_rule(model_class):
+        if hasattr(model_class, 'store'):
+            return ('store', 'store')
+        for relation in SCOPE_RELATIONS:
+            if hasattr(model_class, relation):
+                return ('store', f'{relation}__store')
+        if hasattr(model_class, 'client'):
+            return ('store', _client_store_path(model_class))
+        return None
+
+    @staticmethod
+    def _compile_own_rule(model_class):
+        for relation in SCOPE_RELATIONS:
+            if hasattr(model_class, relation):
+                return ('own', relation)
+        return None
+
+    @staticmethod
+    def _compile_clients_store_rule(model_class):
+        # Sales people can see all clients/appointments/follow-ups/tasks of their store
+        model_name = model_class._meta.model_name
+        if model_name == 'client':
+            if hasattr(model_class, 'store'):
+                return ('store', 'store')
+            return ('store', 'assigned_to__store')
+        if model_name in ['appointment', 'followup', 'task']:
+            return ('store', _client_store_path(model_class))
+        return None
+
+    def build_q(self, tenant_id=None, store_id=None, user_id=None):
+        """Return the combined tenant/store/own predicate for a user."""
+        return _compile_scope_q(self, tenant_id, store_id, user_id)
+
+    def __repr__(self):
+        return (
+            f'<ScopePlan {self.model_class._meta.label} role={self.role} '
+            f'tenant={self.tenant_path} store={self.store_rule} storeless={self.storeless_rule}>'
+        )
+
+
+@lru_cache(maxsize=4096)
+def _compile_scope_q(plan, tenant_id, store_id, user_id):
+    lookups = []
+    if plan.tenant_path and tenant_id:
+        lookups.append((plan.tenant_path, tenant_id))
+    rule = plan.store_rule if store_id else plan.storeless_rule
+    if rule:
+        kind, path = rule
+        lookups.append((path, store_id if kind == 'store' else user_id))
+    return Q(*lookups)
+
+
+class ScopePlanRegistry:
+    """
+    Registry of compiled scope plans keyed by (model, role).
+    """
+
+    def __init__(self):
+        self._plans = {}
+
+    def get_plan(self, model_class, role):
+        key = (model_class, role)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = ScopePlan(model_class, role)
+            self._plans[key] = plan
+        return plan
+
+    def warm(self, models, roles):
+        """Compile plans up front (called from the users app at startup)."""
+        for model_class in models:
+            for role in roles:
+                self.get_plan(model_class, role)
+
+    def clear(self):
+        self._plans.clear()
+        _compile_scope_q.cache_clear()
+
+    def __len__(self):
+        return len(self._plans)
+
+
+scope_plans = ScopePlanRegistry()
+
 
 class ScopedVisibilityMiddleware(MiddlewareMixin):
     """
@@ -34,7 +166,7 @@ class ScopedVisibilityMiddleware(MiddlewareMixin):
         elif user.role == 'manager':
             return {
                 'type': 'store',
-                'filters': {'store_id': user.store.id if user.store else None},
+                'filters': {'store_id': user.store_id},
                 'description': 'Access to store-specific data only'
             }
         elif user.role in ['inhouse_sales', 'tele_calling']:
@@ -77,105 +209,130 @@ class ScopedVisibilityMiddleware(MiddlewareMixin):
         Returns:
             Filtered queryset based on user scope
         """
-        user = request.user
-        
-        queryset = model_class.objects.all()
-        
-        # Apply tenant filtering first
-        if hasattr(model_class, 'tenant') and user.tenant:
-            queryset = queryset.filter(tenant=user.tenant)
+        principal = get_request_principal(request)
+        plan = scope_plans.get_plan(model_class, principal.role)
+        scope_q = plan.build_q(principal.tenant_id, principal.store_id, principal.user_id)
+
+        # Apply additional filters
+        filters = {field: value for field, value in additional_filters.items() if value is not None}
+
+        return model_class.objects.filter(scope_q, **filters)
+
+
+def legacy_scoped_queryset(request, model_class, **additional_filters):
+    """
+    Uncompiled scoping walk that ScopePlan replaces.
+
+    Kept as the reference implementation for the scope plan benchmark and
+    equivalence tests; request handling goes through scope_plans.
+    
+    Args:
+        request: The request object
+        model_class: The Django model class
+        **additional_filters: Additional filters to apply
         
-        # Apply role-based scoping
-        if user.role in ['platform_admin', 'business_admin']:
-            # No additional filtering - full access
-            pass
-        elif user.role == 'manager':
-            # Store Manager: Filter by store_id - comprehensive store-based filtering
-            if user.store:
-                # Direct store filtering for models with store field
-                if hasattr(model_class, 'store'):
-                    queryset = queryset.filter(store=user.store)
-                
-                # For models that have assigned_to field, filter by users in the same store
-                elif hasattr(model_class, 'assigned_to'):
-                    queryset = queryset.filter(assigned_to__store=user.store)
-                
-                # For sales pipeline models
-                elif hasattr(model_class, 'sales_representative'):
-                    queryset = queryset.filter(sales_representative__store=user.store)
-                
-                # For models with created_by field, filter by users in the same store
-                elif hasattr(model_class, 'created_by'):
-                    queryset = queryset.filter(created_by__store=user.store)
-                
-                # For models with user field, filter by users in the same store
-                elif hasattr(model_class, 'user'):
-                    queryset = queryset.filter(user__store=user.store)
-                
-                # For client-related models (appointments, followups, tasks)
-                elif hasattr(model_class, 'client'):
-                    # Filter by clients from the same store
-                    if hasattr(model_class.client.field.related_model, 'store'):
-                        queryset = queryset.filter(client__store=user.store)
-                    else:
-                        # Fallback to client's assigned user's store
-                        queryset = queryset.filter(client__assigned_to__store=user.store)
-                
-                # For sale-related models
-                elif hasattr(model_class, 'client') and hasattr(model_class, 'sales_representative'):
-                    # For sales, filter by both client store and sales rep store
-                    queryset = queryset.filter(
-                        client__store=user.store,
-                        sales_representative__store=user.store
-                    )
-                
-                # For models without direct store relationship, filter by tenant only
-                else:
-                    pass
-            else:
-                pass
-        elif user.role in ['inhouse_sales', 'tele_calling']:
-            # Salesperson: Filter by user_id (own data only)
+    Returns:
+        Filtered queryset based on user scope
+    """
+    user = request.user
+    
+    queryset = model_class.objects.all()
+    
+    # Apply tenant filtering first
+    if hasattr(model_class, 'tenant') and user.tenant:
+        queryset = queryset.filter(tenant=user.tenant)
+    
+    # Apply role-based scoping
+    if user.role in ['platform_admin', 'business_admin']:
+        # No additional filtering - full access
+        pass
+    elif user.role == 'manager':
+        # Store Manager: Filter by store_id - comprehensive store-based filtering
+        if user.store:
+            # Direct store filtering for models with store field
+            if hasattr(model_class, 'store'):
+                queryset = queryset.filter(store=user.store)
             
-            # Special case for Client-related models - sales people can see all clients/appointments/followups from their store
-            if (model_class._meta.app_label == 'clients' and 
-                user.store):
-                if model_class._meta.model_name == 'client':
-                    # For clients, use direct store relationship for better performance
-                    if hasattr(model_class, 'store'):
-                        queryset = queryset.filter(store=user.store)
-                    else:
-                        # Fallback to assigned_to store filtering
-                        queryset = queryset.filter(assigned_to__store=user.store)
-                elif model_class._meta.model_name in ['appointment', 'followup']:
-                    # For appointments and followups, allow access to those related to clients from the same store
-                    if hasattr(model_class, 'client') and hasattr(model_class.client.field.related_model, 'store'):
-                        queryset = queryset.filter(client__store=user.store)
-                    else:
-                        # Fallback to assigned_to store filtering
-                        queryset = queryset.filter(client__assigned_to__store=user.store)
-                elif model_class._meta.model_name == 'task':
-                    # For tasks, allow access to those related to clients from the same store
-                    if hasattr(model_class, 'client') and hasattr(model_class.client.field.related_model, 'store'):
-                        queryset = queryset.filter(client__store=user.store)
-                    else:
-                        # Fallback to assigned_to store filtering
-                        queryset = queryset.filter(client__assigned_to__store=user.store)
+            # For models that have assigned_to field, filter by users in the same store
             elif hasattr(model_class, 'assigned_to'):
-                queryset = queryset.filter(assigned_to=user)
+                queryset = queryset.filter(assigned_to__store=user.store)
+            
+            # For sales pipeline models
             elif hasattr(model_class, 'sales_representative'):
-                queryset = queryset.filter(sales_representative=user)
+                queryset = queryset.filter(sales_representative__store=user.store)
+            
+            # For models with created_by field, filter by users in the same store
             elif hasattr(model_class, 'created_by'):
-                queryset = queryset.filter(created_by=user)
+                queryset = queryset.filter(created_by__store=user.store)
+            
+            # For models with user field, filter by users in the same store
             elif hasattr(model_class, 'user'):
-                queryset = queryset.filter(user=user)
+                queryset = queryset.filter(user__store=user.store)
+            
+            # For client-related models (appointments, followups, tasks)
+            elif hasattr(model_class, 'client'):
+                # Filter by clients from the same store
+                if hasattr(model_class.client.field.related_model, 'store'):
+                    queryset = queryset.filter(client__store=user.store)
+                else:
+                    # Fallback to client's assigned user's store
+                    queryset = queryset.filter(client__assigned_to__store=user.store)
+            
+            # For sale-related models
+            elif hasattr(model_class, 'client') and hasattr(model_class, 'sales_representative'):
+                # For sales, filter by both client store and sales rep store
+                queryset = queryset.filter(
+                    client__store=user.store,
+                    sales_representative__store=user.store
+                )
+            
+            # For models without direct store relationship, filter by tenant only
+            else:
+                pass
+        else:
+            pass
+    elif user.role in ['inhouse_sales', 'tele_calling']:
+        # Salesperson: Filter by user_id (own data only)
+        
+        # Special case for Client-related models - sales people can see all clients/appointments/followups from their store
+        if (model_class._meta.app_label == 'clients' and 
+            user.store):
+            if model_class._meta.model_name == 'client':
+                # For clients, use direct store relationship for better performance
+                if hasattr(model_class, 'store'):
+                    queryset = queryset.filter(store=user.store)
+                else:
+                    # Fallback to assigned_to store filtering
+                    queryset = queryset.filter(assigned_to__store=user.store)
+            elif model_class._meta.model_name in ['appointment', 'followup']:
+                # For appointments and followups, allow access to those related to clients from the same store
+                if hasattr(model_class, 'client') and hasattr(model_class.client.field.related_model, 'store'):
+                    queryset = queryset.filter(client__store=user.store)
+                else:
+                    # Fallback to assigned_to store filtering
+                    queryset = queryset.filter(client__assigned_to__store=user.store)
+            elif model_class._meta.model_name == 'task':
+                # For tasks, allow access to those related to clients from the same store
+                if hasattr(model_class, 'client') and hasattr(model_class.client.field.related_model, 'store'):
+                    queryset = queryset.filter(client__store=user.store)
+                else:
+                    # Fallback to assigned_to store filtering
+                    queryset = queryset.filter(client__assigned_to__store=user.store)
+        elif hasattr(model_class, 'assigned_to'):
+            queryset = queryset.filter(assigned_to=user)
+        elif hasattr(model_class, 'sales_representative'):
+            queryset = queryset.filter(sales_representative=user)
+        elif hasattr(model_class, 'created_by'):
+            queryset = queryset.filter(created_by=user)
+        elif hasattr(model_class, 'user'):
+            queryset = queryset.filter(user=user)
 
-        # Apply additional filters
-        for field, value in additional_filters.items():
-            if value is not None:
-                queryset = queryset.filter(**{field: value})
+    # Apply additional filters
+    for field, value in additional_filters.items():
+        if value is not None:
+            queryset = queryset.filter(**{field: value})
 
-        return queryset
+    return queryset
 
 
 class ScopedVisibilityMixin:
@@ -206,6 +363,10 @@ class ScopedVisibilityMixin:
 
         return middleware.get_scoped_queryset(self.request, model_class, **additional_filters)
 
+    def get_principal(self):
+        """Get the request-scoped principal (flat tenant/store/role snapshot) for the current user."""
+        return get_request_principal(self.request)
+
     def get_user_scope(self):
         """Get the current user's scope configuration."""
         middleware = getattr(self.request, '_scoped_visibility_middleware', None)
@@ -0,0 +1,89 @@
+class RequestPrincipal:
+    """
+    Flat, request-scoped snapshot of the authenticated user.
+
+    Built once per request so that scoping code and views can read the
+    tenant, store and role without touching ``user.tenant`` / ``user.store``
+    (each of which may trigger a lazy foreign-key load).
+    """
+
+    __slots__ = (
+        'user_id', 'username', 'role', 'is_authenticated',
+        'tenant_id', 'tenant_name', 'store_id', 'store_name',
+    )
+
+    def __init__(self, user_id=None, username='', role=None, is_authenticated=False,
+                 tenant_id=None, tenant_name=None, store_id=None, store_name=None):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.is_authenticated = is_authenticated
+        self.tenant_id = tenant_id
+        self.tenant_name = tenant_name
+        self.store_id = store_id
+        self.store_name = store_name
+
+    @classmethod
+    def from_user(cls, user):
+        """Build a principal from a user (tenant/store are read only if already loaded or present)."""
+        if user is None or not user.is_authenticated:
+            return cls()
+
+        tenant_id = getattr(user, 'tenant_id', None)
+        store_id = getattr(user, 'store_id', None)
+        return cls(
+            user_id=user.pk,
+            username=user.username,
+            role=getattr(user, 'role', None),
+            is_authenticated=True,
+            tenant_id=tenant_id,
+            tenant_name=user.tenant.name if tenant_id else None,
+            store_id=store_id,
+            store_name=user.store.name if store_id else None,
+        )
+
+    @property
+    def is_platform_admin(self):
+        return self.role == 'platform_admin'
+
+    @property
+    def is_business_admin(self):
+        return self.role == 'business_admin'
+
+    @property
+    def is_manager(self):
+        return self.role == 'manager'
+
+    @property
+    def is_sales_user(self):
+        return self.role in ['inhouse_sales', 'tele_calling']
+
+    def __repr__(self):
+        return (
+            f'<RequestPrincipal user={self.user_id} role={self.role} '
+            f'tenant={self.tenant_id} store={self.store_id}>'
+        )
+
+
+def attach_principal(request, user):
+    """Build the principal for ``user`` and cache it on the underlying HttpRequest."""
+    http_request = getattr(request, '_request', request)
+    principal = RequestPrincipal.from_user(user)
+    http_request._principal = principal
+    return principal
+
+
+def get_request_principal(request):
+    """
+    Return the principal for the current request, building it on first use.
+
+    Requests authenticated through PrincipalJWTAuthentication already carry
+    a principal; anything else (session auth, force_authenticate in tests)
+    gets one built lazily from ``request.user``.
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    principal = getattr(http_request, '_principal', None)
+    if principal is None or principal.user_id != user.pk:
+        principal = attach_principal(request, user)
+    return principal
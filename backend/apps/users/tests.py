@@ -1,3 +1,230 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import TeamMember, TeamMemberActivity
+from apps.users.views import ManagerDashboardView, TeamStatsView
+from apps.users.middleware import ScopedVisibilityMiddleware, legacy_scoped_queryset, scope_plans
+from apps.users.principal import get_request_principal
+from apps.tenants.models import Tenant
+from apps.stores.models import Store
+from apps.clients.models import Client, Appointment, FollowUp, Task
+from apps.sales.models import Sale, SalesPipeline
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ScopePlanTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ScopedVisibilityMiddleware(get_response=lambda request: None)
+
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.other_store = Store.objects.create(
+            name="Other Store",
+            code="TS002",
+            address="Other Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+
+    def make_request(self, role, store=None):
+        user = User.objects.create_user(
+            username=f'{role}_{store.id if store else "none"}',
+            password='testpass123',
+            role=role,
+            tenant=self.tenant,
+            store=store
+        )
+        request = self.factory.get('/')
+        request.user = user
+        return request
+
+    def test_compiled_plans_match_legacy_walk(self):
+        """Compiled plans produce the same SQL as the legacy attribute walk"""
+        models = [Client, Appointment, FollowUp, Task, Sale, SalesPipeline]
+        for role in User.Role.values:
+            for store in [self.store, None]:
+                request = self.make_request(role, store)
+                for model_class in models:
+                    with self.subTest(role=role, store=store, model=model_class.__name__):
+                        legacy = legacy_scoped_queryset(request, model_class)
+                        compiled = self.middleware.get_scoped_queryset(request, model_class)
+                        self.assertEqual(str(legacy.query), str(compiled.query))
+
+    def test_plans_are_cached_per_model_and_role(self):
+        """The registry compiles each (model, role) pair once"""
+        plan = scope_plans.get_plan(Client, 'manager')
+        self.assertIs(scope_plans.get_plan(Client, 'manager'), plan)
+        self.assertIsNot(scope_plans.get_plan(Client, 'inhouse_sales'), plan)
+        self.assertIs(plan.build_q(1, 2, 3), plan.build_q(1, 2, 3))
+
+    def test_manager_sees_only_store_clients(self):
+        """Managers are scoped to their own store"""
+        Client.objects.create(email="a@test.com", tenant=self.tenant, store=self.store)
+        Client.objects.create(email="b@test.com", tenant=self.tenant, store=self.other_store)
+
+        request = self.make_request('manager', self.store)
+        queryset = self.middleware.get_scoped_queryset(request, Client, is_deleted=False)
+
+        self.assertEqual(list(queryset.values_list('email', flat=True)), ["a@test.com"])
+
+
+
+class RequestPrincipalTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.user = User.objects.create_user(
+            username='manager',
+            password='testpass123',
+            role='manager',
+            tenant=self.tenant,
+            store=self.store
+        )
+
+    def test_principal_is_built_once_per_request(self):
+        """The principal is cached on the request and reused"""
+        request = self.factory.get('/')
+        request.user = User.objects.select_related('tenant', 'store').get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            principal = get_request_principal(request)
+            self.assertIs(get_request_principal(request), principal)
+
+        self.assertEqual(principal.tenant_id, self.tenant.id)
+        self.assertEqual(principal.store_id, self.store.id)
+        self.assertEqual(principal.store_name, "Test Store")
+        self.assertTrue(principal.is_manager)
+
+    def test_principal_is_rebuilt_for_a_different_user(self):
+        """A cached principal is not reused when request.user changes"""
+        request = self.factory.get('/')
+        request.user = self.user
+        get_request_principal(request)
+
+        other = User.objects.create_user(username='other', password='testpass123', role='business_admin', tenant=self.tenant)
+        request.user = other
+        principal = get_request_principal(request)
+
+        self.assertEqual(principal.user_id, other.id)
+        self.assertIsNone(principal.store_id)
+
+
+class EndpointQueryCountTest(APITestCase):
+    """
+    Pins the number of SQL queries per endpoint. Authentication loads the
+    user, tenant and store in a single query; nothing downstream should
+    lazily load ``user.tenant`` or ``user.store`` again.
+    """
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Test Tenant")
+        self.store = Store.objects.create(
+            name="Test Store",
+            code="TS001",
+            address="Test Address",
+            city="Test City",
+            state="Test State",
+            tenant=self.tenant
+        )
+        self.manager = User.objects.create_user(
+            username='manager',
+            password='testpass123',
+            role='manager',
+            tenant=self.tenant,
+            store=self.store
+        )
+        for i in range(3):
+            Client.objects.create(email=f"client{i}@test.com", tenant=self.tenant, store=self.store)
+
+        token = RefreshToken.for_user(self.manager).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assert_endpoint_queries(self, url, expected):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), expected, [q['sql'] for q in context.captured_queries])
+
+        # Tenant and store only ever arrive through the authentication join
+        standalone = [
+            q['sql'] for q in context.captured_queries
+            if q['sql'].startswith(('SELECT "tenants_tenant"', 'SELECT "stores_store"'))
+        ]
+        self.assertEqual(standalone, [])
+
+    def test_client_list_queries(self):
+        # auth + page + tags prefetch + interests prefetch
+        self.assert_endpoint_queries('/api/clients/clients/', 4)
+
+    def test_paginated_client_list_queries(self):
+        # auth + page + tags prefetch + interests prefetch
+        self.assert_endpoint_queries('/api/clients/clients/?page_size=2', 4)
+
+    def test_notification_list_queries(self):
+        # auth + count (empty page)
+        self.assert_endpoint_queries('/api/notifications/notifications/', 2)
+
+    def test_announcement_list_queries(self):
+        # auth + count + page
+        self.assert_endpoint_queries('/api/announcements/announcements/', 3)
+
+
+class TeamActivityFeedTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Test Tenant", slug="test-tenant")
+        self.other_tenant = Tenant.objects.create(name="Other Tenant", slug="other-tenant")
+        self.manager = User.objects.create_user(username='manager', role='manager', tenant=self.tenant)
+        self.lead = TeamMember.objects.create(user=self.manager, employee_id='E0')
+        self.members = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'rep{i}', first_name='Rep', last_name=str(i), role='inhouse_sales', tenant=self.tenant
+            )
+            self.members.append(TeamMember.objects.create(user=user, employee_id=f'E{i + 1}', manager=self.lead))
+        outsider = User.objects.create_user(username='outsider', role='inhouse_sales', tenant=self.other_tenant)
+        self.outsider = TeamMember.objects.create(user=outsider, employee_id='X1')
+
+    def get(self, view):
+        request = RequestFactory().get('/')
+        force_authenticate(request, user=self.manager)
+        response = view.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_team_feeds_read_the_activity_stream(self):
+        for member in self.members:
+            TeamMemberActivity.objects.create(team_member=member, activity_type='sale', description=f'Sold {member.employee_id}')
+        TeamMemberActivity.objects.create(team_member=self.outsider, activity_type='login', description='Elsewhere')
+
+        data = self.get(ManagerDashboardView)
+        self.assertEqual(
+            [(row['member_name'], row['activity_type'], row['description']) for row in data['recent_activities']],
+            [('Rep 2', 'Sale Made', 'Sold E3'), ('Rep 1', 'Sale Made', 'Sold E2'), ('Rep 0', 'Sale Made', 'Sold E1')],
+        )
+        self.assertEqual(
+            [row['description'] for row in self.get(TeamStatsView)['recent_activities']],
+            ['Sold E3', 'Sold E2', 'Sold E1'],
+        )
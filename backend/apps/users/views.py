@@ -16,6 +16,9 @@ from .serializers import (
     MessagingUserSerializer
 )
 from apps.users.permissions import IsRoleAllowed
+from apps.analytics.activity import describe_team_activity, recent_activity
+from apps.analytics.cache import cached_dashboard
+from apps.analytics.models import ActivityEvent
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -774,6 +777,7 @@ class TeamStatsView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated]
 
+    @cached_dashboard('team_stats', scope='user')
     def get(self, request):
         """Calculate and return team statistics."""
         user = request.user
@@ -829,20 +833,16 @@ class TeamStatsView(APIView):
                 'performance': member.performance_rating
             })
         
-        # Get recent activities
-        recent_activities = TeamMemberActivity.objects.filter(
-            team_member__in=team_members
-        ).order_by('-created_at')[:10]
-        
-        recent_activities_data = []
-        for activity in recent_activities:
-            recent_activities_data.append({
-                'id': activity.id,
-                'member_name': activity.team_member.user.get_full_name(),
-                'activity_type': activity.get_activity_type_display(),
-                'description': activity.description,
-                'created_at': activity.created_at.isoformat()
-            })
+        # Get recent activities from the activity stream
+        recent_activities_data = [
+            describe_team_activity(event)
+            for event in recent_activity(
+                user.tenant_id,
+                kinds=[ActivityEvent.Kind.TEAM_ACTIVITY],
+                actors=team_members.values('user_id'),
+                limit=10,
+            )
+        ]
         
         # Prepare response data
         stats_data = {
@@ -953,10 +953,12 @@ class ManagerDashboardView(APIView):
                 total=Sum('current_sales')
             )['total'] or 0
             
-            # Get recent activities (if any)
-            recent_activities = TeamMemberActivity.objects.filter(
-                team_member__in=team_members
-            ).order_by('-created_at')[:5]
+            # Get recent activities (if any) from the activity stream
+            recent_activities = recent_activity(
+                user.tenant_id,
+                kinds=[ActivityEvent.Kind.TEAM_ACTIVITY],
+                actors=team_members.values('user_id'),
+            )
             
             # Get performance summary
             performance_summary = {
@@ -1009,16 +1011,7 @@ class ManagerDashboardView(APIView):
                 'active_members': active_members,
                 'total_team_sales': float(total_team_sales),
                 'performance_summary': performance_summary,
-                'recent_activities': [
-                    {
-                        'id': activity.id,
-                        'member_name': activity.team_member.user.get_full_name(),
-                        'activity_type': activity.get_activity_type_display(),
-                        'description': activity.description,
-                        'created_at': activity.created_at.isoformat()
-                    }
-                    for activity in recent_activities
-                ]
+                'recent_activities': [describe_team_activity(event) for event in recent_activities]
             }
             
             return Response(dashboard_data)
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
     'apps.support',
     'apps.notifications',
     'apps.exhibition',
+    'apps.imports',
     'telecalling',
 ]
 
@@ -141,7 +143,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.PrincipalJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -232,6 +234,57 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Background import jobs: 'auto' (Celery if the broker is reachable, else an
+# in-process thread pool), 'celery', 'local' or 'sync'
+IMPORT_JOBS_EXECUTOR = config('IMPORT_JOBS_EXECUTOR', default='auto')
+IMPORT_JOBS_LOCAL_WORKERS = config('IMPORT_JOBS_LOCAL_WORKERS', default=2, cast=int)
+# Seconds without progress after which a running import job is considered
+# abandoned by a crashed worker (see manage.py fail_stale_import_jobs)
+IMPORT_JOBS_STALE_AFTER = config('IMPORT_JOBS_STALE_AFTER', default=3600, cast=int)
+
+# Customer status recomputation queued by Sale/SalesPipeline saves, run after
+# commit: 'sync' (inline), 'local' (thread pool), 'celery' or 'auto'
+CLIENT_STATUS_EXECUTOR = config('CLIENT_STATUS_EXECUTOR', default='sync')
+
+# Daily sales rollup rebuilds queued by Sale/SalesPipeline/Client saves, run after
+# commit: 'auto' (Celery if the broker is reachable, else one in-process worker
+# thread that coalesces commits), 'celery', 'local' or 'sync'
+DAILY_ROLLUP_EXECUTOR = config('DAILY_ROLLUP_EXECUTOR', default='auto')
+
+# Audit log retention: whole months older than this are pruned by prune_audit_logs
+AUDIT_LOG_RETENTION_MONTHS = config('AUDIT_LOG_RETENTION_MONTHS', default=12, cast=int)
+
+# Shared cache: Redis when REDIS_CACHE_URL is set (needs the redis package),
+# otherwise per-process local memory
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'crm',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Dashboard responses are cached per endpoint/tenant/store/role for this many
+# seconds (0 disables) and dropped early when sales, pipelines, clients or
+# products of the tenant change
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)
+
+# The global catalogue's product x store inventory snapshot is cached per tenant
+# for this many seconds (0 disables) and dropped on inventory, product or store writes
+CATALOGUE_CACHE_TIMEOUT = config('CATALOGUE_CACHE_TIMEOUT', default=300, cast=int)
+
+# The CustomerTag slug -> id map used by automatic tagging is shared through the
+# cache and re-read at least this often (seconds), besides on tag writes
+TAG_ID_CACHE_TIMEOUT = config('TAG_ID_CACHE_TIMEOUT', default=60, cast=int)
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Jewelry CRM API',
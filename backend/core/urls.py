@@ -35,6 +35,7 @@ urlpatterns = [
     path('api/support/', include('apps.support.urls')),
     path('api/notifications/', include('apps.notifications.urls')),
     path('api/exhibition/', include('apps.exhibition.urls')),
+    path('api/imports/', include('apps.imports.urls')),
 ]
 
 # Serve static and media files in development